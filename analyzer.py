@@ -1,28 +1,100 @@
 # analyzer.py
-import re
-import nltk
-from nltk.sentiment.vader import SentimentIntensityAnalyzer
+import os
+import csv
+import hashlib
+import threading
+from collections import OrderedDict
+import time
+from phrase_matcher import PhraseMatcher
+import scoring
 import logging
 
 logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
 
-# --- VADER Lexicon Download Logic ---
-try:
-    nltk.data.find('sentiment/vader_lexicon.zip')
-except LookupError:
-    logging.info("Downloading VADER lexicon...")
+# --- Shared VADER Analyzer & Memo ---
+# Building a SentimentIntensityAnalyzer re-reads the lexicon from disk, so one instance is shared process-wide.
+# NLTK and the lexicon are loaded on first use (or by warm_up()), never at import time; a missing
+# lexicon is downloaded then when NLTK_AUTO_DOWNLOAD is on, so WSGI workers that skip warm_up() still get it.
+NLTK_AUTO_DOWNLOAD = os.environ.get("NLTK_AUTO_DOWNLOAD", "1") == "1" # Lets the first load (lazy or warm_up()) fetch a missing lexicon
+VADER_RETRY_SECONDS = float(os.environ.get("VADER_RETRY_SECONDS", 60)) # After a failed load, texts score NEUTRAL this long before retrying
+SENTIMENT_MEMO_SIZE = int(os.environ.get("SENTIMENT_MEMO_SIZE", 4096)) # Max memoized texts (LRU)
+NEUTRAL_SENTIMENT = {'neg': 0.0, 'neu': 1.0, 'pos': 0.0, 'compound': 0.0, 'label': 'NEUTRAL'}
+
+_vader = None
+_vader_error = None # (monotonic time, message) of the last failed load; cleared once VADER loads
+_vader_lock = threading.Lock()
+_sentiment_memo = OrderedDict() # content hash -> scores
+_sentiment_memo_lock = threading.Lock()
+
+def _load_vader(download=False):
+    """Imports NLTK and builds the analyzer. Only downloads a missing lexicon when asked to."""
+    import nltk
+    from nltk.sentiment.vader import SentimentIntensityAnalyzer
     try:
-         nltk.download('vader_lexicon')
-         logging.info("VADER lexicon downloaded successfully.")
-    except Exception as download_e:
-         logging.error(f"Failed to download VADER lexicon: {download_e}")
-         logging.error("Sentiment analysis will likely fail. Please try downloading manually:")
-         logging.error(">>> import nltk")
-         logging.error(">>> nltk.download('vader_lexicon')")
-except Exception as e:
-     logging.warning(f"Could not check/download VADER lexicon: {e}. Sentiment analysis might fail.")
-     logging.info("Attempting to proceed anyway...")
-# --- End VADER Download Logic ---
+        nltk.data.find('sentiment/vader_lexicon.zip')
+    except LookupError:
+        if not download:
+            raise LookupError("VADER lexicon not found. Run analyzer.warm_up() with downloads enabled, "
+                              "or: python -c \"import nltk; nltk.download('vader_lexicon')\"")
+        logging.info("Downloading VADER lexicon...")
+        if not nltk.download('vader_lexicon', quiet=True):
+            raise LookupError("Failed to download VADER lexicon")
+        logging.info("VADER lexicon downloaded successfully.")
+    return SentimentIntensityAnalyzer()
+
+def _get_vader(download=NLTK_AUTO_DOWNLOAD):
+    """
+    Returns the process-wide SentimentIntensityAnalyzer, creating it on first use. A failed load
+    is logged once and re-raised without retrying for VADER_RETRY_SECONDS (see sentiment_error()).
+    """
+    global _vader, _vader_error
+    if _vader is None:
+        with _vader_lock:
+            if _vader is None:
+                if _vader_error and time.monotonic() - _vader_error[0] < VADER_RETRY_SECONDS:
+                    raise LookupError(_vader_error[1])
+                try:
+                    _vader = _load_vader(download)
+                except Exception as e:
+                    _vader_error = (time.monotonic(), f"VADER unavailable: {e}")
+                    logging.error(f"{_vader_error[1]} - sentiment scores are NEUTRAL until it loads")
+                    raise LookupError(_vader_error[1]) from e
+                _vader_error = None
+    return _vader
+
+def sentiment_error():
+    """Why sentiment is being scored NEUTRAL (the last VADER load failure), or None when VADER works or hasn't been tried."""
+    return _vader_error[1] if _vader is None and _vader_error else None
+
+def _text_key(text):
+    return hashlib.blake2b(text.encode('utf-8'), digest_size=16).digest()
+
+def _score_text(text):
+    """Runs VADER on one (non-empty) text and attaches the label."""
+    vs = _get_vader().polarity_scores(text)
+    # Determine label based on compound score
+    if vs['compound'] >= 0.05:
+        vs['label'] = 'POSITIVE'
+    elif vs['compound'] <= -0.05:
+        vs['label'] = 'NEGATIVE'
+    else:
+        vs['label'] = 'NEUTRAL'
+    return vs
+
+def _memoized_scores(key, text):
+    """Looks the text up in the LRU memo, scoring and storing it on a miss."""
+    with _sentiment_memo_lock:
+        cached = _sentiment_memo.get(key)
+        if cached is not None:
+            _sentiment_memo.move_to_end(key)
+            return cached
+    vs = _score_text(text) # Score outside the lock; a racing duplicate just computes the same value
+    with _sentiment_memo_lock:
+        _sentiment_memo[key] = vs
+        _sentiment_memo.move_to_end(key)
+        while len(_sentiment_memo) > SENTIMENT_MEMO_SIZE:
+            _sentiment_memo.popitem(last=False)
+    return vs
 
 def analyze_sentiment(text):
     """
@@ -30,88 +102,120 @@ def analyze_sentiment(text):
     Returns a dictionary with positive, negative, neutral, and compound scores.
     """
     if not text or not isinstance(text, str):
-        return {'neg': 0.0, 'neu': 1.0, 'pos': 0.0, 'compound': 0.0, 'label': 'NEUTRAL'}
+        return dict(NEUTRAL_SENTIMENT)
 
     try:
-        analyzer = SentimentIntensityAnalyzer()
-        vs = analyzer.polarity_scores(text)
-
-        # Determine label based on compound score
-        if vs['compound'] >= 0.05:
-            vs['label'] = 'POSITIVE'
-        elif vs['compound'] <= -0.05:
-            vs['label'] = 'NEGATIVE'
-        else:
-            vs['label'] = 'NEUTRAL'
-        return vs
+        return dict(_memoized_scores(_text_key(text), text))
+    except LookupError:
+        return dict(NEUTRAL_SENTIMENT) # VADER missing: logged by _get_vader(), flagged by sentiment_error()
     except Exception as e:
         logging.error(f"Error during sentiment analysis: {e}")
         # Return neutral sentiment in case of error
-        return {'neg': 0.0, 'neu': 1.0, 'pos': 0.0, 'compound': 0.0, 'label': 'NEUTRAL'}
+        return dict(NEUTRAL_SENTIMENT)
+
+def analyze_sentiment_batch(texts):
+    """
+    Scores a list of texts, returning one result dict per input (same order).
+    Each distinct text is scored at most once: duplicates within the batch and
+    texts seen by earlier calls are served from the content-hash memo.
+    """
+    results = []
+    batch_scores = {} # key -> scores, for duplicates inside this batch
+    for text in texts:
+        if not text or not isinstance(text, str):
+            results.append(dict(NEUTRAL_SENTIMENT))
+            continue
+        try:
+            key = _text_key(text)
+            if key not in batch_scores:
+                batch_scores[key] = _memoized_scores(key, text)
+            results.append(dict(batch_scores[key]))
+        except LookupError:
+            results.append(dict(NEUTRAL_SENTIMENT)) # VADER missing: logged by _get_vader(), flagged by sentiment_error()
+        except Exception as e:
+            logging.error(f"Error during sentiment analysis: {e}")
+            results.append(dict(NEUTRAL_SENTIMENT))
+    return results
+
+def sentiment_memo_info():
+    """Current memo size and capacity."""
+    with _sentiment_memo_lock:
+        return {"size": len(_sentiment_memo), "max_size": SENTIMENT_MEMO_SIZE}
+
+
+# --- Gazetteer / Location Extraction ---
+GAZETTEER_PATH = os.environ.get("GAZETTEER_PATH", os.path.join(os.path.dirname(os.path.abspath(__file__)), "data", "gazetteer.tsv"))
+MAX_LOCATIONS = int(os.environ.get("MAX_LOCATIONS", 10)) # Max ranked locations returned
+_KIND_RANK = {"city": 0, "region": 1, "country": 2} # More specific places rank first on ties
+
+_location_matcher = None
+_location_matcher_lock = threading.Lock()
 
+def _load_gazetteer(path):
+    """Reads the gazetteer TSV into a list of entry dicts."""
+    entries = []
+    with open(path, newline='', encoding='utf-8') as f:
+        rows = csv.DictReader((line for line in f if not line.startswith('#')), delimiter='\t')
+        for row in rows:
+            entries.append({
+                "name": row["name"], "display": row["display"], "kind": row["kind"],
+                "lat": float(row["lat"]), "lon": float(row["lon"]), "population": int(row["population"] or 0),
+                "aliases": [alias for alias in row["aliases"].split('|') if alias],
+            })
+    return entries
+
+def _build_location_matcher(entries):
+    """
+    Compiles the gazetteer into one PhraseMatcher. Curated aliases take precedence over
+    plain names, then larger places over smaller ones ("London" -> London, UK).
+    All-caps aliases (NYC, UK, CA) only match in exactly that case; other names must be capitalized.
+    """
+    matcher = PhraseMatcher(require_capitalized=True)
+    entries = sorted(entries, key=lambda e: -e["population"])
+    for entry in entries:
+        for alias in entry["aliases"]:
+            matcher.add(alias, entry, case_sensitive=alias.isupper())
+    for entry in entries:
+        matcher.add(entry["name"], entry)
+    return matcher
+
+def _get_location_matcher():
+    """Loads and compiles the gazetteer once per process."""
+    global _location_matcher
+    if _location_matcher is None:
+        with _location_matcher_lock:
+            if _location_matcher is None:
+                entries = _load_gazetteer(GAZETTEER_PATH)
+                _location_matcher = _build_location_matcher(entries)
+                logging.info(f"Loaded gazetteer with {len(entries)} places ({len(_location_matcher)} phrases) from {GAZETTEER_PATH}")
+    return _location_matcher
 
 def extract_potential_locations(text_list):
     """
-    Placeholder function to simulate extracting geographical locations from text.
-    Improved slightly to handle None and filter duplicates better.
+    Extracts geographical locations mentioned in the texts using the bundled gazetteer.
+    Returns de-duplicated locations ranked by mention count, then specificity and size.
     """
-    locations = []
-    # Expanded patterns slightly
-    patterns = [
-        r'\b(San Francisco|New York|NYC|London|Berlin|Paris|Tokyo|Singapore|Bangalore|Mumbai|Delhi|Austin|Seattle)\b',
-        r'\b(USA|UK|United Kingdom|Germany|France|Japan|India|California|CA|NY|Texas|TX|Washington|WA)\b'
-    ]
-    # Filter out None values and join
+    # Filter out None values
     valid_texts = [str(t) for t in text_list if t]
-    combined_text = " ".join(valid_texts)
-    if not combined_text:
+    if not valid_texts:
         return [{"name": "Default Location (Unknown)", "lat": 37.4419, "lon": -122.1430}] # Palo Alto
 
-    found_places = set() # Use a set to store unique location names found
-
-    for pattern in patterns:
-        try:
-            matches = re.findall(pattern, combined_text, re.IGNORECASE)
-            for match in matches:
-                loc_data = None
-                match_lower = match.lower()
-                # More robust mapping needed for production
-                if match_lower in ["san francisco", "california", "ca", "sf"]:
-                    loc_name = "San Francisco, CA"
-                    if loc_name not in found_places:
-                        loc_data = {"name": loc_name, "lat": 37.7749, "lon": -122.4194}
-                elif match_lower in ["new york", "ny", "nyc"]:
-                    loc_name = "New York, NY"
-                    if loc_name not in found_places:
-                        loc_data = {"name": loc_name, "lat": 40.7128, "lon": -74.0060}
-                elif match_lower in ["london", "uk", "united kingdom"]:
-                    loc_name = "London, UK"
-                    if loc_name not in found_places:
-                         loc_data = {"name": loc_name, "lat": 51.5074, "lon": -0.1278}
-                elif match_lower == "berlin":
-                     loc_name = "Berlin, Germany"
-                     if loc_name not in found_places:
-                        loc_data = {"name": loc_name, "lat": 52.5200, "lon": 13.4050}
-                elif match_lower == "bangalore":
-                     loc_name = "Bangalore, India"
-                     if loc_name not in found_places:
-                        loc_data = {"name": loc_name, "lat": 12.9716, "lon": 77.5946}
-                elif match_lower in ["austin", "texas", "tx"]:
-                     loc_name = "Austin, TX"
-                     if loc_name not in found_places:
-                        loc_data = {"name": loc_name, "lat": 30.2672, "lon": -97.7431}
-                elif match_lower in ["seattle", "washington", "wa"]:
-                     loc_name = "Seattle, WA"
-                     if loc_name not in found_places:
-                         loc_data = {"name": loc_name, "lat": 47.6062, "lon": -122.3321}
-                # Add more mappings...
-
-                if loc_data:
-                     locations.append(loc_data)
-                     found_places.add(loc_data["name"]) # Add found name to set
-        except Exception as regex_e:
-            logging.error(f"Error during regex location extraction: {regex_e} on pattern: {pattern}")
+    mentions = {} # display name -> [entry, count, first position]
+    try:
+        matcher = _get_location_matcher()
+        position = 0
+        for text in valid_texts:
+            # Match texts separately so a phrase can't straddle two snippets
+            for entry, start, _end in matcher.find_all(text):
+                found = mentions.setdefault(entry["display"], [entry, 0, position + start])
+                found[1] += 1
+            position += len(text) + 1
+    except Exception as e:
+        logging.error(f"Error during gazetteer location extraction: {e}")
 
+    ranked = sorted(mentions.values(), key=lambda m: (-m[1], _KIND_RANK.get(m[0]["kind"], 3), -m[0]["population"], m[2]))
+    locations = [{"name": entry["display"], "lat": entry["lat"], "lon": entry["lon"], "kind": entry["kind"], "mentions": count}
+                 for entry, count, _first in ranked[:MAX_LOCATIONS]]
 
     # Add a default if none found after searching
     if not locations:
@@ -122,39 +226,37 @@ def extract_potential_locations(text_list):
     return locations
 
 
-def calculate_reputation_score(sentiment_scores, failed_startups=None):
+def calculate_reputation_score(sentiment_scores, failed_startups=None, controversy_hits=0, version=None):
     """
-    Calculates a reputation score based ONLY on web sentiment,
-    but is penalized if Failory found specific failure details.
-    Score calculation remains the same as before.
+    Calculates a reputation score from web sentiment, penalized if Failory found specific
+    failure details (and, from scoring weights that count them, by controversy hits).
+    The weights come from scoring.py (version None = scoring.SCORING_VERSION).
     """
-    if failed_startups is None:
-        failed_startups = []
-
-    # Calculate base score from sentiment
-    if not sentiment_scores:
-        base_score = 50 # Neutral default
-    else:
-        compound_score = sentiment_scores.get('compound', 0.0)
-        base_score = ((compound_score + 1) / 2) * 100
-        base_score = max(0, min(100, base_score)) # Clamp to 0-100
-
-    logging.debug(f"Base score from sentiment: {base_score:.2f}")
-
-    # Apply Penalty ONLY if specific failures were scraped (e.g., from Failory check)
-    penalty_factor = 1.0
-    num_failures = len(failed_startups) # This list comes from the 'failed_startups' key which should ONLY be populated if specific scraping found something
-
+    num_failures = len(failed_startups or []) # This list comes from the 'failed_startups' key which should ONLY be populated if specific scraping found something
+    compound = sentiment_scores.get('compound', 0.0) if sentiment_scores else None # No sentiment: neutral score
     if num_failures > 0:
         logging.info(f"Applying penalty: Found {num_failures} associated failure(s) potentially via Failory.")
-        penalty_reduction = 0.30 + (min(num_failures - 1, 2) * 0.05)
-        penalty_factor = 1.0 - penalty_reduction
-        logging.debug(f"Penalty factor applied: {penalty_factor:.2f}")
-    else:
-        logging.debug("No specific failures found from scraping source, no penalty applied to score.")
+    final_score = scoring.score(compound, num_failures, controversy_hits, version)
+    logging.info(f"Final reputation score: {final_score} (scoring {version or scoring.SCORING_VERSION})")
+    return final_score
 
-    final_score = base_score * penalty_factor
-    final_score = max(0, min(100, final_score)) # Clamp final score
 
-    logging.info(f"Final reputation score: {round(final_score)}")
-    return round(final_score)
\ No newline at end of file
+# --- Warm-up ---
+def warm_up(download=NLTK_AUTO_DOWNLOAD):
+    """
+    Loads the VADER lexicon and compiles the gazetteer now rather than on the first request.
+    Call once at process start (before forking workers, if preloading). Returns seconds spent per step;
+    a failed step is logged and left to load lazily.
+    """
+    timings = {}
+    for name, load in (("vader", lambda: _get_vader(download)), ("gazetteer", _get_location_matcher)):
+        started = time.perf_counter()
+        try:
+            load()
+        except Exception as e:
+            logging.error(f"Warm-up step '{name}' failed: {e}")
+            timings[name] = None
+            continue
+        timings[name] = round(time.perf_counter() - started, 3)
+    logging.info(f"Analyzer warm-up finished: {timings}")
+    return timings
@@ -1,13 +1,17 @@
 # app.py
-from flask import Flask, render_template, request, jsonify, url_for
-import scraper
-import analyzer
-from cache import init_cache, cache
+from flask import Flask, render_template, request, jsonify, url_for, g
+import time
+import pipeline
+import metrics
+import jobs
+import search_log
+import history
+import response_cache
+import prewarm
+import suggest
+from cache import cache, init_cache
 import os
 import logging
-import csv # Import csv module
-from datetime import datetime # Import datetime for timestamp
-import threading # Import threading for lock
 
 # Configure logging
 logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
@@ -19,71 +23,64 @@ app.secret_key = os.environ.get("FLASK_SECRET_KEY", "change-this-in-prod-to-a-re
 # Initialize caching
 init_cache(app)
 
-# --- Configuration ---
-LINKEDIN_EMAIL = os.environ.get("LINKEDIN_EMAIL", "your_linkedin_email@example.com")
-LINKEDIN_PASSWORD = os.environ.get("LINKEDIN_PASSWORD", "your_linkedin_password")
-
-# --- CSV Logging Setup ---
-CSV_FILE = 'search_log.csv'
-# Define explicit fieldnames for the CSV header
-CSV_FIELDNAMES = [
-    'timestamp', 'query', 'reputation_score', 'sentiment_label',
-    'linkedin_name', 'linkedin_location', 'linkedin_error',
-    'industry_identified', 'failory_specific_failure_found', 'failory_error',
-    'controversy_hits_count', 'controversies_error',
-    'location_names_found', 'cache_status'
-]
-# Create a lock for thread-safe file writing (important if using multi-process/thread server)
-csv_lock = threading.Lock()
-
-def log_search_to_csv(data, cache_status):
-    """Appends search data to the CSV log file."""
-    log_entry = {}
-    try:
-        # Prepare data for logging - handle potential missing keys gracefully
-        log_entry['timestamp'] = datetime.now().strftime('%Y-%m-%d %H:%M:%S')
-        log_entry['query'] = data.get('query', 'N/A')
-        log_entry['reputation_score'] = data.get('analysis', {}).get('reputation_score', 'N/A')
-        log_entry['sentiment_label'] = data.get('analysis', {}).get('sentiment_label', 'N/A')
-
-        # LinkedIn Data
-        linkedin_data = data.get('linkedin', {})
-        log_entry['linkedin_name'] = linkedin_data.get('name', 'N/A')
-        log_entry['linkedin_location'] = linkedin_data.get('location', 'N/A')
-        log_entry['linkedin_error'] = linkedin_data.get('error', '')
-
-        # Industry/Failory Data
-        insights_data = data.get('failure_industry_insights', {}) # Use the new key name here
-        log_entry['industry_identified'] = insights_data.get('identified_industry', 'N/A')
-        log_entry['failory_specific_failure_found'] = insights_data.get('specific_failure_found', False)
-        log_entry['failory_error'] = insights_data.get('error', '')
-
-        # Controversies Data
-        controversies_data = data.get('controversies', {})
-        log_entry['controversy_hits_count'] = len(controversies_data.get('potential_hits', []))
-        log_entry['controversies_error'] = controversies_data.get('error', '')
-
-        # Location Data
-        locations = data.get('analysis', {}).get('locations', [])
-        log_entry['location_names_found'] = ", ".join([loc.get('name', '') for loc in locations if loc.get('name')]) if locations else ''
-
-        log_entry['cache_status'] = cache_status
-
-        # Use lock to ensure thread safety when writing
-        with csv_lock:
-            # Check if file exists to write header
-            file_exists = os.path.isfile(CSV_FILE)
-            with open(CSV_FILE, mode='a', newline='', encoding='utf-8') as csvfile:
-                writer = csv.DictWriter(csvfile, fieldnames=CSV_FIELDNAMES)
-                if not file_exists or os.path.getsize(CSV_FILE) == 0:
-                    writer.writeheader() # Write header only if file is new or empty
-                writer.writerow(log_entry)
-            logging.info(f"Successfully logged search for '{log_entry['query']}' to {CSV_FILE}")
-
-    except Exception as e:
-        logging.error(f"Error writing to CSV log for query '{data.get('query', 'N/A')}': {e}")
-        # Log the problematic entry data for debugging if possible
-        logging.error(f"Data that caused error: {log_entry}")
+# --- Job API ---
+JOB_RETRY_AFTER_SECONDS = int(os.environ.get("JOB_RETRY_AFTER_SECONDS", 5)) # Retry-After sent with 429s
+
+# --- Search Logging ---
+search_log.sink.add_listener(history.record_batch) # Every logged search also lands in the indexed history store
+search_log.sink.add_listener(suggest.index.record_batch) # ...and in the /api/suggest index
+
+def log_search_to_csv(data, cache_status, query=None):
+    """Queues the search (logged under the query as typed) for the background CSV writer; never blocks or raises."""
+    search_log.sink.submit(data, cache_status, query)
+
+
+# --- Metrics (Prometheus text on /metrics, per-request spans in Server-Timing) ---
+FOUNDER_LOOKUPS = metrics.registry.counter("founder_lookups_total", "Founder record lookups by cache status.", ["cache_status"])
+CACHE_LOOKUPS = metrics.registry.counter("cache_lookups_total", "Cache lookups (founder records and per-source results) by result.", ["result"])
+CACHE_HIT_RATIO = metrics.registry.gauge("cache_hit_ratio", "Share of cache lookups served from cache, fresh or stale.")
+RESPONSE_CACHE = metrics.registry.counter("response_cache_total", "Rendered-response cache results (not_modified = 304 sent).", ["result"])
+
+def _collect_cache_metrics():
+    stats = cache.stats()
+    for result, field in (("hit", "hits"), ("stale", "stale_hits"), ("miss", "misses")):
+        CACHE_LOOKUPS.set_total(stats[field], result=result)
+    CACHE_HIT_RATIO.set(stats["hit_ratio"])
+    responses = response_cache.stats()
+    for result in ("hits", "misses", "not_modified"):
+        RESPONSE_CACHE.set_total(responses[result], result=result)
+
+metrics.registry.add_collector(_collect_cache_metrics)
+
+@app.before_request
+def _start_request_metrics():
+    g.metrics_started = time.perf_counter()
+    g.metrics_trace, g.metrics_token = metrics.start_trace()
+    metrics.IN_FLIGHT.inc()
+
+@app.after_request
+def _finish_request_metrics(response):
+    started = g.get("metrics_started")
+    if started is None: return response
+    elapsed = time.perf_counter() - started
+    metrics.HTTP_SERVER_SECONDS.observe(elapsed, endpoint=request.endpoint or "unmatched", method=request.method, status=response.status_code)
+    g.metrics_observed = True
+    timings = g.metrics_trace.server_timing()
+    response.headers['Server-Timing'] = f"{timings}, total;dur={elapsed * 1000:.1f}" if timings else f"total;dur={elapsed * 1000:.1f}"
+    return response
+
+@app.teardown_request
+def _end_request_metrics(exc):
+    if g.get("metrics_started") is None: return
+    if not g.get("metrics_observed"): # Unhandled exception: after_request didn't run
+        metrics.HTTP_SERVER_SECONDS.observe(time.perf_counter() - g.metrics_started, endpoint=request.endpoint or "unmatched", method=request.method, status=500)
+    metrics.IN_FLIGHT.dec()
+    metrics.end_trace(g.metrics_token)
+
+@app.route('/metrics')
+def prometheus_metrics():
+    """Prometheus scrape endpoint."""
+    return metrics.render(), 200, {'Content-Type': metrics.CONTENT_TYPE}
 
 
 # --- Routes ---
@@ -93,146 +90,161 @@ def index():
     """Renders the home page with the search form."""
     return render_template('index.html')
 
-@app.route('/search', methods=['POST'])
+@app.route('/search', methods=['GET', 'POST'])
 def search():
-    """Handles the search query, triggers scraping/analysis, and returns results."""
-    query = request.form.get('query')
+    """
+    Handles the search query, triggers scraping/analysis, and returns results.
+    The page is cached by the record's fingerprint; GET /search?query=... (what the search form sends) can revalidate it with If-None-Match.
+    """
+    query = request.values.get('query')
     if not query:
         return render_template('index.html', error="Please enter a founder or startup name.")
 
-    normalized_query = query.lower().strip()
-    cache_key = f"founder_data_{normalized_query.replace(' ', '_').replace('/', '_')}"
-    logging.info(f"Received search query: '{query}' (Normalized: '{normalized_query}', Cache Key: '{cache_key}')")
+    logging.info(f"Received search query: '{query}' (Cache Key: '{pipeline.founder_cache_key(query)}')")
+
+    # --- Cached Fetch (sources are fetched concurrently on a miss; stale hits refresh in the background) ---
+    try:
+        with metrics.stage("founder_data"):
+            founder_data, cache_status = pipeline.get_founder_data(query)
+    except Exception as e:
+         # Handle potential errors during fetching/analysis
+         logging.error(f"An error occurred during data fetching/analysis for query '{query}': {e}", exc_info=True) # Log full traceback
+         # Return an error page or message
+         return render_template('index.html', error=f"An error occurred while processing your request for '{query}'. Please try again later."), 500
+    logging.info(f"Cache {cache_status} for query: '{query}'")
+    FOUNDER_LOOKUPS.inc(cache_status=cache_status)
 
-    founder_data = None
-    cache_status = "HIT" # Assume hit initially
+    # --- Log to CSV (every search, including cache hits; written in the background) ---
+    log_search_to_csv(founder_data, cache_status, query)
 
-    # --- Manual Caching Logic ---
-    cached_data = cache.get(cache_key)
-    if cached_data:
-        logging.info(f"Cache HIT for query: '{query}' (Key: '{cache_key}')")
-        founder_data = cached_data
-        # Note: We don't log cache hits to CSV by default, but could add it here if needed.
-        return render_template('results.html', data=founder_data)
-    else:
-        logging.info(f"Cache MISS for query: '{query}' (Key: '{cache_key}'). Fetching data...")
-        cache_status = "MISS" # Update cache status
-        # --- Data Fetching and Analysis (if not in cache) ---
-        try:
-            # 1. LinkedIn (Simulated)
-            logging.info("Fetching (simulated) LinkedIn data...")
-            linkedin_profile_url_placeholder = f"https://www.linkedin.com/in/{normalized_query.replace(' ','-')}"
-            linked_data = scraper.scrape_linkedin_profile(linkedin_profile_url_placeholder, LINKEDIN_EMAIL, LINKEDIN_PASSWORD)
-
-            # 2. Failure/Industry Insights (Refactored Scraper)
-            logging.info("Fetching Failure/Industry insights...")
-            failure_industry_insights = scraper.get_failure_and_industry_insights(query) # Use new function
-
-            # 3. General Web Sentiment
-            logging.info("Fetching web sentiment data...")
-            web_sentiment_data_raw = scraper.search_web_for_sentiment(query)
-
-            # 4. Controversies Search
-            logging.info("Fetching controversies data...")
-            controversies_data = scraper.search_for_controversies(query)
-
-            # --- Process Web Snippets for Sentiment (Backend Analysis) ---
-            analyzed_web_snippets = []
-            if web_sentiment_data_raw and web_sentiment_data_raw.get("snippets"):
-                logging.info(f"Analyzing {len(web_sentiment_data_raw['snippets'])} web snippets individually...")
-                for snippet_text in web_sentiment_data_raw.get("snippets", []):
-                    if isinstance(snippet_text, str) and snippet_text.strip():
-                        snippet_sentiment = analyzer.analyze_sentiment(snippet_text)
-                        analyzed_web_snippets.append({"text": snippet_text, "sentiment": snippet_sentiment})
-                    else: logging.warning(f"Skipping invalid snippet for analysis: {snippet_text}")
-            else: logging.info("No web snippets found to analyze individually.")
-
-            # --- Data Aggregation and Structuring ---
-            logging.info("Aggregating fetched data...")
-            founder_data = {
-                "query": query,
-                "linkedin": linked_data,
-                "failure_industry_insights": failure_industry_insights, # Use new key
-                "web_sentiment": {
-                    "original_snippets": web_sentiment_data_raw.get("snippets", []),
-                    "overall_sentiment": web_sentiment_data_raw.get("overall_sentiment", {}),
-                    "analyzed_snippets": analyzed_web_snippets,
-                    "error": web_sentiment_data_raw.get("error")
-                },
-                "controversies": controversies_data,
-                "analysis": {}
-            }
-
-            # --- Further Analysis ---
-            logging.info("Performing final analysis (score, label, locations)...")
-            # Use 'failed_startups' key from insights data for penalty calc
-            specific_failures_found_list = failure_industry_insights.get("failed_startups", [])
-            founder_data["analysis"]["reputation_score"] = analyzer.calculate_reputation_score(
-                sentiment_scores=founder_data["web_sentiment"]["overall_sentiment"],
-                failed_startups=specific_failures_found_list
-            )
-            founder_data["analysis"]["sentiment_label"] = founder_data["web_sentiment"]["overall_sentiment"].get('label', 'NEUTRAL')
-
-            # Location Extraction
-            texts_for_location = []
-            if linked_data: texts_for_location.extend([linked_data.get("location"), linked_data.get("headline")])
-            # Add failure detail snippets for location context if they exist
-            if failure_industry_insights.get("failure_details"):
-                for detail in failure_industry_insights["failure_details"]: texts_for_location.append(detail.get("snippet"))
-            texts_for_location.extend(founder_data["web_sentiment"]["original_snippets"]) # Use original snippets
-            texts_for_location_filtered = [str(text) for text in texts_for_location if text and isinstance(text, str)]
-            founder_data["analysis"]["locations"] = analyzer.extract_potential_locations(texts_for_location_filtered)
-
-
-            # --- Store the fetched data in cache BEFORE rendering ---
-            logging.info(f"Storing results in cache with key: {cache_key}")
-            cache.set(cache_key, founder_data, timeout=1800)
-
-            # --- Log to CSV ---
-            log_search_to_csv(founder_data, cache_status) # Log the data
-
-        except Exception as e:
-             # Handle potential errors during fetching/analysis
-             logging.error(f"An error occurred during data fetching/analysis for query '{query}': {e}", exc_info=True) # Log full traceback
-             # Return an error page or message
-             return render_template('index.html', error=f"An error occurred while processing your request for '{query}'. Please try again later."), 500
-
-        # --- Render Results Page ---
-        logging.info(f"Rendering results page for query: '{query}'")
-        return render_template('results.html', data=founder_data)
+    # --- Render Results Page ---
+    logging.info(f"Rendering results page for query: '{query}'")
+    with metrics.stage("render"):
+        return response_cache.cached_response('results.html', response_cache.record_tag(founder_data), mimetype='text/html',
+                                              produce=lambda: render_template('results.html', data=founder_data).encode('utf-8'))
 
 
 # --- API Endpoint (Optional - Update structure if used) ---
 @app.route('/api/verify', methods=['GET'])
 def api_verify():
     """Optional API endpoint - Returns cached data or placeholder."""
-    # ... (keep previous implementation or update keys: 'failure_industry_insights') ...
     query = request.args.get('query')
     if not query: return jsonify({"error": "Query parameter is required"}), 400
-    normalized_query = query.lower().strip()
-    cache_key = f"founder_data_{normalized_query.replace(' ', '_').replace('/', '_')}"
-    cached_data = cache.get(cache_key)
-    if cached_data:
-        logging.info(f"API Cache HIT for query: '{query}'")
-        return jsonify(cached_data)
+    founder_data, cache_status = pipeline.get_founder_data(query, fetch_on_miss=False)
+    FOUNDER_LOOKUPS.inc(cache_status=cache_status)
+    if founder_data:
+        logging.info(f"API Cache {cache_status} for query: '{query}'")
+        return response_cache.cached_response('verify.json', response_cache.record_tag(founder_data),
+                                              lambda: response_cache.json_body(founder_data), mimetype='application/json')
     else:
         logging.warning(f"API Cache MISS for query: '{query}'. Returning placeholder.")
         placeholder_data = { "query": query, "status": "Data not found in cache via API.", # ... add other keys with placeholder status ...
-                           "failure_industry_insights": {"status": "Data not fetched via API"} }
+                           "failure_industry_insights": {"status": "Data not fetched via API"},
+                           "hint": "POST /api/jobs with {\"query\": ...} to start a verification." }
         return jsonify(placeholder_data), 404
 
 
+# --- Search History Stats ---
+def _int_arg(name, default, maximum):
+    value = request.args.get(name, default)
+    try:
+        value = int(value)
+    except (TypeError, ValueError):
+        raise ValueError(f"{name} must be an integer")
+    if value < 1: raise ValueError(f"{name} must be positive")
+    return min(value, maximum)
+
+def _history_response(answer):
+    """Runs a history query, mapping bad arguments to 400 and a missing store to 503."""
+    store = history.get_store()
+    if store is None: return jsonify({"error": "Search history is unavailable"}), 503
+    try:
+        return jsonify(answer(store))
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+
+@app.route('/api/stats', methods=['GET'])
+def api_stats_summary():
+    """Totals over the last ?days=N (default 7): searches, average score, controversy and failure rates."""
+    return _history_response(lambda store: store.summary(_int_arg('days', 7, 3650)))
+
+@app.route('/api/stats/industries', methods=['GET'])
+def api_stats_industries():
+    """Most searched industries over the last ?days=N, up to ?limit=N."""
+    return _history_response(lambda store: store.top_industries(_int_arg('days', 7, 3650), _int_arg('limit', 10, 100)))
+
+@app.route('/api/stats/trend', methods=['GET'])
+def api_stats_trend():
+    """Per-day searches, average score and hit rates over the last ?days=N (default 30)."""
+    return _history_response(lambda store: store.daily_trend(_int_arg('days', 30, 3650)))
+
+@app.route('/api/stats/founder', methods=['GET'])
+def api_stats_founder():
+    """Score history for one founder/startup (?query=...), newest first."""
+    query = request.args.get('query')
+    if not query: return jsonify({"error": "Query parameter is required"}), 400
+    return _history_response(lambda store: store.founder_history(query, _int_arg('limit', 100, history.MAX_HISTORY_ROWS)))
+
+
+# --- Name Suggestions (pick an existing canonical entry instead of starting a new scrape) ---
+@app.route('/api/suggest', methods=['GET'])
+def api_suggest():
+    """Verified founders/startups matching the typed text (?q=...), up to ?limit=N (default 8)."""
+    text = request.args.get('q', '')
+    try:
+        limit = _int_arg('limit', 8, 50)
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+    return jsonify({"query": text, "suggestions": suggest.index.suggest(text, limit)})
+
+
+# --- Asynchronous Verification Jobs ---
+def _log_job_result(job):
+    """Jobs log to the CSV exactly like /search does."""
+    log_search_to_csv(job.result, job.cache_status, job.query)
+
+job_manager = jobs.JobManager(run_fn=pipeline.get_founder_data, key_fn=pipeline.founder_cache_key, on_complete=_log_job_result)
+
+@app.route('/api/jobs', methods=['POST'])
+def api_submit_job():
+    """Queues a verification; returns 202 with a job id to poll, or 429 when the queue is full."""
+    payload = request.get_json(silent=True) or request.form
+    if not isinstance(payload, dict): # A JSON list, string or number (form data is a MultiDict, a dict)
+        return jsonify({"error": "JSON body must be an object"}), 400
+    query = (payload.get('query') or '').strip()
+    priority = payload.get('priority', 'normal')
+    if not query: return jsonify({"error": "Query parameter is required"}), 400
+    if priority not in jobs.PRIORITIES:
+        return jsonify({"error": f"priority must be one of {sorted(jobs.PRIORITIES)}"}), 400
+    try:
+        job = job_manager.submit(query, priority)
+    except jobs.QueueFullError as e:
+        logging.warning(f"Rejecting job for '{query}': {e}")
+        response = jsonify({"error": "Verification queue is full, retry later."})
+        response.headers['Retry-After'] = str(JOB_RETRY_AFTER_SECONDS)
+        return response, 429
+    status_url = url_for('api_job_status', job_id=job.id)
+    response = jsonify({"job_id": job.id, "status": job.status, "status_url": status_url})
+    response.headers['Location'] = status_url
+    return response, 202
+
+@app.route('/api/jobs/<job_id>', methods=['GET'])
+def api_job_status(job_id):
+    """Job status (and result when done). ?wait=N long-polls up to N seconds for completion."""
+    try:
+        wait_seconds = float(request.args.get('wait', 0))
+    except ValueError:
+        return jsonify({"error": "wait must be a number of seconds"}), 400
+    job = job_manager.wait(job_id, wait_seconds)
+    if job is None: return jsonify({"error": "Unknown or expired job id"}), 404
+    return jsonify(job.to_dict())
+
+
 # --- Run the App ---
 if __name__ == '__main__':
     logging.info("Starting Founder Verifier Flask application...")
-    # Create dummy CSV file with header if it doesn't exist on startup
-    if not os.path.isfile(CSV_FILE) or os.path.getsize(CSV_FILE) == 0:
-         try:
-             with open(CSV_FILE, mode='w', newline='', encoding='utf-8') as csvfile:
-                 writer = csv.DictWriter(csvfile, fieldnames=CSV_FIELDNAMES)
-                 writer.writeheader()
-             logging.info(f"Initialized empty log file: {CSV_FILE}")
-         except Exception as init_csv_e:
-             logging.error(f"Failed to initialize CSV log file {CSV_FILE}: {init_csv_e}")
-
+    pipeline.analyzer.warm_up() # Load the sentiment lexicon and gazetteer before serving
+    # Cache prewarming is opt-in and runs in one process only: with the reloader, in the child that serves requests.
+    # Under a WSGI server, run `python prewarm.py run` once instead.
+    if prewarm.PREWARM_ENABLED and os.environ.get("WERKZEUG_RUN_MAIN") == "true": prewarm.scheduler.start()
     app.run(debug=True, host='0.0.0.0', port=5001) # debug=False for production
\ No newline at end of file
@@ -0,0 +1,230 @@
+# batch_verify.py
+"""
+Bulk founder/startup verification.
+
+Reads names from a CSV or JSONL file, runs the same scraper/analyzer pipeline as
+/search with bounded concurrency and per-host request budgets, and streams one
+JSON record per name to the output file as soon as it finishes. The output file
+doubles as the checkpoint: re-running with the same output skips names that
+already have a successful record, so an interrupted run resumes where it stopped.
+
+    python batch_verify.py founders.csv -o results.jsonl --concurrency 4
+    python batch_verify.py founders.jsonl -o results.jsonl --rate html.duckduckgo.com=0.5
+"""
+import os
+import csv
+import sys
+import json
+import time
+import argparse
+import logging
+import threading
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
+
+import http_client
+import rate_limit
+import pipeline
+import normalize
+
+logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+
+DEFAULT_RATE_LIMITS = "html.duckduckgo.com=1:2,www.failory.com=2:4" # Requests/second[:burst] per host
+NAME_FIELDS = ("query", "name", "founder", "startup", "company") # Column/field names tried in order
+PROGRESS_EVERY = 25
+FSYNC_EVERY = 50 # Records between fsyncs of the output file
+
+
+def read_names(path, field=None):
+    """Yields names from a .txt (one name per line, no header), CSV (header row) or JSONL file, in file order."""
+    if path.endswith(".txt"):
+        with open(path, encoding="utf-8") as f:
+            for line in f:
+                if line.strip(): yield line.strip()
+    elif path.endswith(".jsonl") or path.endswith(".ndjson"):
+        with open(path, encoding="utf-8") as f:
+            for line_number, line in enumerate(f, 1):
+                if not line.strip(): continue
+                try:
+                    record = json.loads(line)
+                except json.JSONDecodeError as e:
+                    logging.warning(f"Skipping malformed JSON on line {line_number}: {e}")
+                    continue
+                if isinstance(record, str):
+                    yield record
+                    continue
+                key = field or next((name for name in NAME_FIELDS if record.get(name)), None)
+                if key and record.get(key): yield str(record[key])
+    else:
+        with open(path, newline="", encoding="utf-8") as f:
+            reader = csv.DictReader(f)
+            key = field or next((name for name in NAME_FIELDS if name in (reader.fieldnames or [])), None)
+            key = key or (reader.fieldnames or [None])[0] # Fall back to the first column
+            for row in reader:
+                if row.get(key): yield row[key]
+
+
+def load_checkpoint(output_path):
+    """Cache keys of names that already have a successful record in the output file."""
+    finished = set()
+    if not os.path.isfile(output_path):
+        return finished
+    with open(output_path, encoding="utf-8") as f:
+        for line in f:
+            try:
+                record = json.loads(line)
+            except json.JSONDecodeError:
+                continue # A half-written line from an interrupted run
+            if record.get("status") == "ok":
+                finished.add(pipeline.founder_cache_key(record["query"]))
+    return finished
+
+
+def verify_one(query, use_cache):
+    """Runs the pipeline for one name and returns the output record."""
+    started = time.monotonic()
+    try:
+        if use_cache:
+            founder_data, cache_status = pipeline.get_founder_data(query)
+        else:
+            founder_data, cache_status = pipeline.run_pipeline(normalize.display_name(query)), "BYPASS"
+    except Exception as e:
+        logging.error(f"Verification failed for '{query}': {e}")
+        return {"query": query, "status": "error", "error": str(e), "elapsed": round(time.monotonic() - started, 3)}
+
+    insights = founder_data.get("failure_industry_insights", {})
+    return {
+        "query": query,
+        "status": "ok",
+        "cache_status": cache_status,
+        "reputation_score": founder_data["analysis"].get("reputation_score"),
+        "score_version": founder_data["analysis"].get("score_version"),
+        "sentiment_label": founder_data["analysis"].get("sentiment_label"),
+        "industry": insights.get("identified_industry"),
+        "failure_found": insights.get("specific_failure_found", False),
+        "controversy_hits": len(founder_data.get("controversies", {}).get("potential_hits", [])),
+        "locations": [loc.get("name") for loc in founder_data["analysis"].get("locations", [])],
+        "source_status": founder_data.get("source_status", {}),
+        "elapsed": round(time.monotonic() - started, 3),
+        "data": founder_data,
+    }
+
+
+class ResultWriter:
+    """Appends JSONL records, flushing each so a crash loses at most the line being written."""
+
+    def __init__(self, path):
+        needs_newline = os.path.isfile(path) and os.path.getsize(path) > 0
+        if needs_newline:
+            with open(path, "rb") as f:
+                f.seek(-1, os.SEEK_END)
+                needs_newline = f.read(1) != b"\n"
+        self._file = open(path, "a", encoding="utf-8")
+        if needs_newline: self._file.write("\n") # Terminate a partial line left by an interrupted run
+        self._lock = threading.Lock()
+        self._unsynced = 0
+
+    def write(self, record):
+        line = json.dumps(record, ensure_ascii=False, default=str)
+        with self._lock:
+            self._file.write(line + "\n")
+            self._file.flush()
+            self._unsynced += 1
+            if self._unsynced >= FSYNC_EVERY:
+                os.fsync(self._file.fileno())
+                self._unsynced = 0
+
+    def close(self):
+        with self._lock:
+            self._file.flush()
+            os.fsync(self._file.fileno())
+            self._file.close()
+
+
+def run_batch(names, output_path, concurrency=4, use_cache=True, include_data=True):
+    """Verifies names with at most `concurrency` in flight; returns a summary dict."""
+    finished = load_checkpoint(output_path)
+    writer = ResultWriter(output_path)
+    totals = Counter()
+    source_failures = Counter()
+    seen = set()
+    started = time.monotonic()
+
+    def record_result(record):
+        totals[record["status"]] += 1
+        if record["status"] == "ok":
+            for source, info in record["source_status"].items():
+                if info.get("status") not in (pipeline.SOURCE_OK, pipeline.SOURCE_CACHED):
+                    source_failures[f"{source}:{info.get('status')}"] += 1
+            if not include_data: record.pop("data", None)
+        else:
+            source_failures["pipeline:error"] += 1
+        writer.write(record)
+        done = totals["ok"] + totals["error"]
+        if done % PROGRESS_EVERY == 0:
+            rate = done / max(time.monotonic() - started, 1e-9) * 60
+            logging.info(f"Progress: {done} verified ({totals['error']} errors), {rate:.1f} names/min")
+
+    pool = ThreadPoolExecutor(max_workers=concurrency, thread_name_prefix="batch")
+    pending = set()
+    try:
+        for name in names:
+            name = name.strip()
+            key = pipeline.founder_cache_key(name) if name else None
+            if not key or key in seen: continue
+            seen.add(key)
+            if key in finished:
+                totals["skipped"] += 1
+                continue
+            # Keep a bounded window of submitted work so huge inputs aren't queued in memory
+            while len(pending) >= concurrency * 2:
+                done, pending = wait(pending, return_when=FIRST_COMPLETED)
+                for future in done: record_result(future.result())
+            pending.add(pool.submit(verify_one, name, use_cache))
+        for future in pending:
+            record_result(future.result())
+    except KeyboardInterrupt:
+        logging.warning("Interrupted: finishing in-flight names; re-run with the same output to resume.")
+        for future in pending:
+            if future.cancel(): continue
+            record_result(future.result())
+    finally:
+        pool.shutdown(wait=True)
+        writer.close()
+
+    elapsed = time.monotonic() - started
+    verified = totals["ok"] + totals["error"]
+    return {
+        "verified": verified, "ok": totals["ok"], "errors": totals["error"], "skipped_from_checkpoint": totals["skipped"],
+        "elapsed_seconds": round(elapsed, 2), "names_per_minute": round(verified / elapsed * 60, 2) if elapsed else 0.0,
+        "source_failures": dict(source_failures), "http": http_client.get_pool_stats(),
+        "rate_limits": rate_limit.limiter.stats(),
+    }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Verify a CSV/JSONL list of founders or startups.")
+    parser.add_argument("input", help="CSV with a header row, JSONL (one object or string per line), or .txt (one name per line)")
+    parser.add_argument("-o", "--output", required=True, help="JSONL output; also the resume checkpoint")
+    parser.add_argument("--field", help=f"Column/field holding the name (default: first of {', '.join(NAME_FIELDS)})")
+    parser.add_argument("--concurrency", type=int, default=4, help="Names verified in parallel (default: 4)")
+    parser.add_argument("--rate", action="append", default=[], metavar="HOST=RPS[:BURST]",
+                        help=f"Per-host request budget; repeatable (default: {DEFAULT_RATE_LIMITS})")
+    parser.add_argument("--no-cache", action="store_true", help="Always re-scrape instead of using cached results")
+    parser.add_argument("--summary-only", action="store_true", help="Omit the full founder_data from each record")
+    args = parser.parse_args(argv)
+
+    rate_limits = rate_limit.parse_rate_limits(",".join(args.rate) if args.rate else DEFAULT_RATE_LIMITS)
+    for host, (rate, burst) in rate_limits.items():
+        rate_limit.limiter.configure(host, rate, burst)
+    logging.info(f"Batch verification: concurrency={args.concurrency}, rate limits={rate_limits}")
+    pipeline.analyzer.warm_up()
+
+    summary = run_batch(read_names(args.input, args.field), args.output, concurrency=args.concurrency,
+                        use_cache=not args.no_cache, include_data=not args.summary_only)
+    print(json.dumps(summary, indent=2))
+    return 0 if summary["errors"] == 0 else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,96 @@
+# benchmarks/bench_browser_pool.py
+"""
+Exercises BrowserPool with a fake driver (no browser needed): N concurrent
+"queries" against a pool of K browsers with a simulated startup cost, compared
+to starting a browser per query. Also checks recycling after max_uses, crash
+replacement, checkout timeouts and idle reaping.
+
+Run from the repo root:  python benchmarks/bench_browser_pool.py [N]
+"""
+import os
+import sys
+import time
+import itertools
+from concurrent.futures import ThreadPoolExecutor
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from browser_pool import BrowserPool, BrowserPoolExhausted
+
+STARTUP_SECONDS = 0.3 # Roughly a headless Chrome launch, scaled down
+PAGE_SECONDS = 0.05
+_ids = itertools.count(1)
+
+
+class FakeDriver:
+    def __init__(self):
+        time.sleep(STARTUP_SECONDS)
+        self.id = next(_ids)
+        self.alive = True
+        self.quit_called = False
+
+    @property
+    def current_url(self):
+        if not self.alive: raise RuntimeError("session deleted because of page crash")
+        return "about:blank"
+
+    def get(self, url):
+        if not self.alive: raise RuntimeError("session deleted because of page crash")
+        time.sleep(PAGE_SECONDS)
+
+    def quit(self):
+        self.quit_called = True
+
+
+def run_queries(n, fetch):
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=8) as pool:
+        list(pool.map(fetch, range(n)))
+    return time.perf_counter() - started
+
+
+if __name__ == '__main__':
+    n = int(sys.argv[1]) if len(sys.argv) > 1 else 40
+
+    def fresh_browser_per_query(_):
+        driver = FakeDriver()
+        driver.get("https://example.com")
+        driver.quit()
+    unpooled = run_queries(n, fresh_browser_per_query)
+
+    pool = BrowserPool(FakeDriver, max_size=4, max_uses=8, idle_seconds=0)
+    def pooled_query(_):
+        with pool.browser() as driver:
+            driver.get("https://example.com")
+    pooled = run_queries(n, pooled_query)
+    stats = pool.stats()
+    print(f"{n} queries: new browser each {unpooled:.2f}s, pool of 4 {pooled:.2f}s; {stats}")
+    assert stats["live"] <= 4 and stats["created"] >= 4
+    assert stats["recycled"] >= 1, stats # Each browser is replaced after 8 uses
+
+    # A crashed browser is detected at return/checkout and replaced
+    with pool.browser() as driver: crashed = driver
+    crashed.alive = False
+    seen = set()
+    for _ in range(4):
+        with pool.browser() as driver: seen.add(driver.id)
+    assert crashed.id not in seen and crashed.quit_called, "crashed browser was reused"
+    assert pool.stats()["unhealthy"] >= 1
+
+    # Exhaustion: all browsers checked out -> the next checkout times out
+    held = [pool.checkout() for _ in range(4)]
+    try:
+        pool.checkout(timeout=0.1)
+        raise AssertionError("expected BrowserPoolExhausted")
+    except BrowserPoolExhausted:
+        pass
+    for pooled_browser in held: pool.checkin(pooled_browser)
+
+    # Idle reaping
+    pool.idle_seconds = 0.01
+    time.sleep(0.05)
+    idle = pool.stats()["idle"]
+    reaped = pool.reap_idle()
+    assert reaped == idle > 0 and pool.stats()["live"] == 0, pool.stats()
+    pool.close()
+    print(f"OK: recycling, crash replacement, checkout timeout and idle reaping behave; final stats {pool.stats()}")
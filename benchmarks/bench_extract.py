@@ -0,0 +1,94 @@
+# benchmarks/bench_extract.py
+"""
+Parse time and peak memory per page: the previous BeautifulSoup tree + find_all
+extraction vs extract.py (lxml + compiled XPath), on the saved fixture pages in
+benchmarks/fixtures/. Also checks that both produce the same records.
+Peak memory is the Python heap as seen by tracemalloc; libxml2's own C buffers
+(freed when the parse returns) are not included for either side.
+
+The fixtures are representative pages built to match the markup of DuckDuckGo's
+HTML endpoint and Failory's Webflow templates (result__body/result__a/result__snippet,
+uddg redirect links, the "Next" nav form, fs-cmsfilter_list, rich-text-block).
+
+Run from the repo root:  python benchmarks/bench_extract.py [rounds]
+"""
+import os
+import sys
+import time
+import statistics
+import tracemalloc
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from bs4 import BeautifulSoup
+import extract
+
+FIXTURES = os.path.join(os.path.dirname(os.path.abspath(__file__)), "fixtures")
+
+
+# --- Previous implementation (as it was in scraper.py) ---
+def bs4_ddg_results(page_html):
+    soup = BeautifulSoup(page_html, 'lxml')
+    records = []
+    for div in soup.find_all('div', class_='result__body'):
+        snippet_tag = div.find('a', class_='result__snippet')
+        title_tag = div.find('a', class_='result__a')
+        link_url = title_tag['href'] if title_tag and title_tag.has_attr('href') else '#'
+        if snippet_tag and snippet_tag.text.strip():
+            records.append((title_tag.text.strip() if title_tag else "Result Title", link_url, snippet_tag.text.strip()))
+    return records
+
+
+def bs4_failory_links(page_html):
+    soup = BeautifulSoup(page_html, 'lxml')
+    container = soup.find('div', class_='fs-cmsfilter_list') or soup
+    return [(link.get('href', ''), link.text) for link in container.find_all('a', href=True)]
+
+
+def bs4_failory_article(page_html):
+    soup = BeautifulSoup(page_html, 'lxml')
+    title_elem = soup.find('h1')
+    content_div = soup.find('div', class_='rich-text-block') or soup.find('article')
+    paragraphs = [p.text.strip() for p in content_div.find_all(['p', 'li'])] if content_div else []
+    return (title_elem.text.strip() if title_elem else "Failory Article", paragraphs)
+
+
+CASES = [
+    ("ddg_results.html", bs4_ddg_results,
+     lambda page: [(r.title, r.url, r.snippet) for r in extract.parse_ddg_results(page)],
+     lambda records: [(title, extract.unwrap_ddg_url(url), snippet) for title, url, snippet in records]),
+    ("ddg_controversy.html", bs4_ddg_results,
+     lambda page: [(r.title, r.url, r.snippet) for r in extract.parse_ddg_results(page)],
+     lambda records: [(title, extract.unwrap_ddg_url(url), snippet) for title, url, snippet in records]),
+    ("failory_search.html", bs4_failory_links,
+     lambda page: [tuple(link) for link in extract.parse_failory_links(page)], None),
+    ("failory_article.html", bs4_failory_article,
+     lambda page: (lambda a: (a.title, a.paragraphs))(extract.parse_failory_article(page, "https://www.failory.com/x")), None),
+]
+
+
+def measure(fn, page, rounds):
+    timings = []
+    for _ in range(rounds):
+        started = time.perf_counter()
+        fn(page)
+        timings.append(time.perf_counter() - started)
+    tracemalloc.start()
+    fn(page)
+    _current, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return statistics.median(timings) * 1000, peak / 1024
+
+
+if __name__ == '__main__':
+    rounds = int(sys.argv[1]) if len(sys.argv) > 1 else 50
+    print(f"{'fixture':<24}{'KB':>6}{'bs4 ms':>9}{'lxml ms':>9}{'speedup':>9}{'bs4 peak KB':>13}{'lxml peak KB':>14}")
+    for name, old, new, normalise_old in CASES:
+        with open(os.path.join(FIXTURES, name), encoding='utf-8') as f:
+            page = f.read()
+        expected = old(page)
+        expected = normalise_old(expected) if normalise_old else expected
+        assert new(page) == expected, f"{name}: extraction differs from the BeautifulSoup version"
+        old_ms, old_kb = measure(old, page, rounds)
+        new_ms, new_kb = measure(new, page, rounds)
+        print(f"{name:<24}{len(page) / 1024:>6.0f}{old_ms:>9.2f}{new_ms:>9.2f}{old_ms / new_ms:>8.1f}x{old_kb:>13.0f}{new_kb:>14.0f}")
@@ -0,0 +1,132 @@
+# benchmarks/bench_record_size.py
+"""
+Cache entry size per founder: the record pickled as-is (the previous cache payload)
+vs record_codec's compact format, for the founders in search_log.csv. Also checks
+that every record round-trips unchanged and times encode/decode.
+
+Records are rebuilt offline with the real aggregation code (pipeline.build_founder_data)
+from the saved fixture pages: DuckDuckGo snippets with the founder's name substituted,
+as many controversy hits as the log recorded, and one Failory article for founders
+the log marks as a known failure.
+
+Run from the repo root:  python benchmarks/bench_record_size.py [search_log.csv]
+"""
+import os
+import csv
+import sys
+import time
+import pickle
+import logging
+import statistics
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+os.environ.setdefault("CACHE_BACKEND", "memory")
+
+import analyzer
+import extract
+import http_client
+import pipeline
+import scraper
+import record_codec
+from cache import CACHE_MEMORY_BYTES, _ENTRY_OVERHEAD_BYTES
+
+REPO = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+FIXTURES = os.path.join(REPO, "benchmarks", "fixtures")
+FIXTURE_SUBJECT = "Zepto" # Name the fixture pages were captured for
+
+
+def _fixture(name):
+    with open(os.path.join(FIXTURES, name), encoding="utf-8") as f:
+        return f.read()
+
+
+class _FixtureResponse:
+    status_code = 200
+
+    def __init__(self, text):
+        self.text = text
+
+    def raise_for_status(self):
+        pass
+
+
+def founders_from_log(path):
+    """Distinct founders (by cache key) in the log, with the fields used to shape their records."""
+    founders = {}
+    with open(path, newline="", encoding="utf-8") as f:
+        for row in csv.DictReader(f):
+            key = pipeline.founder_cache_key(row["query"])
+            founders.setdefault(key, {
+                "query": row["query"],
+                "failure_found": row.get("failory_specific_failure_found") == "True",
+                "controversy_hits": int(row.get("controversy_hits_count") or 0),
+            })
+    return list(founders.values())
+
+
+def build_record(founder, general, controversy, article_html):
+    query = founder["query"]
+    rename = lambda text: text.replace(FIXTURE_SUBJECT, query)
+    snippets = [rename(result.snippet) for result in general[:10]]
+    hits = [{**result._asdict(), "snippet": rename(result.snippet), "title": rename(result.title)}
+            for result in controversy[:founder["controversy_hits"]]]
+    insights = {
+        "source": "Failory Scrape & Internal KB", "failory_search_url": f"{scraper.FAILORY_BASE_URL}/search?query={query}",
+        "specific_failure_found": founder["failure_found"], "failure_details": [], "failed_startups": [],
+        "identified_industry": scraper._identify_industry(query), "industry_ranking": [], "industry_learnings": None, "error": None,
+    }
+    insights["industry_learnings"] = scraper._get_industry_learnings(insights["identified_industry"])
+    if founder["failure_found"]:
+        url = f"{scraper.FAILORY_BASE_URL}/cemetery/{query.lower().replace(' ', '-')}"
+        http_client.get = lambda *_args, **_kwargs: _FixtureResponse(article_html)
+        insights["failure_details"].append(scraper._scrape_failory_detail(url, {}))
+        insights["failed_startups"].append({"name": query, "source_url": url})
+    results = {
+        "linkedin": scraper.scrape_linkedin_profile(pipeline._linkedin_profile_url(query), None, None),
+        "failure_industry_insights": insights,
+        "web_sentiment": {"snippets": snippets, "overall_sentiment": analyzer.analyze_sentiment(" . ".join(snippets)), "error": None},
+        "controversies": {"source": "Web Search (Controversies)", "search_query": query, "potential_hits": hits, "error": None},
+    }
+    status = {source: {"status": pipeline.SOURCE_OK, "elapsed": 1.0} for source in results}
+    return pipeline.build_founder_data(query, results, status), results
+
+
+def _timed(fn, value, rounds=200):
+    started = time.perf_counter()
+    for _ in range(rounds): fn(value)
+    return (time.perf_counter() - started) / rounds * 1e6
+
+
+if __name__ == '__main__':
+    logging.disable(logging.INFO)
+    log_path = sys.argv[1] if len(sys.argv) > 1 else os.path.join(REPO, "search_log.csv")
+    general = extract.parse_ddg_results(_fixture("ddg_results.html"))
+    controversy = extract.parse_ddg_results(_fixture("ddg_controversy.html"))
+    article_html = _fixture("failory_article.html")
+
+    print(f"{'founder':<18}{'failory':>8}{'pickle B':>10}{'compact B':>11}{'saved':>7}{'sources pickle':>16}{'sources compact':>17}")
+    record_sizes, source_sizes, timings = [], [], []
+    for founder in founders_from_log(log_path):
+        record, sources = build_record(founder, general, controversy, article_html)
+        assert record_codec.loads(record_codec.dumps(record)) == record, f"{founder['query']}: record changed in round trip"
+        old, new = len(pickle.dumps(record, protocol=pickle.HIGHEST_PROTOCOL)), len(record_codec.dumps(record))
+        old_sources = sum(len(pickle.dumps(value, protocol=pickle.HIGHEST_PROTOCOL)) for value in sources.values())
+        new_sources = sum(len(record_codec.dumps(value)) for value in sources.values())
+        record_sizes.append((old, new))
+        source_sizes.append((old_sources, new_sources))
+        payload = record_codec.dumps(record)
+        timings.append((_timed(lambda r: pickle.dumps(r, protocol=pickle.HIGHEST_PROTOCOL), record), _timed(record_codec.dumps, record),
+                        _timed(pickle.loads, pickle.dumps(record, protocol=pickle.HIGHEST_PROTOCOL)), _timed(record_codec.loads, payload)))
+        print(f"{founder['query'][:17]:<18}{'yes' if founder['failure_found'] else '':>8}{old:>10,}{new:>11,}{1 - new / old:>7.0%}"
+              f"{old_sources:>16,}{new_sources:>17,}")
+
+    old_total, new_total = map(sum, zip(*record_sizes))
+    old_src, new_src = map(sum, zip(*source_sizes))
+    per_entry = lambda size: size / len(record_sizes) + _ENTRY_OVERHEAD_BYTES
+    print(f"\n{len(record_sizes)} founders. Founder records: {old_total:,} -> {new_total:,} bytes ({1 - new_total / old_total:.0%} smaller, "
+          f"median per entry {statistics.median(1 - n / o for o, n in record_sizes):.0%}); "
+          f"per-source entries: {old_src:,} -> {new_src:,} bytes ({1 - new_src / old_src:.0%} smaller).")
+    print(f"Records fitting the {CACHE_MEMORY_BYTES // (1024 * 1024)} MB memory tier: "
+          f"{CACHE_MEMORY_BYTES / per_entry(old_total):,.0f} -> {CACHE_MEMORY_BYTES / per_entry(new_total):,.0f}")
+    mean = lambda column: statistics.fmean(t[column] for t in timings)
+    print(f"Encode {mean(0):.0f} -> {mean(1):.0f} us, decode {mean(2):.0f} -> {mean(3):.0f} us per record (pickle -> compact).")
@@ -0,0 +1,96 @@
+# benchmarks/bench_rescore.py
+"""
+Bulk re-scoring: scoring.score_arrays() over N synthetic records (default one million)
+against the per-record scoring.score() loop it replaces, and - with --history - a full
+scoring.rescore_history() pass over a temporary SQLite history of the same size
+(load, score, write back and rollup rebuild).
+
+Also checks that both paths give identical scores, and that v1 equals the original
+analyzer formula on every record.
+
+Run from the repo root:
+    python benchmarks/bench_rescore.py                       # 1M records, arrays only
+    python benchmarks/bench_rescore.py -n 200000 --history
+"""
+import os
+import sys
+import time
+import argparse
+import tempfile
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import scoring
+import history
+
+V2 = {"neutral_score": 50.0, "failure_base": 0.25, "failure_step": 0.05, "failure_max_steps": 3,
+      "controversy_step": 0.03, "controversy_max": 0.15} # Example re-weighting that counts controversies
+
+
+def original_score(compound, failures):
+    """analyzer.calculate_reputation_score before scoring.py (the v1 reference)."""
+    base_score = 50 if compound is None else max(0, min(100, ((compound + 1) / 2) * 100))
+    penalty_factor = 1.0
+    if failures > 0: penalty_factor = 1.0 - (0.30 + (min(failures - 1, 2) * 0.05))
+    return round(max(0, min(100, base_score * penalty_factor)))
+
+
+def synthetic(n, seed=7):
+    rng = np.random.default_rng(seed)
+    compound = rng.uniform(-1, 1, n).round(4)
+    compound[rng.random(n) < 0.05] = np.nan # No sentiment data
+    failures = rng.choice([0, 0, 0, 0, 1, 2, 3, 5], n)
+    controversies = rng.poisson(1.5, n)
+    return compound, failures, controversies
+
+
+def timed(fn, *args, **kwargs):
+    started = time.perf_counter()
+    result = fn(*args, **kwargs)
+    return result, time.perf_counter() - started
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Vectorised vs per-record re-scoring.")
+    parser.add_argument("-n", type=int, default=1_000_000, help="Records")
+    parser.add_argument("--loop-sample", type=int, default=100_000, help="Records timed through the per-record loop (extrapolated)")
+    parser.add_argument("--history", action="store_true", help="Also time rescore_history() on a temporary SQLite history")
+    args = parser.parse_args()
+    scoring.SCORING_WEIGHTS["v2"] = V2
+
+    compound, failures, controversies = synthetic(args.n)
+    print(f"{args.n:,} records")
+    for version in ("v1", "v2"):
+        scores, seconds = timed(scoring.score_arrays, compound, failures, controversies, version)
+        print(f"  score_arrays {version}: {seconds * 1000:8.1f} ms  ({args.n / seconds / 1e6:.1f}M records/s, mean {scores.mean():.2f})")
+
+    sample = min(args.loop_sample, args.n)
+    rows = [(None if np.isnan(c) else c, f, h) for c, f, h in zip(compound[:sample].tolist(), failures[:sample].tolist(), controversies[:sample].tolist())]
+    loop_scores, seconds = timed(lambda: [scoring.score(c, f, h, "v2") for c, f, h in rows])
+    print(f"  score() loop v2:  {seconds * args.n / sample * 1000:8.1f} ms  (extrapolated from {sample:,})")
+
+    vectorised = scoring.score_arrays(compound[:sample], failures[:sample], controversies[:sample], "v2").tolist()
+    assert vectorised == loop_scores, "score_arrays and score() disagree"
+    v1 = scoring.score_arrays(compound[:sample], failures[:sample], controversies[:sample], "v1").tolist()
+    assert v1 == [original_score(c, f) for c, f, _h in rows], "v1 differs from the original formula"
+    print("  identical scores: vectorised == per-record, v1 == original formula")
+
+    if args.history:
+        with tempfile.TemporaryDirectory() as tmp:
+            store = history.HistoryStore(os.path.join(tmp, "history.sqlite3"))
+            now = time.time()
+            v1_scores = scoring.score_arrays(compound, failures, controversies, "v1").tolist()
+            records = [{"ts": now - i * 30, "query": f"founder {i % 5000}", "query_key": f"founder {i % 5000}", "reputation_score": s,
+                        "sentiment_label": None, "sentiment_compound": None if np.isnan(c) else c, "failure_count": f,
+                        "controversy_hits": h, "industry": None, "locations": "", "cache_status": "MISS", "origin": "live",
+                        "score_version": "v1"}
+                       for i, (c, f, h, s) in enumerate(zip(compound.tolist(), failures.tolist(), controversies.tolist(), v1_scores))]
+            _, seconds = timed(lambda: [store.add_records(records[i:i + 50000]) for i in range(0, len(records), 50000)])
+            print(f"  history built in {seconds:.1f}s")
+            summary, seconds = timed(scoring.rescore_history, store, "v2")
+            print(f"  rescore_history v2: {seconds:.2f}s total  {summary}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,65 @@
+# benchmarks/bench_sentiment.py
+"""
+Per-snippet sentiment cost: a fresh SentimentIntensityAnalyzer per call (the old
+analyze_sentiment) vs the shared analyzer, cold and memoized.
+
+Run from the repo root:  python benchmarks/bench_sentiment.py
+"""
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from nltk.sentiment.vader import SentimentIntensityAnalyzer
+import analyzer
+
+SNIPPETS = [
+    "Zepto raises $200 million in fresh funding as quick commerce race heats up in India.",
+    "The startup has been praised for its fast delivery but criticised over rider safety.",
+    "Paytm shares fall after regulator bars its payments bank from accepting new deposits.",
+    "Founders say the company is on track to turn profitable by the end of next year.",
+    "Former employees allege a toxic work culture and unpaid overtime at the Bangalore office.",
+    "Customers love the app, calling it the most reliable grocery service in Mumbai.",
+    "The company denied the allegations and said it would cooperate with the investigation.",
+    "Analysts remain cautious about unit economics despite strong revenue growth.",
+    "A lawsuit filed in Delhi accuses the firm of breaching its supplier contracts.",
+    "The new CEO outlined an ambitious plan to expand to twenty more cities.",
+]
+ROUNDS = 20
+
+
+def _per_snippet_ms(func):
+    started = time.perf_counter()
+    for _ in range(ROUNDS):
+        func()
+    return (time.perf_counter() - started) * 1000 / (ROUNDS * len(SNIPPETS))
+
+
+def old_analyze():
+    # What analyze_sentiment used to do: build a new analyzer (re-reading the lexicon) per call
+    for text in SNIPPETS:
+        SentimentIntensityAnalyzer().polarity_scores(text)
+
+
+def shared_cold():
+    # Shared analyzer, memo cleared every round so every snippet is really scored
+    analyzer._sentiment_memo.clear()
+    analyzer.analyze_sentiment_batch(SNIPPETS)
+
+
+def shared_memoized():
+    analyzer.analyze_sentiment_batch(SNIPPETS)
+
+
+if __name__ == '__main__':
+    analyzer._get_vader() # Exclude the one-off lexicon load from the "after" numbers
+    rows = [
+        ("new analyzer per call (before)", _per_snippet_ms(old_analyze)),
+        ("shared analyzer, cold memo", _per_snippet_ms(shared_cold)),
+        ("shared analyzer, memo hit", _per_snippet_ms(shared_memoized)),
+    ]
+    baseline = rows[0][1]
+    print(f"{len(SNIPPETS)} snippets x {ROUNDS} rounds")
+    for name, ms in rows:
+        print(f"  {name:<32} {ms:9.4f} ms/snippet  ({baseline / ms:7.1f}x)")
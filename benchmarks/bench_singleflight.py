@@ -0,0 +1,73 @@
+# benchmarks/bench_singleflight.py
+"""
+Times N concurrent /search requests for the same (uncached) founder at stubbed
+sources, which single-flight coalesces into one run of the scrape-and-analyse
+pipeline. Correctness (one fetch, errors reach every waiter) is checked by
+tests/test_singleflight.py.
+
+Run from the repo root:  python benchmarks/bench_singleflight.py [N]
+"""
+import os
+import sys
+import time
+import tempfile
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+os.environ.setdefault("CACHE_BACKEND", "memory") # Keep the run self-contained
+
+import scraper
+import app as app_module
+
+UPSTREAM_LATENCY = 0.5
+upstream_calls = {"web_sentiment": 0, "controversies": 0, "failory": 0}
+calls_lock = threading.Lock()
+
+
+def _count(source):
+    with calls_lock:
+        upstream_calls[source] += 1
+
+
+def stub_sentiment(query):
+    _count("web_sentiment")
+    time.sleep(UPSTREAM_LATENCY)
+    return {"snippets": [f"{query} is growing fast."], "overall_sentiment": {"compound": 0.5, "label": "POSITIVE"}, "error": None}
+
+
+def stub_controversies(query):
+    _count("controversies")
+    time.sleep(UPSTREAM_LATENCY)
+    return {"potential_hits": [], "error": None}
+
+
+def stub_failory(query):
+    _count("failory")
+    time.sleep(UPSTREAM_LATENCY)
+    return {"failed_startups": [], "failure_details": [], "error": None}
+
+
+def fire(n, query):
+    barrier = threading.Barrier(n)
+
+    def one_request(_):
+        barrier.wait() # Release all requests together
+        return app_module.app.test_client().post('/search', data={'query': query}).status_code
+
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=n) as pool:
+        statuses = list(pool.map(one_request, range(n)))
+    return statuses, time.perf_counter() - started
+
+
+if __name__ == '__main__':
+    n = int(sys.argv[1]) if len(sys.argv) > 1 else 50
+    app_module.search_log.sink.path = os.path.join(tempfile.mkdtemp(), "search_log.csv") # Don't touch the real log
+    scraper.search_web_for_sentiment = stub_sentiment
+    scraper.search_for_controversies = stub_controversies
+    scraper.get_failure_and_industry_insights = stub_failory
+
+    statuses, elapsed = fire(n, "Trending Founder")
+    print(f"{n} concurrent requests in {elapsed:.2f}s, statuses: {sorted(set(statuses))}, upstream calls: {upstream_calls}")
+    print(f"  {elapsed / n * 1000:.1f} ms per request vs {UPSTREAM_LATENCY * 1000:.0f} ms upstream latency per source")
@@ -0,0 +1,63 @@
+# benchmarks/bench_startup.py
+"""
+Cold import cost per module: each module is imported in a fresh interpreter and
+the wall time and RSS growth of the import are recorded, together with which
+heavy dependencies (selenium, webdriver_manager, nltk, numpy) it pulled in. The cost of
+analyzer.warm_up() is measured the same way.
+
+Run from the repo root:  python benchmarks/bench_startup.py [--json]
+"""
+import os
+import sys
+import json
+import subprocess
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+MODULES = ["http_client", "phrase_matcher", "industry_classifier", "analyzer", "cache", "scraper", "pipeline", "history", "app"]
+HEAVY_MODULES = ["selenium", "webdriver_manager", "nltk", "numpy"]
+ROUNDS = 3 # Fresh interpreters per module; the fastest run is reported
+
+# Runs inside the child interpreter; prints one JSON line
+_PROBE = r"""
+import sys, time, json, importlib
+sys.path.insert(0, {root!r})
+
+def rss_kb():
+    try:
+        with open('/proc/self/statm') as f:
+            return int(f.read().split()[1]) * (__import__('os').sysconf('SC_PAGE_SIZE') // 1024)
+    except OSError:
+        import resource
+        return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss # Peak, not current, off Linux
+
+rss_before = rss_kb()
+started = time.perf_counter()
+module = importlib.import_module({module!r})
+if {warm_up!r}: module.warm_up()
+elapsed = time.perf_counter() - started
+print(json.dumps({{"seconds": elapsed, "rss_kb": rss_kb() - rss_before,
+                  "heavy": [name for name in {heavy!r} if name in sys.modules]}}))
+"""
+
+
+def measure(module, warm_up=False):
+    runs = []
+    for _ in range(ROUNDS):
+        code = _PROBE.format(root=REPO_ROOT, module=module, warm_up=warm_up, heavy=HEAVY_MODULES)
+        env = dict(os.environ, CACHE_BACKEND="memory") # Don't create the cache database just to import
+        output = subprocess.run([sys.executable, "-c", code], cwd=REPO_ROOT, env=env,
+                                capture_output=True, text=True, check=True).stdout
+        runs.append(json.loads(output.strip().splitlines()[-1]))
+    best = min(runs, key=lambda run: run["seconds"])
+    return {"module": module + (".warm_up()" if warm_up else ""), "import_ms": round(best["seconds"] * 1000, 1),
+            "rss_mb": round(best["rss_kb"] / 1024, 1), "heavy_modules_loaded": best["heavy"]}
+
+
+if __name__ == '__main__':
+    results = [measure(module) for module in MODULES] + [measure("analyzer", warm_up=True)]
+    if "--json" in sys.argv:
+        print(json.dumps(results, indent=2))
+    else:
+        print(f"{'module':<24}{'import ms':>10}{'RSS MB':>9}  heavy deps loaded")
+        for result in results:
+            print(f"{result['module']:<24}{result['import_ms']:>10}{result['rss_mb']:>9}  {', '.join(result['heavy_modules_loaded']) or '-'}")
@@ -0,0 +1,139 @@
+# benchmarks/bench_suite.py
+"""
+Offline micro-benchmark suite for the parsing and analysis hot paths, run on the
+recorded fixtures in benchmarks/fixtures/ (no network). Reports ops/sec, latency
+percentiles and per-call allocation peak, and compares with benchmarks/baseline.json.
+Exits non-zero when a benchmark regresses by more than the threshold plus its measured
+noise (see harness.py). The baseline's metadata records the machine and conditions
+it was taken on; re-record it (once, in its own commit) when those change.
+
+Run from the repo root:
+    python benchmarks/bench_suite.py                  # compare with the baseline
+    python benchmarks/bench_suite.py --save-baseline --note "idle 8-core laptop, on AC"  # same machine!
+    python benchmarks/bench_suite.py -k sentiment --seconds 2 --json results.json
+"""
+import os
+import sys
+import json
+import argparse
+import platform
+from datetime import datetime
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+os.environ.setdefault("CACHE_BACKEND", "memory")
+
+import harness
+import analyzer
+import extract
+import scraper
+import search_fetcher
+import normalize
+import suggest
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+FIXTURES = os.path.join(BENCH_DIR, "fixtures")
+BASELINE_PATH = os.path.join(BENCH_DIR, "baseline.json")
+
+
+def _fixture(name):
+    with open(os.path.join(FIXTURES, name), encoding="utf-8") as f:
+        return f.read()
+
+
+def build_benchmarks():
+    """(name, fn) pairs. Inputs are prepared here so only the function under test is timed."""
+    snippets = [line.strip() for line in _fixture("snippets.txt").splitlines() if line.strip() and not line.startswith("#")]
+    ddg_page = _fixture("ddg_results.html")
+    controversy_page = _fixture("ddg_controversy.html")
+    failory_search = _fixture("failory_search.html")
+    failory_article = _fixture("failory_article.html")
+    ddg_results = extract.parse_ddg_results(ddg_page) + extract.parse_ddg_results(controversy_page)
+    location_texts = snippets[:40] + ["San Francisco Bay Area (Simulated)", "Founder | Visionary (Simulated)"]
+    sentiment = {"compound": 0.42, "label": "POSITIVE"}
+    failures = [{"name": "x", "source_url": "https://www.failory.com/cemetery/x"}]
+    cycle = {"index": 0}
+
+    def sentiment_uncached():
+        # A different snippet each call and an empty memo: measures real VADER scoring
+        analyzer._sentiment_memo.clear()
+        cycle["index"] = (cycle["index"] + 1) % len(snippets)
+        analyzer.analyze_sentiment(snippets[cycle["index"]])
+
+    # 50k synthetic verified names (plus the alias table's brands) for the typeahead index
+    syllables = ["ka", "ze", "pto", "ra", "mi", "lo", "vu", "shi", "tan", "ber", "no", "qua", "del", "fi", "go"]
+    synthetic = [(syllables[i % 15] + syllables[i // 15 % 15] + syllables[i // 225 % 15] + f" {['labs', 'tech', 'pay', 'ai', 'foods'][i % 5]} {i}", 1 + i % 7, None)
+                 for i in range(50000)]
+    suggest_index = suggest.SuggestIndex()
+    suggest_index._loaded = True # Don't read the real history
+    suggest_index.add_many(synthetic + [(name, 50, None) for name in ["Zepto", "Paytm", "Swiggy", "Zomato", "Flipkart", "Pets.com"]])
+    key_queries = ["Zepto Inc", "https://www.zepto.com/about", "Zépto", "One97 Communications", "Kiranakart Technologies Pvt Ltd"]
+
+    def canonical_uncached():
+        normalize.canonical_key.cache_clear()
+        cycle["index"] = (cycle["index"] + 1) % len(key_queries)
+        normalize.canonical_key(key_queries[cycle["index"]])
+
+    def dedupe_results():
+        result_set = search_fetcher.ResultSet("Zepto")
+        result_set.add(search_fetcher.GENERAL, ddg_results[:30])
+        result_set.add(search_fetcher.CONTROVERSY, ddg_results[30:])
+
+    return [
+        ("analyzer.analyze_sentiment (uncached)", sentiment_uncached),
+        ("analyzer.analyze_sentiment_batch (memo hit, 30)", lambda: analyzer.analyze_sentiment_batch(snippets[:30])),
+        ("analyzer.extract_potential_locations (42 texts)", lambda: analyzer.extract_potential_locations(location_texts)),
+        ("analyzer.calculate_reputation_score", lambda: analyzer.calculate_reputation_score(sentiment, failures)),
+        ("scraper._identify_industry (query + 30 snippets)", lambda: scraper._identify_industry("Zepto", snippets[:30])),
+        ("extract.parse_ddg_page (72 KB)", lambda: extract.parse_ddg_page(ddg_page)),
+        ("extract.parse_failory_links (42 KB)", lambda: extract.parse_failory_links(failory_search)),
+        ("extract.parse_failory_article (43 KB)", lambda: extract.parse_failory_article(failory_article, "https://www.failory.com/x")),
+        ("search_fetcher.ResultSet.add (60 results)", dedupe_results),
+        ("normalize.canonical_key (uncached)", canonical_uncached),
+        ("suggest.suggest prefix (50k names)", lambda: suggest_index.suggest("zep", 8)),
+        ("suggest.suggest word prefix (50k names)", lambda: suggest_index.suggest("pay 12", 8)),
+        ("suggest.suggest fuzzy (50k names)", lambda: suggest_index.suggest("zeptp", 8)),
+    ]
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Offline micro-benchmarks for parsing and analysis.")
+    parser.add_argument("-k", "--filter", help="Only run benchmarks whose name contains this text")
+    parser.add_argument("--seconds", type=float, default=harness.DEFAULT_SECONDS, help="Measured time per benchmark")
+    parser.add_argument("--rounds", type=int, default=harness.DEFAULT_ROUNDS, help="Interleaved rounds per benchmark (median kept)")
+    parser.add_argument("--baseline", default=BASELINE_PATH, help="Baseline JSON to compare with / save to")
+    parser.add_argument("--save-baseline", action="store_true", help="Write these results as the new baseline")
+    parser.add_argument("--note", default="", help="Conditions the baseline was recorded under (stored in its metadata)")
+    parser.add_argument("--threshold", type=float, default=harness.REGRESSION_THRESHOLD, help="Allowed slowdown (0.25 = 25%%)")
+    parser.add_argument("--json", metavar="PATH", help="Also write the full results to this file")
+    args = parser.parse_args(argv)
+
+    import logging
+    logging.disable(logging.INFO) # The functions under test log at INFO on every call
+    analyzer.warm_up(download=False)
+
+    benchmarks = [(name, fn) for name, fn in build_benchmarks() if not args.filter or args.filter in name]
+    results = harness.run_suite(benchmarks, args.seconds, args.rounds)
+
+    if args.save_baseline:
+        metadata = {"recorded_at": datetime.now().isoformat(timespec="seconds"), "python": platform.python_version(),
+                    "machine": platform.machine(), "processor": platform.processor() or platform.machine(),
+                    "cpus": os.cpu_count(), "platform": platform.platform(), "seconds": args.seconds, "rounds": args.rounds,
+                    "note": args.note}
+        harness.save_baseline(args.baseline, results, metadata)
+        harness.print_table(results)
+        print(f"Baseline written to {args.baseline}")
+        return 0
+
+    regressions = harness.compare(results, harness.load_baseline(args.baseline), args.threshold)
+    harness.print_table(results)
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump(results, f, indent=2)
+    if regressions:
+        print(f"{len(regressions)} regression(s) over {args.threshold:.0%} plus noise: {', '.join(regressions)}")
+        return 1
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
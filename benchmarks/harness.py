@@ -0,0 +1,123 @@
+# benchmarks/harness.py
+"""
+Minimal micro-benchmark harness: runs a callable repeatedly for a time budget and
+reports ops/sec, latency percentiles and the Python-heap peak of one call
+(tracemalloc), and compares results against a stored JSON baseline.
+
+run_suite() measures every benchmark in several interleaved rounds and keeps the
+median round, plus the spread of the round p50s. A p50 change only counts as a
+regression when it exceeds the threshold plus that spread (the larger of the
+baseline's and the current run's), so machine noise isn't reported as a slowdown.
+"""
+import gc
+import json
+import time
+import statistics
+import tracemalloc
+
+DEFAULT_SECONDS = 1.0 # Measured time per benchmark (split across the rounds)
+DEFAULT_ROUNDS = 5
+WARMUP_CALLS = 3
+MIN_CALLS = 10
+REGRESSION_THRESHOLD = 0.25 # A 25% slower p50 (or larger allocation peak) counts as a regression
+ALLOC_SLACK_KB = 4 # Ignore allocation changes smaller than this
+P50_SLACK_US = 0.5 # Ignore p50 changes smaller than this (timer resolution on the fastest benchmarks)
+
+
+def _percentile(sorted_values, fraction):
+    index = min(len(sorted_values) - 1, max(0, round(fraction * (len(sorted_values) - 1))))
+    return sorted_values[index]
+
+
+def run(name, fn, seconds=DEFAULT_SECONDS):
+    """Benchmarks fn() and returns a result dict (latencies in microseconds)."""
+    for _ in range(WARMUP_CALLS):
+        fn()
+
+    gc.collect()
+    gc_was_enabled = gc.isenabled()
+    gc.disable() # Keep collector pauses out of the latency samples
+    timings = []
+    try:
+        budget_end = time.perf_counter() + seconds
+        while len(timings) < MIN_CALLS or time.perf_counter() < budget_end:
+            started = time.perf_counter()
+            fn()
+            timings.append(time.perf_counter() - started)
+    finally:
+        if gc_was_enabled: gc.enable()
+
+    tracemalloc.start()
+    fn()
+    _current, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    timings.sort()
+    total = sum(timings)
+    return {
+        "name": name,
+        "calls": len(timings),
+        "ops_per_sec": round(len(timings) / total, 1) if total else float("inf"),
+        "p50_us": round(_percentile(timings, 0.50) * 1e6, 2),
+        "p90_us": round(_percentile(timings, 0.90) * 1e6, 2),
+        "p99_us": round(_percentile(timings, 0.99) * 1e6, 2),
+        "mean_us": round(statistics.fmean(timings) * 1e6, 2),
+        "alloc_peak_kb": round(peak / 1024, 1),
+    }
+
+
+def run_suite(benchmarks, seconds=DEFAULT_SECONDS, rounds=DEFAULT_ROUNDS):
+    """
+    Runs (name, fn) benchmarks `rounds` times, interleaved so a machine-wide slowdown hits them all alike.
+    Each result is the round with the median p50, with calls summed and p50_spread = (max - min) / median of the round p50s.
+    """
+    per_round = [[run(name, fn, seconds / rounds) for name, fn in benchmarks] for _ in range(rounds)]
+    results = []
+    for samples in zip(*per_round):
+        ordered = sorted(samples, key=lambda r: r["p50_us"])
+        result = dict(ordered[len(ordered) // 2])
+        result["calls"] = sum(r["calls"] for r in samples)
+        result["p50_spread"] = round((ordered[-1]["p50_us"] - ordered[0]["p50_us"]) / result["p50_us"], 3) if result["p50_us"] else 0.0
+        results.append(result)
+    return results
+
+
+def compare(results, baseline, threshold=REGRESSION_THRESHOLD):
+    """Annotates each result with its change vs the baseline; returns the names that regressed."""
+    regressions = []
+    for result in results:
+        base = baseline.get(result["name"])
+        if not base:
+            result["vs_baseline"] = "new"
+            continue
+        p50_change = result["p50_us"] / base["p50_us"] - 1 if base["p50_us"] else 0.0
+        p50_allowed = threshold + max(base.get("p50_spread", 0.0), result.get("p50_spread", 0.0))
+        alloc_delta = result["alloc_peak_kb"] - base["alloc_peak_kb"]
+        alloc_change = alloc_delta / base["alloc_peak_kb"] if base["alloc_peak_kb"] else 0.0
+        result["vs_baseline"] = f"p50 {p50_change:+.0%} (allowed {p50_allowed:+.0%}), alloc {alloc_change:+.0%}"
+        if (p50_change > p50_allowed and result["p50_us"] - base["p50_us"] > P50_SLACK_US) or (alloc_delta > ALLOC_SLACK_KB and alloc_change > threshold):
+            result["vs_baseline"] += "  REGRESSION"
+            regressions.append(result["name"])
+    return regressions
+
+
+def load_baseline(path):
+    try:
+        with open(path, encoding="utf-8") as f:
+            return {entry["name"]: entry for entry in json.load(f)["results"]}
+    except FileNotFoundError:
+        return {}
+
+
+def save_baseline(path, results, metadata):
+    keep = ("name", "ops_per_sec", "p50_us", "p50_spread", "p90_us", "p99_us", "alloc_peak_kb")
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump({"metadata": metadata, "results": [{k: r[k] for k in keep} for r in results]}, f, indent=2)
+        f.write("\n")
+
+
+def print_table(results):
+    print(f"{'benchmark':<50}{'ops/s':>11}{'p50 us':>11}{'spread':>8}{'p90 us':>11}{'p99 us':>11}{'alloc KB':>10}  vs baseline")
+    for r in results:
+        print(f"{r['name']:<50}{r['ops_per_sec']:>11,.0f}{r['p50_us']:>11,.1f}{r.get('p50_spread', 0.0):>8.0%}{r['p90_us']:>11,.1f}{r['p99_us']:>11,.1f}"
+              f"{r['alloc_peak_kb']:>10,.1f}  {r.get('vs_baseline', '')}")
@@ -0,0 +1,195 @@
+# browser_pool.py
+import os
+import time
+import atexit
+import threading
+import logging
+from contextlib import contextmanager
+
+logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+
+# --- Browser Pool Configuration ---
+BROWSER_POOL_SIZE = int(os.environ.get("BROWSER_POOL_SIZE", 2)) # Max live browsers per process
+BROWSER_MAX_USES = int(os.environ.get("BROWSER_MAX_USES", 50)) # Recycle a browser after this many checkouts
+BROWSER_IDLE_SECONDS = float(os.environ.get("BROWSER_IDLE_SECONDS", 300)) # Quit browsers unused for this long
+BROWSER_CHECKOUT_TIMEOUT = float(os.environ.get("BROWSER_CHECKOUT_TIMEOUT", 30)) # Wait for a free browser at most this long
+
+
+class BrowserPoolExhausted(TimeoutError):
+    """Raised when no browser becomes free within the checkout timeout."""
+
+
+class PooledBrowser:
+    def __init__(self, driver):
+        self.driver = driver
+        self.uses = 0
+        self.created_at = time.monotonic()
+        self.last_used = self.created_at
+
+
+def default_health_check(driver):
+    """A cheap WebDriver round-trip; raises if the browser or its session has died."""
+    driver.current_url
+    return True
+
+
+class BrowserPool:
+    """
+    A bounded pool of reusable WebDriver instances. Browsers are created by `factory`
+    on demand (up to max_size), handed out one caller at a time, health-checked before
+    reuse, recycled after max_uses or when they fail, and quit after idle_seconds unused.
+    The factory is injectable, so the pool works with fake drivers and no browser installed.
+    """
+
+    def __init__(self, factory, max_size=BROWSER_POOL_SIZE, max_uses=BROWSER_MAX_USES,
+                 idle_seconds=BROWSER_IDLE_SECONDS, health_check=default_health_check):
+        self.factory = factory
+        self.max_size = max_size
+        self.max_uses = max_uses
+        self.idle_seconds = idle_seconds
+        self.health_check = health_check
+        self._cond = threading.Condition()
+        self._idle = [] # PooledBrowser, most recently returned last
+        self._live = 0 # Idle + checked out + being created
+        self._closed = False
+        self._reaper = None
+        self._stats = {"created": 0, "reused": 0, "recycled": 0, "unhealthy": 0, "reaped": 0,
+                       "create_failures": 0, "checkout_timeouts": 0, "wait_seconds": 0.0}
+
+    def checkout(self, timeout=BROWSER_CHECKOUT_TIMEOUT):
+        """Returns a healthy PooledBrowser, creating one if the pool has room. Blocks while all are busy."""
+        deadline = time.monotonic() + timeout
+        started = time.monotonic()
+        while True:
+            with self._cond:
+                if self._closed: raise RuntimeError("Browser pool is closed")
+                self._ensure_reaper()
+                while not self._idle and self._live >= self.max_size:
+                    remaining = deadline - time.monotonic()
+                    if remaining <= 0:
+                        self._stats["checkout_timeouts"] += 1
+                        raise BrowserPoolExhausted(f"No browser free after {timeout}s ({self.max_size} in use)")
+                    self._cond.wait(remaining)
+                    if self._closed: raise RuntimeError("Browser pool is closed")
+                self._stats["wait_seconds"] += time.monotonic() - started
+                started = time.monotonic()
+                pooled = self._idle.pop() if self._idle else None
+                if pooled is None:
+                    self._live += 1 # Reserve the slot before creating outside the lock
+
+            if pooled is None:
+                return self._create()
+            if self._is_healthy(pooled):
+                with self._cond: self._stats["reused"] += 1
+                return pooled
+            with self._cond: self._stats["unhealthy"] += 1
+            self._discard(pooled) # Then loop: take another idle browser or create a fresh one
+
+    def _create(self):
+        try:
+            driver = self.factory()
+            if driver is None: raise RuntimeError("Browser factory returned no driver")
+        except Exception:
+            with self._cond:
+                self._live -= 1
+                self._stats["create_failures"] += 1
+                self._cond.notify()
+            raise
+        with self._cond: self._stats["created"] += 1
+        return PooledBrowser(driver)
+
+    def _is_healthy(self, pooled):
+        try:
+            return bool(self.health_check(pooled.driver))
+        except Exception as e:
+            logging.warning(f"Pooled browser failed its health check: {e}")
+            return False
+
+    def checkin(self, pooled, broken=False):
+        """Returns a browser. Broken, worn-out (max_uses) browsers, or any returned after close(), are quit."""
+        pooled.uses += 1
+        pooled.last_used = time.monotonic()
+        worn_out = pooled.uses >= self.max_uses
+        with self._cond:
+            keep = not (broken or worn_out or self._closed)
+            if keep:
+                self._idle.append(pooled)
+                self._cond.notify()
+                return
+            if worn_out and not broken: self._stats["recycled"] += 1
+        self._discard(pooled)
+
+    def _discard(self, pooled):
+        with self._cond:
+            self._live -= 1
+            self._cond.notify()
+        try:
+            pooled.driver.quit()
+        except Exception as e:
+            logging.warning(f"Error quitting browser: {e}")
+
+    @contextmanager
+    def browser(self, timeout=BROWSER_CHECKOUT_TIMEOUT):
+        """
+        with pool.browser() as driver: ...
+        If the block raises, the browser is health-checked before going back to the pool.
+        """
+        pooled = self.checkout(timeout)
+        try:
+            yield pooled.driver
+        except BaseException:
+            self.checkin(pooled, broken=not self._is_healthy(pooled))
+            raise
+        self.checkin(pooled)
+
+    def reap_idle(self):
+        """Quits browsers that have been idle longer than idle_seconds; returns how many."""
+        cutoff = time.monotonic() - self.idle_seconds
+        with self._cond:
+            expired = [pooled for pooled in self._idle if pooled.last_used < cutoff]
+            self._idle = [pooled for pooled in self._idle if pooled.last_used >= cutoff]
+            self._stats["reaped"] += len(expired)
+        for pooled in expired:
+            self._discard(pooled)
+        return len(expired)
+
+    def _ensure_reaper(self):
+        # Caller holds self._cond. Started on first checkout so importing never spawns threads
+        if self._reaper is not None or not self.idle_seconds: return
+        self._reaper = threading.Thread(target=self._reap_loop, name="browser-reaper", daemon=True)
+        self._reaper.start()
+
+    def _reap_loop(self):
+        while True:
+            with self._cond:
+                self._cond.wait_for(lambda: self._closed, timeout=max(self.idle_seconds / 2, 1))
+                if self._closed: return
+            self.reap_idle()
+
+    def close(self):
+        """Quits idle browsers now; browsers still checked out are quit when returned."""
+        with self._cond:
+            self._closed = True
+            idle, self._idle = self._idle, []
+            self._cond.notify_all()
+        for pooled in idle:
+            self._discard(pooled)
+
+    def stats(self):
+        with self._cond:
+            return {**self._stats, "wait_seconds": round(self._stats["wait_seconds"], 3), "live": self._live,
+                    "idle": len(self._idle), "in_use": self._live - len(self._idle), "max_size": self.max_size}
+
+
+_pools = []
+
+@atexit.register
+def _close_pools():
+    for pool in _pools:
+        pool.close()
+
+def create_pool(factory, **kwargs):
+    """Creates a BrowserPool whose browsers are quit at interpreter exit."""
+    pool = BrowserPool(factory, **kwargs)
+    _pools.append(pool)
+    return pool
@@ -1,19 +1,370 @@
 # cache.py
-from flask_caching import Cache
+import os
+import time
+import sqlite3
+import threading
 import logging
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from singleflight import SingleFlight
+import record_codec # Compact, versioned payloads
 
 logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
 
-# Initialize cache - SimpleCache for dev, use Redis/Memcached for prod
-cache = Cache(config={
-    'CACHE_TYPE': 'SimpleCache',
-    'CACHE_DEFAULT_TIMEOUT': 3600 # Default 1 hour (overridden in set)
-})
+# --- Cache Configuration ---
+CACHE_BACKEND = os.environ.get("CACHE_BACKEND", "tiered") # tiered | memory | sqlite
+CACHE_DB_PATH = os.environ.get("CACHE_DB_PATH", "founder_cache.sqlite3")
+CACHE_MEMORY_BYTES = int(os.environ.get("CACHE_MEMORY_BYTES", 64 * 1024 * 1024)) # In-process LRU budget, including per-entry overhead
+CACHE_MAX_ENTRY_BYTES = int(os.environ.get("CACHE_MAX_ENTRY_BYTES", 0)) # Larger entries skip the memory tier; 0 = 1/8 of the budget
+CACHE_DEFAULT_TIMEOUT = int(os.environ.get("CACHE_DEFAULT_TIMEOUT", 3600)) # Default 1 hour (overridden in set)
+CACHE_STALE_SECONDS = int(os.environ.get("CACHE_STALE_SECONDS", 600)) # How long an expired entry may still be served while refreshing
+CACHE_PURGE_EVERY = 200 # Purge expired disk rows every N writes
+CACHE_COMPUTE_WAIT_SECONDS = float(os.environ.get("CACHE_COMPUTE_WAIT_SECONDS", 30)) # Max wait on another caller's in-flight computation
+
+FRESH = "fresh"
+STALE = "stale"
+
+
+_ENTRY_OVERHEAD_BYTES = 200 # OrderedDict slot, entry tuple, timestamps and bytes header (CPython, measured)
+
+
+class MemoryLRUStore:
+    """
+    In-process LRU of serialized entries, bounded by a byte budget that counts key,
+    payload and bookkeeping overhead. Entries over max_entry_bytes are not admitted,
+    so one huge record can't flush dozens of small hot ones.
+    """
+
+    def __init__(self, max_bytes=CACHE_MEMORY_BYTES, max_entry_bytes=CACHE_MAX_ENTRY_BYTES):
+        self.max_bytes = max_bytes
+        self.max_entry_bytes = max_entry_bytes or max(1, max_bytes // 8)
+        self._entries = OrderedDict() # key -> (payload, expires_at, stale_until)
+        self._bytes = 0
+        self._lock = threading.Lock()
+        self.evictions = 0
+        self.rejected = 0
+
+    def get_entry(self, key):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            if entry[2] <= time.time(): # Past the stale window: drop it
+                self._remove(key)
+                return None
+            self._entries.move_to_end(key)
+            return entry
+
+    def set_entry(self, key, payload, expires_at, stale_until):
+        size = self._entry_size(key, payload)
+        with self._lock:
+            if key in self._entries:
+                self._remove(key)
+            if size > self.max_entry_bytes:
+                self.rejected += 1
+                return # Too large for this tier; leave it to the next tier
+            while self._entries and self._bytes + size > self.max_bytes:
+                oldest = next(iter(self._entries))
+                self._remove(oldest)
+                self.evictions += 1
+            self._entries[key] = (payload, expires_at, stale_until)
+            self._bytes += size
+
+    def delete(self, key):
+        with self._lock:
+            if key in self._entries:
+                self._remove(key)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._bytes = 0
+
+    @staticmethod
+    def _entry_size(key, payload):
+        return len(key) + len(payload) + _ENTRY_OVERHEAD_BYTES
+
+    def _remove(self, key):
+        payload = self._entries.pop(key)[0]
+        self._bytes -= self._entry_size(key, payload)
+
+    def info(self):
+        with self._lock:
+            return {"entries": len(self._entries), "bytes": self._bytes, "max_bytes": self.max_bytes,
+                    "max_entry_bytes": self.max_entry_bytes, "evictions": self.evictions, "rejected": self.rejected}
+
+
+class SQLiteStore:
+    """
+    Local on-disk store shared by every worker process on the host.
+    WAL mode lets readers in other workers proceed while one writes.
+    """
+
+    def __init__(self, path=CACHE_DB_PATH):
+        self.path = path
+        self._local = threading.local()
+        self._writes = 0
+        self.purged = 0
+        self._conn().execute(
+            "CREATE TABLE IF NOT EXISTS cache_entries ("
+            " key TEXT PRIMARY KEY, value BLOB NOT NULL, expires_at REAL NOT NULL, stale_until REAL NOT NULL)")
+        self._conn().execute("CREATE INDEX IF NOT EXISTS idx_cache_stale_until ON cache_entries (stale_until)")
+        self._conn().commit()
+
+    def _conn(self):
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=5)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self._local.conn = conn
+        return conn
+
+    def get_entry(self, key):
+        row = self._conn().execute(
+            "SELECT value, expires_at, stale_until FROM cache_entries WHERE key = ? AND stale_until > ?",
+            (key, time.time())).fetchone()
+        return (bytes(row[0]), row[1], row[2]) if row else None
+
+    def set_entry(self, key, payload, expires_at, stale_until):
+        conn = self._conn()
+        conn.execute("INSERT OR REPLACE INTO cache_entries (key, value, expires_at, stale_until) VALUES (?, ?, ?, ?)",
+                     (key, sqlite3.Binary(payload), expires_at, stale_until))
+        conn.commit()
+        self._writes += 1
+        if self._writes % CACHE_PURGE_EVERY == 0:
+            self.purge_expired()
+
+    def delete(self, key):
+        conn = self._conn()
+        conn.execute("DELETE FROM cache_entries WHERE key = ?", (key,))
+        conn.commit()
+
+    def clear(self):
+        conn = self._conn()
+        conn.execute("DELETE FROM cache_entries")
+        conn.commit()
+
+    def purge_expired(self):
+        conn = self._conn()
+        removed = conn.execute("DELETE FROM cache_entries WHERE stale_until <= ?", (time.time(),)).rowcount
+        conn.commit()
+        self.purged += removed
+        return removed
+
+    def info(self):
+        count = self._conn().execute("SELECT COUNT(*) FROM cache_entries").fetchone()[0]
+        return {"entries": count, "path": self.path, "purged": self.purged}
+
+
+class TieredCache:
+    """
+    Looks keys up tier by tier (fastest first), promoting lower-tier hits upwards;
+    a stale entry is only used if no lower tier holds a fresher one.
+    Entries carry a TTL plus a stale window: within the window an expired value is
+    still returned (as STALE) while get_or_compute refreshes it in the background.
+    A failing tier is logged and skipped so cache trouble never fails a request.
+    """
+
+    def __init__(self, tiers, default_timeout=CACHE_DEFAULT_TIMEOUT, stale_seconds=CACHE_STALE_SECONDS):
+        self.tiers = tiers
+        self.default_timeout = default_timeout
+        self.stale_seconds = stale_seconds
+        self._stats_lock = threading.Lock()
+        self._stats = {"hits": 0, "stale_hits": 0, "misses": 0, "sets": 0, "errors": 0, "refreshes": 0}
+        self._tier_hits = [0] * len(tiers)
+        self._refreshing = set()
+        self._refresh_lock = threading.Lock()
+        self._refresh_executor = ThreadPoolExecutor(max_workers=2, thread_name_prefix="cache-refresh")
+        self._flights = SingleFlight() # One computation per key across concurrent misses
+
+    def _count(self, field):
+        with self._stats_lock:
+            self._stats[field] += 1
+
+    def lookup(self, key, min_ttl=0):
+        """Returns (value, FRESH | STALE), or (None, None) on a miss. Entries expiring within min_ttl seconds count as STALE."""
+        return self._lookup(key, count=True, min_ttl=min_ttl)
+
+    def ttl(self, key):
+        """Seconds until the entry for key expires (negative while stale), or None if there is no entry. Not counted in stats."""
+        for tier in self.tiers:
+            try:
+                entry = tier.get_entry(key)
+            except Exception as e:
+                logging.error(f"Cache tier {type(tier).__name__} read failed for '{key}': {e}")
+                continue
+            if entry is not None:
+                return entry[1] - time.time()
+        return None
+
+    def _lookup(self, key, count, min_ttl=0):
+        # A stale entry doesn't end the search: a lower tier shared with another process
+        # (e.g. SQLite refreshed by `prewarm.py run`) may hold a fresher copy
+        found = None # (index, value, payload, expires_at, stale_until) of the newest entry so far
+        for index, tier in enumerate(self.tiers):
+            try:
+                entry = tier.get_entry(key)
+            except Exception as e:
+                logging.error(f"Cache tier {type(tier).__name__} read failed for '{key}': {e}")
+                self._count("errors")
+                continue
+            if entry is None:
+                continue
+            payload, expires_at, stale_until = entry
+            if found is not None and expires_at <= found[3]:
+                continue
+            try:
+                value = record_codec.loads(payload)
+            except Exception as e: # Unknown format version, bad pickle, unregistered static table...
+                logging.error(f"Cache tier {type(tier).__name__} entry for '{key}' could not be decoded, dropping it: {e}")
+                self._count("errors")
+                try: tier.delete(key)
+                except Exception as delete_error: logging.warning(f"Could not drop undecodable entry '{key}': {delete_error}")
+                continue
+            found = (index, value, payload, expires_at, stale_until)
+            if expires_at > time.time() + min_ttl:
+                break
+        if found is None:
+            if count: self._count("misses")
+            return None, None
+        index, value, payload, expires_at, stale_until = found
+        for upper in self.tiers[:index]: # Promote into faster tiers
+            try: upper.set_entry(key, payload, expires_at, stale_until)
+            except Exception as e: logging.warning(f"Cache promotion failed for '{key}': {e}")
+        state = FRESH if expires_at > time.time() + min_ttl else STALE
+        if count:
+            with self._stats_lock:
+                self._stats["hits" if state == FRESH else "stale_hits"] += 1
+                self._tier_hits[index] += 1
+        return value, state
+
+    def get(self, key):
+        """Fresh or stale value, or None."""
+        return self.lookup(key)[0]
+
+    def set(self, key, value, timeout=None, stale_seconds=None):
+        timeout = self.default_timeout if timeout is None else timeout
+        stale_seconds = self.stale_seconds if stale_seconds is None else stale_seconds
+        payload = record_codec.dumps(value)
+        expires_at = time.time() + timeout
+        stale_until = expires_at + stale_seconds
+        for tier in self.tiers:
+            try:
+                tier.set_entry(key, payload, expires_at, stale_until)
+            except Exception as e:
+                logging.error(f"Cache tier {type(tier).__name__} write failed for '{key}': {e}")
+                self._count("errors")
+        self._count("sets")
+
+    def delete(self, key):
+        for tier in self.tiers:
+            try: tier.delete(key)
+            except Exception as e: logging.error(f"Cache delete failed for '{key}': {e}")
+
+    def clear(self):
+        for tier in self.tiers:
+            tier.clear()
+
+    def get_or_compute(self, key, compute, timeout=None, wait_seconds=CACHE_COMPUTE_WAIT_SECONDS):
+        """
+        Returns (value, status) where status is "HIT", "STALE", "MISS" or "COALESCED".
+        A miss computes synchronously, and concurrent misses on the same key share one
+        computation: followers wait up to wait_seconds and get the leader's value
+        ("COALESCED") or its exception. A stale hit is returned at once and refreshed
+        in the background. timeout may be a callable taking the computed value.
+        """
+        value, state = self.lookup(key)
+        if state == FRESH:
+            return value, "HIT"
+        if state == STALE:
+            self._refresh_in_background(key, compute, timeout)
+            return value, "STALE"
+
+        def compute_and_store():
+            # A leader that starts just after another flight finished finds the fresh value here
+            cached, cached_state = self._lookup(key, count=False)
+            if cached_state == FRESH:
+                return cached, "HIT"
+            computed = compute()
+            self.set(key, computed, timeout=timeout(computed) if callable(timeout) else timeout)
+            return computed, "MISS"
+
+        (value, status), shared = self._flights.do(key, compute_and_store, timeout=wait_seconds)
+        return value, "COALESCED" if shared else status
+
+    def refresh(self, key, compute, timeout=None):
+        """
+        Recomputes and stores key now, whatever its state; returns the new value.
+        Shares the flight with any concurrent miss or refresh of the same key.
+        """
+        def compute_and_store():
+            value = compute()
+            self.set(key, value, timeout=timeout(value) if callable(timeout) else timeout)
+            return value, "MISS" # Same shape as get_or_compute's flight, since a miss may join this one
+
+        (value, _status), _shared = self._flights.do(key, compute_and_store)
+        self._count("refreshes")
+        return value
+
+    def _refresh_in_background(self, key, compute, timeout):
+        with self._refresh_lock:
+            if key in self._refreshing:
+                return # Already being refreshed
+            self._refreshing.add(key)
+
+        def refresh():
+            try:
+                if self._lookup(key, count=False)[1] == FRESH:
+                    return # Refreshed meanwhile by another process sharing a lower tier
+                self.refresh(key, compute, timeout)
+                logging.info(f"Background refresh completed for cache key '{key}'")
+            except Exception as e:
+                logging.error(f"Background refresh failed for cache key '{key}': {e}")
+                self._count("errors")
+            finally:
+                with self._refresh_lock:
+                    self._refreshing.discard(key)
+
+        self._refresh_executor.submit(refresh)
+
+    def stats(self):
+        with self._stats_lock:
+            stats = dict(self._stats)
+            tier_hits = list(self._tier_hits)
+        lookups = stats["hits"] + stats["stale_hits"] + stats["misses"]
+        stats["hit_ratio"] = round((stats["hits"] + stats["stale_hits"]) / lookups, 4) if lookups else 0.0
+        stats["single_flight"] = self._flights.stats()
+        stats["tiers"] = []
+        for tier, hits in zip(self.tiers, tier_hits):
+            try: info = tier.info()
+            except Exception as e: info = {"error": str(e)}
+            stats["tiers"].append({"tier": type(tier).__name__, "hits": hits, **info})
+        return stats
+
+
+def build_cache(backend=CACHE_BACKEND, db_path=CACHE_DB_PATH, memory_bytes=CACHE_MEMORY_BYTES):
+    """Creates the cache for the configured backend, falling back to memory-only if the disk store can't be opened."""
+    tiers = []
+    if backend in ("tiered", "memory"):
+        tiers.append(MemoryLRUStore(memory_bytes))
+    if backend in ("tiered", "sqlite"):
+        try:
+            tiers.append(SQLiteStore(db_path))
+        except sqlite3.Error as e:
+            logging.error(f"Could not open cache database {db_path}: {e}. Using in-memory cache only.")
+    if not tiers:
+        tiers.append(MemoryLRUStore(memory_bytes))
+    return TieredCache(tiers)
+
+
+cache = build_cache()
 
 def init_cache(app):
   """Initializes the cache with the Flask app instance."""
   try:
-      cache.init_app(app)
-      logging.info("Flask-Caching initialized successfully.")
+      # Backends are configured through the environment (CACHE_BACKEND, CACHE_DB_PATH, CACHE_MEMORY_BYTES)
+      app.extensions["founder_cache"] = cache
+      logging.info(f"Cache initialized successfully ({' -> '.join(type(t).__name__ for t in cache.tiers)}).")
   except Exception as e:
-      logging.error(f"Failed to initialize Flask-Caching: {e}")
\ No newline at end of file
+      logging.error(f"Failed to initialize cache: {e}")
@@ -0,0 +1,112 @@
+# data/build_gazetteer.py
+"""
+Regenerates data/gazetteer.tsv from the GeoNames extracts bundled with the
+`geonamescache` package (GeoNames data, CC BY 4.0). Not needed at runtime.
+
+    pip install geonamescache
+    python data/build_gazetteer.py
+"""
+import os
+import csv
+import geonamescache
+
+MIN_CITY_POPULATION = 100000
+OUTPUT = os.path.join(os.path.dirname(os.path.abspath(__file__)), "gazetteer.tsv")
+
+# City names that are far more often ordinary words or people's names in English text
+CITY_STOPLIST = {
+    "Ajax", "Ann", "Aurora", "Bath", "Bo", "Cary", "Chas", "Columbia", "Commerce", "Deal", "Enterprise",
+    "Florence", "Franklin", "Gary", "Hub", "Independence", "Jackson", "Jefferson", "Lincoln", "Madison",
+    "Male", "Man", "Mary", "Mesa", "Mobile", "Nice", "Normal", "Of", "Ogden", "Oral", "Orange", "Palo",
+    "Pare", "Reading", "Salem", "Split", "Sale", "Surprise", "Victoria", "Wellington", "Warren", "Ho",
+    "Kent", "Hamilton", "Lafayette", "Pueblo", "Beaumont", "Arlington", "Temple", "Troy", "Miri", "Ise",
+    "Kita", "Ota", "Gao", "Jos", "Osh", "Aba", "Ede", "Ica", "Itu", "Iwo", "Owo", "Oyo", "Ibb", "Fes",
+    "Mau", "Ōta", "Hino", "Noda", "Nada", "Kara", "Kaya", "Kira", "Mati", "Moro", "Bama", "Lira", "Loni",
+}
+
+# Extra spellings, old names and abbreviations (alias -> entry name as written in GeoNames)
+EXTRA_ALIASES = {
+    "New York City": ["New York", "NYC", "Manhattan", "Brooklyn"],
+    "San Francisco": ["SF", "Bay Area", "San Francisco Bay Area", "Silicon Valley"],
+    "Los Angeles": ["LA"],
+    "Washington": ["Washington DC", "Washington D.C.", "DC"],
+    "Bengaluru": ["Bangalore"],
+    "Mumbai": ["Bombay"],
+    "Chennai": ["Madras"],
+    "Kolkata": ["Calcutta"],
+    "Gurugram": ["Gurgaon"],
+    "Delhi": ["New Delhi", "NCR"],
+    "Ho Chi Minh City": ["Saigon", "HCMC"],
+    "Beijing": ["Peking"],
+    "Kyiv": ["Kiev"],
+    "Munich": ["München"],
+    "Cologne": ["Köln"],
+    "Tel Aviv": ["Tel Aviv-Yafo"],
+    "United States": ["USA", "US", "U.S.", "U.S.A.", "America", "United States of America"],
+    "United Kingdom": ["UK", "U.K.", "Britain", "Great Britain", "England"],
+    "United Arab Emirates": ["UAE"],
+    "South Korea": ["Korea"],
+    "Netherlands": ["Holland", "The Netherlands"],
+}
+
+# Two-letter state codes that collide with common all-caps words (IN, OR, ME, OK, ...)
+AMBIGUOUS_STATE_CODES = {"IN", "OR", "ME", "OK", "HI", "DE", "PA", "CO", "MA", "AL", "LA", "ID", "MD", "MO", "MT", "SD", "ND", "NE", "AR", "GA", "VA", "DC"}
+
+
+def main():
+    gc = geonamescache.GeonamesCache()
+    cities = list(gc.get_cities().values())
+    countries = gc.get_countries()
+    states = gc.get_us_states()
+    rows = []
+
+    for city in cities:
+        if city["population"] < MIN_CITY_POPULATION or city["name"] in CITY_STOPLIST or len(city["name"]) < 3:
+            continue
+        country = countries.get(city["countrycode"], {}).get("name", city["countrycode"])
+        region = city["admin1code"] if city["countrycode"] == "US" else country
+        rows.append({
+            "name": city["name"], "display": f"{city['name']}, {region}", "kind": "city",
+            "country": city["countrycode"], "lat": city["latitude"], "lon": city["longitude"],
+            "population": city["population"], "aliases": EXTRA_ALIASES.get(city["name"], []),
+        })
+
+    by_country = {}
+    for city in cities:
+        by_country.setdefault(city["countrycode"], []).append(city)
+
+    for code, country in countries.items():
+        candidates = by_country.get(code, [])
+        if not candidates: continue
+        # Represent the country by its capital (or, failing that, its largest city)
+        anchor = next((c for c in candidates if c["name"] == country["capital"]), None) or max(candidates, key=lambda c: c["population"])
+        rows.append({
+            "name": country["name"], "display": country["name"], "kind": "country", "country": code,
+            "lat": anchor["latitude"], "lon": anchor["longitude"], "population": country["population"],
+            "aliases": EXTRA_ALIASES.get(country["name"], []),
+        })
+
+    for code, state in states.items():
+        state_cities = [c for c in by_country.get("US", []) if c["admin1code"] == code]
+        if not state_cities: continue
+        anchor = max(state_cities, key=lambda c: c["population"]) # Largest city as the state's map point
+        rows.append({
+            "name": state["name"], "display": f"{state['name']}, USA", "kind": "region", "country": "US",
+            "lat": anchor["latitude"], "lon": anchor["longitude"],
+            "population": sum(c["population"] for c in state_cities),
+            "aliases": [] if code in AMBIGUOUS_STATE_CODES else [code],
+        })
+
+    rows.sort(key=lambda r: (r["kind"] != "country", r["kind"] != "region", -r["population"]))
+    with open(OUTPUT, "w", newline="", encoding="utf-8") as f:
+        f.write("# Generated by data/build_gazetteer.py from GeoNames (https://www.geonames.org, CC BY 4.0)\n")
+        writer = csv.writer(f, delimiter="\t", lineterminator="\n")
+        writer.writerow(["name", "display", "kind", "country", "lat", "lon", "population", "aliases"])
+        for r in rows:
+            writer.writerow([r["name"], r["display"], r["kind"], r["country"], f"{r['lat']:.4f}", f"{r['lon']:.4f}",
+                             r["population"], "|".join(r["aliases"])])
+    print(f"Wrote {len(rows)} entries to {OUTPUT}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,120 @@
+# extract.py
+"""
+Targeted HTML extraction for the pages we scrape (DuckDuckGo HTML results and
+Failory). Pages are parsed with lxml and only the nodes we need are visited with
+compiled XPath expressions, instead of building and walking a BeautifulSoup tree.
+Results come back as small typed records.
+"""
+from typing import Dict, List, NamedTuple, Optional
+from urllib.parse import urlsplit, parse_qs
+from lxml import etree, html as lxml_html
+
+
+class SearchResult(NamedTuple):
+    title: str
+    url: str # Target URL, with DuckDuckGo's /l/?uddg= redirect removed
+    snippet: str
+
+
+class DDGPage(NamedTuple):
+    results: List[SearchResult]
+    next_params: Optional[Dict[str, str]] # Form fields to POST for the next page; None on the last page
+
+
+class FailoryLink(NamedTuple):
+    href: str
+    text: str
+
+
+class FailoryArticle(NamedTuple):
+    title: str
+    url: str
+    snippet: str # Non-empty paragraphs joined by newlines
+    paragraphs: List[str]
+
+
+def _has_class(name):
+    return f"contains(concat(' ', normalize-space(@class), ' '), ' {name} ')"
+
+# Compiled once; XPath evaluation runs in C and yields only the matching elements
+_DDG_RESULTS = etree.XPath(f"//div[{_has_class('result__body')}]")
+_DDG_FALLBACK_RESULTS = etree.XPath(f"//td[{_has_class('result-link')}]")
+_DDG_TITLE = etree.XPath(f".//a[{_has_class('result__a')}]")
+_DDG_SNIPPET = etree.XPath(f".//a[{_has_class('result__snippet')}]")
+_DDG_NEXT_FORM = etree.XPath(f"//div[{_has_class('nav-link')}]//form[.//input[@type='submit' and @value='Next']]")
+_FORM_FIELDS = etree.XPath(".//input[@name and (@type='hidden' or not(@type))]")
+_FAILORY_LIST = etree.XPath(f"//div[{_has_class('fs-cmsfilter_list')}]")
+_LINKS = etree.XPath(".//a[@href]")
+_H1 = etree.XPath("//h1")
+_FAILORY_RICH_TEXT = etree.XPath(f"//div[{_has_class('rich-text-block')}]")
+_ARTICLE = etree.XPath("//article")
+_PARAGRAPHS = etree.XPath(".//p | .//li")
+
+# A parser per call is cheap; lxml parsers are not safe to share between threads
+def _parse(page_html):
+    parser = lxml_html.HTMLParser(remove_comments=True, remove_pis=True, no_network=True)
+    return lxml_html.document_fromstring(page_html, parser=parser)
+
+
+def _text(element):
+    return element.text_content().strip() if element is not None else ""
+
+
+def unwrap_ddg_url(href):
+    """Resolves DuckDuckGo's //duckduckgo.com/l/?uddg=<target> redirect links to the target URL."""
+    if not href: return href
+    parts = urlsplit(href)
+    if parts.path.startswith("/l/") and "duckduckgo.com" in (parts.netloc or "duckduckgo.com"):
+        target = parse_qs(parts.query).get("uddg")
+        if target: return target[0]
+    return href
+
+
+def parse_ddg_page(page_html, limit=None):
+    """Result records plus the "Next" form fields of a DuckDuckGo HTML results page, from one parse."""
+    if not page_html: return DDGPage([], None)
+    root = _parse(page_html)
+    next_forms = _DDG_NEXT_FORM(root)
+    next_params = {field.get("name"): field.get("value", "") for field in _FORM_FIELDS(next_forms[0])} if next_forms else None
+    return DDGPage(_ddg_results(root, limit), next_params)
+
+
+def parse_ddg_results(page_html, limit=None):
+    """Extracts result records from a DuckDuckGo HTML results page, in page order; results without a snippet are skipped."""
+    if not page_html: return []
+    return _ddg_results(_parse(page_html), limit)
+
+
+def _ddg_results(root, limit):
+    containers = _DDG_RESULTS(root) or _DDG_FALLBACK_RESULTS(root)
+    results = []
+    for container in containers:
+        snippet_tags = _DDG_SNIPPET(container)
+        snippet = _text(snippet_tags[0]) if snippet_tags else ""
+        if not snippet: continue
+        title_tags = _DDG_TITLE(container)
+        title_tag = title_tags[0] if title_tags else None
+        title = _text(title_tag) or "Result Title"
+        url = unwrap_ddg_url(title_tag.get("href")) if title_tag is not None and title_tag.get("href") else "#"
+        results.append(SearchResult(title, url, snippet))
+        if limit and len(results) >= limit: break
+    return results
+
+
+def parse_failory_links(page_html):
+    """All links in the Failory search result list (or the whole page if the list isn't found)."""
+    if not page_html: return []
+    root = _parse(page_html)
+    containers = _FAILORY_LIST(root)
+    scope = containers[0] if containers else root
+    return [FailoryLink(link.get("href", ""), link.text_content()) for link in _LINKS(scope)]
+
+
+def parse_failory_article(page_html, url):
+    """Title and paragraph text of a Failory failure story."""
+    root = _parse(page_html)
+    headings = _H1(root)
+    title = _text(headings[0]) if headings else ""
+    content = _FAILORY_RICH_TEXT(root) or _ARTICLE(root)
+    paragraphs = [_text(p) for p in _PARAGRAPHS(content[0])] if content else []
+    return FailoryArticle(title or "Failory Article", url, "\n".join(p for p in paragraphs if p), paragraphs)
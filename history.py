@@ -0,0 +1,398 @@
+# history.py
+"""
+Indexed search history.
+
+Every logged search is also stored in a local SQLite database indexed by
+normalised query and timestamp, next to a per-day/per-industry rollup that is
+updated in the same transaction. Per-founder history reads one index range and
+aggregate questions (top industries, daily trend, controversy hit rate) read the
+rollup, so both stay in the millisecond range however many rows are stored.
+
+Searches logged while the app runs are written here directly, so importing is
+only needed for CSV logs written before the history store existed. An import
+skips rows that are already stored (same second and entity key, whether they
+came from the live listener or an earlier import), so it is safe to re-run,
+also on the live search_log.csv or on a file that has since been rotated:
+    python history.py import search_log.2025-04-07.1.csv search_log.csv
+"""
+import os
+import csv
+import sys
+import time
+import sqlite3
+import threading
+import logging
+import normalize
+from collections import defaultdict
+from datetime import datetime, timedelta
+
+logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+
+# --- History Configuration ---
+HISTORY_DB_PATH = os.environ.get("HISTORY_DB_PATH", "search_history.sqlite3")
+HISTORY_IMPORT_BATCH = 5000 # Rows per transaction when importing CSV logs
+MAX_HISTORY_ROWS = 1000 # Cap for per-founder history responses
+NO_INDUSTRY = "" # Rollup bucket for searches without an identified industry
+
+SCHEMA = (
+    "CREATE TABLE IF NOT EXISTS searches ("
+    " id INTEGER PRIMARY KEY,"
+    " ts REAL NOT NULL,"                # Unix time of the search
+    " query TEXT NOT NULL,"
+    " query_key TEXT NOT NULL,"         # normalize_query(query), the canonical entity key
+    " reputation_score INTEGER,"
+    " sentiment_label TEXT,"
+    " sentiment_compound REAL,"         # Score components are kept so records can be re-scored later
+    " failure_count INTEGER NOT NULL DEFAULT 0,"
+    " controversy_hits INTEGER NOT NULL DEFAULT 0,"
+    " industry TEXT,"
+    " locations TEXT,"
+    " cache_status TEXT,"
+    " origin TEXT NOT NULL,"            # 'live' or the CSV file it was imported from
+    " score_version TEXT)",             # scoring.py weights the score was computed with (NULL: the original v1)
+    "CREATE INDEX IF NOT EXISTS idx_searches_query_ts ON searches (query_key, ts)",
+    "CREATE INDEX IF NOT EXISTS idx_searches_ts ON searches (ts)",
+    "CREATE TABLE IF NOT EXISTS daily_rollup ("
+    " day TEXT NOT NULL, industry TEXT NOT NULL,"
+    " searches INTEGER NOT NULL, scored INTEGER NOT NULL, score_sum REAL NOT NULL,"
+    " with_controversies INTEGER NOT NULL, with_failures INTEGER NOT NULL,"
+    " PRIMARY KEY (day, industry)) WITHOUT ROWID",
+)
+
+MIGRATIONS = ( # (column, ALTER TABLE) for databases created before the column existed
+    ("score_version", "ALTER TABLE searches ADD COLUMN score_version TEXT"),
+)
+KEY_VERSION = 1 # PRAGMA user_version once query_key holds canonical keys (0: lower-cased, whitespace-collapsed)
+
+_INSERT_SQL = ("INSERT INTO searches (ts, query, query_key, reputation_score, sentiment_label, sentiment_compound,"
+               " failure_count, controversy_hits, industry, locations, cache_status, origin, score_version)"
+               " VALUES (:ts, :query, :query_key, :reputation_score, :sentiment_label, :sentiment_compound,"
+               " :failure_count, :controversy_hits, :industry, :locations, :cache_status, :origin, :score_version)")
+
+_ROLLUP_SQL = ("INSERT INTO daily_rollup (day, industry, searches, scored, score_sum, with_controversies, with_failures)"
+               " VALUES (?, ?, ?, ?, ?, ?, ?)"
+               " ON CONFLICT (day, industry) DO UPDATE SET"
+               " searches = searches + excluded.searches, scored = scored + excluded.scored,"
+               " score_sum = score_sum + excluded.score_sum,"
+               " with_controversies = with_controversies + excluded.with_controversies,"
+               " with_failures = with_failures + excluded.with_failures")
+
+_REBUILD_ROLLUP_SQL = ("INSERT INTO daily_rollup (day, industry, searches, scored, score_sum, with_controversies, with_failures)"
+                       " SELECT date(ts, 'unixepoch', 'localtime'), COALESCE(industry, ''), COUNT(*), COUNT(reputation_score),"
+                       " COALESCE(SUM(reputation_score), 0), SUM(controversy_hits > 0), SUM(failure_count > 0)"
+                       " FROM searches GROUP BY 1, 2")
+
+
+def normalize_query(query):
+    """History key for a query: its canonical entity key, so Zepto / Zepto Inc / zepto.com share one history."""
+    return normalize.canonical_key(str(query))
+
+
+def _to_int(value):
+    try:
+        return int(float(value))
+    except (TypeError, ValueError):
+        return None
+
+
+def record_from_founder_data(data, cache_status, timestamp):
+    """Flattens founder_data (as logged by a search) into a history row."""
+    analysis = data.get('analysis', {})
+    insights = data.get('failure_industry_insights', {})
+    query = data.get('query', '')
+    return {
+        "ts": timestamp.timestamp(),
+        "query": query,
+        "query_key": normalize_query(query),
+        "reputation_score": _to_int(analysis.get('reputation_score')),
+        "sentiment_label": analysis.get('sentiment_label'),
+        "sentiment_compound": data.get('web_sentiment', {}).get('overall_sentiment', {}).get('compound'),
+        "failure_count": len(insights.get('failed_startups') or []),
+        "controversy_hits": len(data.get('controversies', {}).get('potential_hits') or []),
+        "industry": insights.get('identified_industry'),
+        "locations": ", ".join(loc.get('name', '') for loc in analysis.get('locations', []) if loc.get('name')),
+        "cache_status": cache_status,
+        "origin": "live",
+        "score_version": analysis.get('score_version'),
+    }
+
+
+def record_from_csv_row(row, origin):
+    """
+    Converts a search_log.csv row. The CSV has no compound score and only a found/not-found failure flag,
+    so failure_count is 0 or 1 here (the real count is unknown; scoring.rescore_history skips these rows).
+    """
+    try:
+        ts = datetime.strptime(row.get('timestamp', ''), '%Y-%m-%d %H:%M:%S').timestamp()
+    except ValueError:
+        return None
+    query = row.get('query') or ''
+    industry = row.get('industry_identified')
+    return {
+        "ts": ts,
+        "query": query,
+        "query_key": normalize_query(query),
+        "reputation_score": _to_int(row.get('reputation_score')),
+        "sentiment_label": row.get('sentiment_label') or None,
+        "sentiment_compound": None,
+        "failure_count": 1 if row.get('failory_specific_failure_found') == 'True' else 0,
+        "controversy_hits": _to_int(row.get('controversy_hits_count')) or 0,
+        "industry": None if industry in (None, '', 'N/A') else industry,
+        "locations": row.get('location_names_found') or '',
+        "cache_status": row.get('cache_status') or None,
+        "origin": origin,
+        "score_version": None,
+    }
+
+
+class HistoryStore:
+    """SQLite search history; one connection per thread, WAL so reads don't wait on the log writer."""
+
+    def __init__(self, path=HISTORY_DB_PATH):
+        self.path = path
+        self._local = threading.local()
+        conn = self._conn()
+        for statement in SCHEMA:
+            conn.execute(statement)
+        columns = {row["name"] for row in conn.execute("PRAGMA table_info(searches)")}
+        for column, statement in MIGRATIONS:
+            if column not in columns: conn.execute(statement)
+        conn.commit()
+        if conn.execute("PRAGMA user_version").fetchone()[0] < KEY_VERSION:
+            self._rekey()
+
+    def _rekey(self):
+        """Recomputes query_key for every stored query (one UPDATE per distinct spelling)."""
+        conn = self._conn()
+        queries = [row[0] for row in conn.execute("SELECT DISTINCT query FROM searches")]
+        with conn:
+            conn.executemany("UPDATE searches SET query_key = ? WHERE query = ?", [(normalize_query(query), query) for query in queries])
+            conn.execute(f"PRAGMA user_version = {KEY_VERSION}")
+        if queries: logging.info(f"History keys rebuilt as canonical entity keys for {len(queries)} distinct queries")
+
+    def _conn(self):
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=10)
+            conn.row_factory = sqlite3.Row
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self._local.conn = conn
+        return conn
+
+    def add_records(self, records):
+        """Inserts history rows and folds them into the daily rollup in one transaction."""
+        records = [record for record in records if record and record["query_key"]]
+        if not records: return 0
+        rollup = defaultdict(lambda: [0, 0, 0.0, 0, 0])
+        for record in records:
+            record.setdefault("score_version", None) # Unversioned rows count as the original v1 scoring
+            day = datetime.fromtimestamp(record["ts"]).strftime('%Y-%m-%d')
+            bucket = rollup[(day, record["industry"] or NO_INDUSTRY)]
+            bucket[0] += 1
+            if record["reputation_score"] is not None:
+                bucket[1] += 1
+                bucket[2] += record["reputation_score"]
+            bucket[3] += record["controversy_hits"] > 0
+            bucket[4] += record["failure_count"] > 0
+        conn = self._conn()
+        with conn:
+            conn.executemany(_INSERT_SQL, records)
+            conn.executemany(_ROLLUP_SQL, [(day, industry, *values) for (day, industry), values in rollup.items()])
+        return len(records)
+
+    def record_batch(self, batch):
+        """Search-log listener: batch is a list of (timestamp, founder_data, cache_status)."""
+        self.add_records([record_from_founder_data(data, cache_status, timestamp) for timestamp, data, cache_status in batch])
+
+    def import_csv(self, path):
+        """
+        Imports a search_log.csv. Rows already stored are skipped: the CSV has one-second timestamps, so a
+        row counts as stored when the history holds as many searches for its entity key in that second.
+        """
+        imported = skipped = duplicates = 0
+        seen = defaultdict(int) # (second, query_key) -> rows of this file read so far
+        with open(path, newline='', encoding='utf-8') as f:
+            batch = []
+            for csv_row in csv.DictReader(f):
+                record = record_from_csv_row(csv_row, origin=os.path.basename(path))
+                if record is None:
+                    skipped += 1
+                    continue
+                batch.append(record)
+                if len(batch) >= HISTORY_IMPORT_BATCH:
+                    new = self._not_stored(batch, seen)
+                    imported += self.add_records(new)
+                    duplicates += len(batch) - len(new)
+                    batch = []
+            new = self._not_stored(batch, seen)
+            imported += self.add_records(new)
+            duplicates += len(batch) - len(new)
+        logging.info(f"Imported {imported} search(es) from {path} ({skipped} malformed, {duplicates} already stored)")
+        return {"path": path, "imported": imported, "skipped": skipped, "already_imported": duplicates}
+
+    def _not_stored(self, records, seen):
+        """The records whose (second, query_key) occurrences in the file exceed what the history already holds."""
+        by_second = defaultdict(list)
+        for record in records:
+            by_second[(int(record["ts"]), record["query_key"])].append(record)
+        conn = self._conn()
+        new = []
+        for (second, query_key), group in by_second.items():
+            stored = conn.execute("SELECT COUNT(*) FROM searches WHERE query_key = ? AND ts >= ? AND ts < ?",
+                                  (query_key, second, second + 1)).fetchone()[0]
+            missing = seen[(second, query_key)] + len(group) - stored # Earlier batches' inserts are in `stored`
+            if missing > 0: new.extend(group[-missing:])
+            seen[(second, query_key)] += len(group)
+        return new
+
+    # --- Re-scoring (scoring.rescore_history) ---
+
+    def score_components(self):
+        """
+        Every row's (ids, compounds, failure counts, controversy hits, scores, score versions, exact failure count)
+        as column tuples. Rows imported from CSV logs only know whether a failure was found (count 0/1), not how many.
+        """
+        cursor = self._conn().cursor()
+        cursor.row_factory = None # Plain tuples: this reads the whole table
+        rows = cursor.execute("SELECT id, sentiment_compound, failure_count, controversy_hits, reputation_score, score_version,"
+                              " origin = 'live' FROM searches").fetchall()
+        return tuple(zip(*rows)) if rows else ((), (), (), (), (), (), ())
+
+    def update_scores(self, ids, scores, version, skipped=()):
+        """
+        Stores re-scored rows (ids and scores in the same order; None leaves a row unscored), marks every row
+        as scored with `version` except the (id, version) pairs in `skipped`, which keep theirs, and rebuilds the rollup.
+        """
+        conn = self._conn()
+        with conn:
+            conn.executemany("UPDATE searches SET reputation_score = ? WHERE id = ?", zip(scores, ids))
+            conn.execute("UPDATE searches SET score_version = ?", (version,))
+            conn.executemany("UPDATE searches SET score_version = ? WHERE id = ?", [(row_version, row_id) for row_id, row_version in skipped])
+            conn.execute("DELETE FROM daily_rollup")
+            conn.execute(_REBUILD_ROLLUP_SQL)
+
+    # --- Queries ---
+
+    def founder_history(self, query, limit=100, since=None):
+        """Most recent searches for one founder/startup (newest first)."""
+        rows = self._conn().execute(
+            "SELECT ts, query, reputation_score, sentiment_label, sentiment_compound, failure_count,"
+            " controversy_hits, industry, cache_status FROM searches"
+            " WHERE query_key = ? AND ts >= ? ORDER BY ts DESC LIMIT ?",
+            (normalize_query(query), since or 0, min(limit, MAX_HISTORY_ROWS))).fetchall()
+        history = [dict(row) for row in rows]
+        for entry in history:
+            entry["timestamp"] = datetime.fromtimestamp(entry.pop("ts")).strftime('%Y-%m-%d %H:%M:%S')
+        scores = [entry["reputation_score"] for entry in history if entry["reputation_score"] is not None]
+        return {
+            "query": query,
+            "searches": len(history),
+            "latest_score": scores[0] if scores else None,
+            "average_score": round(sum(scores) / len(scores), 2) if scores else None,
+            "score_change": scores[0] - scores[-1] if len(scores) > 1 else 0,
+            "history": history,
+        }
+
+    def hot_queries(self, days=7, limit=25, half_life_hours=24.0, now=None):
+        """
+        Most in-demand founders over the last `days` days, by recency-weighted search count:
+        each search counts 0.5 ** (age / half_life), so a burst today outranks the same burst last week.
+        Searches are bucketed by hour, so the scan is one index range and at most 24 rows per founder-day.
+        """
+        now = time.time() if now is None else now
+        rows = self._conn().execute(
+            "SELECT query_key, CAST(ts / 3600 AS INTEGER) AS hour, COUNT(*) AS searches, MAX(ts) AS last_ts, MAX(query) AS query"
+            " FROM searches WHERE ts >= ? GROUP BY query_key, hour", (now - days * 86400,)).fetchall()
+        hot = {}
+        for row in rows:
+            age_hours = max(0.0, (now - row["last_ts"]) / 3600)
+            entry = hot.setdefault(row["query_key"], {"query": row["query"], "query_key": row["query_key"],
+                                                      "searches": 0, "score": 0.0, "last_ts": 0.0})
+            entry["searches"] += row["searches"]
+            entry["score"] += row["searches"] * 0.5 ** (age_hours / half_life_hours)
+            if row["last_ts"] > entry["last_ts"]:
+                entry["last_ts"], entry["query"] = row["last_ts"], row["query"]
+        ranked = sorted(hot.values(), key=lambda entry: entry["score"], reverse=True)[:limit]
+        for entry in ranked:
+            entry["score"] = round(entry["score"], 4)
+            entry["last_searched"] = datetime.fromtimestamp(entry.pop("last_ts")).strftime('%Y-%m-%d %H:%M:%S')
+        return ranked
+
+    def known_queries(self):
+        """Every founder/startup ever searched: (latest spelling, search count, last search time), one row per history key."""
+        return [tuple(row) for row in self._conn().execute(
+            "SELECT query, COUNT(*) AS searches, MAX(ts) AS last_ts FROM searches GROUP BY query_key")]
+
+    def _rollup(self, days, group_by):
+        since = (datetime.now() - timedelta(days=days - 1)).strftime('%Y-%m-%d')
+        return self._conn().execute(
+            f"SELECT {group_by} AS bucket, SUM(searches) AS searches, SUM(scored) AS scored, SUM(score_sum) AS score_sum,"
+            " SUM(with_controversies) AS with_controversies, SUM(with_failures) AS with_failures"
+            f" FROM daily_rollup WHERE day >= ? GROUP BY {group_by}", (since,)).fetchall()
+
+    @staticmethod
+    def _summarise(row):
+        searches = row["searches"] or 0
+        return {
+            "searches": searches,
+            "average_score": round(row["score_sum"] / row["scored"], 2) if row["scored"] else None,
+            "controversy_hit_rate": round(row["with_controversies"] / searches, 4) if searches else 0.0,
+            "failure_rate": round(row["with_failures"] / searches, 4) if searches else 0.0,
+        }
+
+    def summary(self, days=7):
+        """Totals over the last `days` days (today included)."""
+        rows = self._rollup(days, "'all'")
+        totals = self._summarise(rows[0]) if rows else self._summarise({"searches": 0, "scored": 0, "score_sum": 0,
+                                                                         "with_controversies": 0, "with_failures": 0})
+        return {"days": days, **totals}
+
+    def top_industries(self, days=7, limit=10):
+        rows = [row for row in self._rollup(days, "industry") if row["bucket"] != NO_INDUSTRY]
+        rows.sort(key=lambda row: row["searches"], reverse=True)
+        return {"days": days, "industries": [{"industry": row["bucket"], **self._summarise(row)} for row in rows[:limit]]}
+
+    def daily_trend(self, days=30):
+        rows = sorted(self._rollup(days, "day"), key=lambda row: row["bucket"])
+        return {"days": days, "trend": [{"day": row["bucket"], **self._summarise(row)} for row in rows]}
+
+    def info(self):
+        conn = self._conn()
+        return {"path": self.path, "searches": conn.execute("SELECT COUNT(*) FROM searches").fetchone()[0],
+                "rollup_rows": conn.execute("SELECT COUNT(*) FROM daily_rollup").fetchone()[0]}
+
+
+_store = None
+_store_lock = threading.Lock()
+
+
+def get_store():
+    """The process-wide HistoryStore, opened on first use; None if the database can't be opened."""
+    global _store
+    if _store is None:
+        with _store_lock:
+            if _store is None:
+                try:
+                    _store = HistoryStore()
+                except sqlite3.Error as e:
+                    logging.error(f"Could not open history database {HISTORY_DB_PATH}: {e}")
+                    return None
+    return _store
+
+
+def record_batch(batch):
+    """Search-log listener that writes to the process-wide store (runs on the log writer thread)."""
+    store = get_store()
+    if store is not None:
+        store.record_batch(batch)
+
+
+if __name__ == '__main__':
+    if len(sys.argv) < 3 or sys.argv[1] != "import":
+        print(__doc__)
+        sys.exit(2)
+    store = HistoryStore()
+    for csv_path in sys.argv[2:]:
+        print(store.import_csv(csv_path))
+    print(store.info())
@@ -0,0 +1,199 @@
+# http_client.py
+import os
+import time
+import random
+import threading
+import contextvars
+import logging
+from contextlib import contextmanager
+from urllib.parse import urlsplit
+import requests
+from requests.adapters import HTTPAdapter
+import rate_limit # Per-host token buckets shared by every thread
+import metrics
+
+logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+
+# --- Pool / Retry Configuration ---
+HTTP_POOL_HOSTS = int(os.environ.get("HTTP_POOL_HOSTS", 10)) # Number of per-host pools kept alive
+HTTP_POOL_MAXSIZE = int(os.environ.get("HTTP_POOL_MAXSIZE", 8)) # Max open connections per host
+# Wait for a free connection instead of opening extras. Off by default: requests gives urllib3 no pool timeout,
+# so a blocked wait isn't bounded by deadline(); extras opened under load are closed when returned to a full pool.
+HTTP_POOL_BLOCK = os.environ.get("HTTP_POOL_BLOCK", "0") == "1"
+HTTP_TIMEOUT = float(os.environ.get("HTTP_TIMEOUT", 15))
+HTTP_MAX_RETRIES = int(os.environ.get("HTTP_MAX_RETRIES", 2))
+HTTP_BACKOFF_BASE = float(os.environ.get("HTTP_BACKOFF_BASE", 0.5)) # Seconds, doubled per attempt
+HTTP_BACKOFF_MAX = float(os.environ.get("HTTP_BACKOFF_MAX", 8))
+HTTP_MIN_ATTEMPT_SECONDS = float(os.environ.get("HTTP_MIN_ATTEMPT_SECONDS", 0.5)) # No new attempt with less time left before the deadline
+RETRY_STATUS_CODES = {429, 500, 502, 503, 504}
+
+DEFAULT_HEADERS = {
+    'Accept-Encoding': 'gzip, deflate',
+    'Connection': 'keep-alive',
+}
+
+# One adapter (and so one urllib3 PoolManager) is shared by every thread.
+# The PoolManager is thread-safe; requests.Session is not, so each thread gets its own thin Session on top.
+_adapter = HTTPAdapter(pool_connections=HTTP_POOL_HOSTS, pool_maxsize=HTTP_POOL_MAXSIZE,
+                       pool_block=HTTP_POOL_BLOCK, max_retries=0)
+_local = threading.local()
+
+_stats_lock = threading.Lock()
+_host_stats = {} # host -> {"requests", "retries", "errors"}
+
+# Monotonic time by which the current unit of work (e.g. one pipeline source) must be done.
+# A contextvar, so metrics.submit() carries it into the worker threads a source fans out to.
+_deadline = contextvars.ContextVar("http_deadline", default=None)
+
+
+class DeadlineExceeded(requests.exceptions.Timeout):
+    """The caller's deadline ran out before (or between) attempts; a Timeout, so callers already handle it."""
+
+
+@contextmanager
+def deadline(seconds):
+    """Bounds every request in this context (timeouts, retries, backoff, rate-limit waits) to `seconds` from now."""
+    at = time.monotonic() + seconds
+    outer = _deadline.get()
+    token = _deadline.set(at if outer is None else min(outer, at))
+    try:
+        yield
+    finally:
+        _deadline.reset(token)
+
+
+def remaining():
+    """Seconds left before the current deadline, or None without one."""
+    at = _deadline.get()
+    return None if at is None else at - time.monotonic()
+
+
+def _get_session():
+    """Returns this thread's Session, bound to the shared connection pool."""
+    session = getattr(_local, "session", None)
+    if session is None:
+        session = requests.Session()
+        session.headers.update(DEFAULT_HEADERS)
+        session.mount("https://", _adapter)
+        session.mount("http://", _adapter)
+        _local.session = session
+    return session
+
+
+def _record(host, field):
+    with _stats_lock:
+        stats = _host_stats.setdefault(host, {"requests": 0, "retries": 0, "errors": 0})
+        stats[field] += 1
+
+
+def _observe(host, outcome, started):
+    """Request time per attempt, for /metrics and the calling request's Server-Timing."""
+    elapsed = time.perf_counter() - started
+    metrics.HTTP_CLIENT_SECONDS.observe(elapsed, host=host, outcome=outcome)
+    metrics.record_timing(f"http-{host}", elapsed)
+
+
+def _retry_after(response):
+    """Numeric Retry-After header in seconds, capped at HTTP_BACKOFF_MAX; None if absent."""
+    retry_after = response.headers.get("Retry-After", "")
+    return min(float(retry_after), HTTP_BACKOFF_MAX) if retry_after.isdigit() else None
+
+
+def _backoff_delay(attempt, response=None):
+    """Full-jitter exponential backoff; honours a numeric Retry-After header when present."""
+    if response is not None:
+        retry_after = _retry_after(response)
+        if retry_after is not None:
+            return retry_after
+    return random.uniform(0, min(HTTP_BACKOFF_MAX, HTTP_BACKOFF_BASE * (2 ** attempt)))
+
+
+def request(method, url, retries=None, **kwargs):
+    """
+    Sends a request through the shared keep-alive pool, waiting for the host's
+    rate-limit slot first. Connection errors, timeouts and retryable status codes
+    (429/5xx) are retried with jittered backoff; 429/503 also slow the host's
+    bucket down. The last response is returned (or the last exception raised).
+    Inside a deadline() context, each attempt's timeout is capped by the time left
+    and no retry starts once it is used up (DeadlineExceeded if nothing was received).
+    """
+    retries = HTTP_MAX_RETRIES if retries is None else retries
+    timeout = kwargs.pop("timeout", HTTP_TIMEOUT)
+    host = urlsplit(url).hostname or ""
+    session = _get_session()
+
+    for attempt in range(retries + 1):
+        left = remaining()
+        if left is not None and left < HTTP_MIN_ATTEMPT_SECONDS:
+            raise DeadlineExceeded(f"{method} {url}: deadline reached before attempt {attempt + 1}")
+        try:
+            rate_limit.limiter.acquire(host, timeout=left)
+        except TimeoutError:
+            raise DeadlineExceeded(f"{method} {url}: deadline reached waiting for a {host} request slot")
+        _record(host, "requests")
+        left = remaining()
+        attempt_timeout = timeout if left is None or not isinstance(timeout, (int, float)) else max(0.1, min(timeout, left))
+        started = time.perf_counter()
+        try:
+            response = session.request(method, url, timeout=attempt_timeout, **kwargs)
+        except (requests.exceptions.ConnectionError, requests.exceptions.Timeout) as e:
+            _record(host, "errors")
+            _observe(host, "timeout" if isinstance(e, requests.exceptions.Timeout) else "error", started)
+            delay = _backoff_delay(attempt)
+            if attempt >= retries or not _time_for_retry(delay):
+                raise
+            logging.warning(f"{method} {url} failed ({e}); retry {attempt + 1}/{retries} in {delay:.2f}s")
+            _record(host, "retries")
+            time.sleep(delay)
+            continue
+
+        _observe(host, f"{response.status_code // 100}xx", started)
+        throttled = rate_limit.limiter.record_response(host, response.status_code, _retry_after(response))
+        if response.status_code in RETRY_STATUS_CODES and attempt < retries:
+            # A rate-limited host's bucket now enforces the pause, for every thread; don't sleep twice
+            delay = 0.0 if throttled else _backoff_delay(attempt, response)
+            if not _time_for_retry(delay): return response # The caller handles the status as on a last attempt
+            logging.warning(f"{method} {url} returned {response.status_code}; retry {attempt + 1}/{retries} in {delay:.2f}s")
+            response.close() # Release the connection back to the pool
+            _record(host, "retries")
+            time.sleep(delay)
+            continue
+        return response
+
+
+def _time_for_retry(delay):
+    """Whether a retry after `delay` seconds still fits before the current deadline."""
+    left = remaining()
+    return left is None or left - delay >= HTTP_MIN_ATTEMPT_SECONDS
+
+
+def get(url, **kwargs):
+    return request("GET", url, **kwargs)
+
+
+def post(url, **kwargs):
+    return request("POST", url, **kwargs)
+
+
+def get_pool_stats():
+    """
+    Per-host counters: requests/retries/errors sent through this module, plus the
+    urllib3 pool's connection count. reused_connections = requests served on an
+    already-open connection.
+    """
+    with _stats_lock:
+        stats = {host: dict(values) for host, values in _host_stats.items()}
+    pools = _adapter.poolmanager.pools
+    for pool_key in pools.keys():
+        pool = pools.get(pool_key)
+        if pool is None: continue # Evicted in the meantime
+        host_stats = stats.setdefault(pool.host, {"requests": 0, "retries": 0, "errors": 0})
+        host_stats["connections_opened"] = host_stats.get("connections_opened", 0) + pool.num_connections
+        host_stats["pool_requests"] = host_stats.get("pool_requests", 0) + pool.num_requests
+        host_stats["reused_connections"] = host_stats["pool_requests"] - host_stats["connections_opened"]
+    return stats
+
+
+def close():
+    """Closes every pooled connection (e.g. on worker shutdown)."""
+    _adapter.close()
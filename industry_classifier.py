@@ -0,0 +1,76 @@
+# industry_classifier.py
+import os
+import json
+import logging
+from phrase_matcher import PhraseMatcher, tokenize
+
+logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+
+INDUSTRY_KEYWORDS_PATH = os.environ.get(
+    "INDUSTRY_KEYWORDS_PATH",
+    os.path.join(os.path.dirname(os.path.abspath(__file__)), "data", "industry_keywords.json"))
+QUERY_WEIGHT = float(os.environ.get("INDUSTRY_QUERY_WEIGHT", 3)) # Hits in the query count this many times more than snippet hits
+MIN_INDUSTRY_SCORE = float(os.environ.get("MIN_INDUSTRY_SCORE", 2)) # Below this, no industry is claimed
+
+
+def load_keyword_table(path=INDUSTRY_KEYWORDS_PATH):
+    """Reads the {industry: {keyword: weight}} table; keys starting with '_' are comments."""
+    with open(path, encoding='utf-8') as f:
+        table = json.load(f)
+    return {industry: keywords for industry, keywords in table.items() if not industry.startswith('_')}
+
+
+class IndustryClassifier:
+    """
+    Scores every industry in one pass over the text using a PhraseMatcher compiled from
+    the keyword/weight table, so the cost depends on text length rather than table size.
+    """
+
+    def __init__(self, keyword_table):
+        # Group by normalized phrase: one phrase can feed several industries
+        phrase_weights = {} # token tuple -> {industry: weight}
+        phrase_text = {}
+        for industry, keywords in keyword_table.items():
+            if isinstance(keywords, list): keywords = {keyword: 1.0 for keyword in keywords} # Unweighted form
+            for keyword, weight in keywords.items():
+                key = tuple(tokenize(keyword))
+                if not key: continue
+                weights = phrase_weights.setdefault(key, {})
+                weights[industry] = max(weights.get(industry, 0.0), float(weight))
+                phrase_text.setdefault(key, keyword)
+
+        self._order = {industry: i for i, industry in enumerate(keyword_table)} # Table order breaks ties
+        self._matcher = PhraseMatcher()
+        for key, weights in phrase_weights.items():
+            self._matcher.add(phrase_text[key], (key, tuple(weights.items())))
+
+    def classify(self, query, texts=()):
+        """
+        Returns industries ranked by score, each as {"industry", "score", "confidence"},
+        where confidence is the industry's share of the total score. A keyword counts
+        once per text; query hits are multiplied by QUERY_WEIGHT.
+        """
+        scores = {}
+        sources = [(query, QUERY_WEIGHT)] + [(text, 1.0) for text in texts if text and isinstance(text, str)]
+        for text, multiplier in sources:
+            seen = set()
+            for (phrase, industry_weights), _start, _end in self._matcher.find_all(text):
+                if phrase in seen: continue
+                seen.add(phrase)
+                for industry, weight in industry_weights:
+                    scores[industry] = scores.get(industry, 0.0) + weight * multiplier
+
+        total = sum(scores.values())
+        ranked = sorted(scores.items(), key=lambda item: (-item[1], self._order[item[0]]))
+        return [{"industry": industry, "score": round(score, 2), "confidence": round(score / total, 3)}
+                for industry, score in ranked if score >= MIN_INDUSTRY_SCORE]
+
+
+# Compiled once at import
+KEYWORD_TABLE = load_keyword_table()
+default_classifier = IndustryClassifier(KEYWORD_TABLE)
+
+
+def classify_industry(query, texts=()):
+    """Ranks industries for a query plus optional supporting texts (e.g. web snippets)."""
+    return default_classifier.classify(query, texts)
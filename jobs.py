@@ -0,0 +1,155 @@
+# jobs.py
+import os
+import time
+import uuid
+import queue
+import itertools
+import threading
+import logging
+
+logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+
+# --- Job Queue Configuration ---
+JOB_WORKERS = int(os.environ.get("JOB_WORKERS", 4))
+JOB_QUEUE_DEPTH = int(os.environ.get("JOB_QUEUE_DEPTH", 100)) # Submissions beyond this are rejected (429)
+JOB_RETENTION_SECONDS = int(os.environ.get("JOB_RETENTION_SECONDS", 3600)) # How long finished jobs stay pollable
+JOB_MAX_WAIT_SECONDS = float(os.environ.get("JOB_MAX_WAIT_SECONDS", 30)) # Cap for long-poll waits
+PRIORITIES = {"high": 0, "normal": 1, "low": 2}
+
+QUEUED = "queued"
+RUNNING = "running"
+DONE = "done"
+FAILED = "failed"
+
+
+class QueueFullError(Exception):
+    """Raised when the job queue is at JOB_QUEUE_DEPTH."""
+
+
+class Job:
+    def __init__(self, query, priority):
+        self.id = uuid.uuid4().hex
+        self.query = query
+        self.priority = priority
+        self.status = QUEUED
+        self.created_at = time.time()
+        self.started_at = None
+        self.finished_at = None
+        self.result = None
+        self.cache_status = None
+        self.error = None
+        self.done = threading.Event()
+
+    def to_dict(self, include_result=True):
+        data = {
+            "job_id": self.id, "query": self.query, "priority": self.priority, "status": self.status,
+            "created_at": self.created_at, "started_at": self.started_at, "finished_at": self.finished_at,
+            "cache_status": self.cache_status, "error": self.error,
+        }
+        if include_result and self.status == DONE:
+            data["result"] = self.result
+        return data
+
+
+class JobManager:
+    """
+    Runs verification jobs on a bounded pool of worker threads fed by a bounded priority
+    queue (lower number = sooner; FIFO within a priority). A query that already has a
+    queued or running job is attached to that job instead of being queued twice.
+    Jobs live in this process's memory; results also land in the shared result cache.
+    """
+
+    def __init__(self, run_fn, workers=JOB_WORKERS, max_queue=JOB_QUEUE_DEPTH, key_fn=None, on_complete=None):
+        # run_fn(query) -> (founder_data, cache_status); on_complete(job) is called after a job succeeds
+        self.run_fn = run_fn
+        self.workers = workers
+        self.key_fn = key_fn or (lambda query: query.lower().strip())
+        self.on_complete = on_complete
+        self._queue = queue.PriorityQueue(maxsize=max_queue)
+        self._seq = itertools.count() # Tie-breaker keeps FIFO order within a priority
+        self._lock = threading.Lock()
+        self._jobs = {} # job id -> Job
+        self._active = {} # query key -> Job (queued or running)
+        self._threads = []
+        self._stats = {"submitted": 0, "deduplicated": 0, "rejected": 0, "completed": 0, "failed": 0}
+
+    def _ensure_workers(self):
+        # Started on first use so importing the module never spawns threads
+        if self._threads: return
+        for index in range(self.workers):
+            thread = threading.Thread(target=self._work, name=f"job-worker-{index}", daemon=True)
+            thread.start()
+            self._threads.append(thread)
+
+    def submit(self, query, priority="normal"):
+        """Queues a verification and returns its Job. Raises QueueFullError under backpressure."""
+        if priority not in PRIORITIES:
+            raise ValueError(f"Unknown priority '{priority}'; expected one of {sorted(PRIORITIES)}")
+        key = self.key_fn(query)
+        with self._lock:
+            self._ensure_workers()
+            self._prune()
+            existing = self._active.get(key)
+            if existing is not None:
+                self._stats["deduplicated"] += 1
+                return existing
+            job = Job(query, priority)
+            try:
+                self._queue.put_nowait((PRIORITIES[priority], next(self._seq), job))
+            except queue.Full:
+                self._stats["rejected"] += 1
+                raise QueueFullError(f"Job queue is full ({self._queue.maxsize} pending)")
+            self._jobs[job.id] = job
+            self._active[key] = job
+            self._stats["submitted"] += 1
+        logging.info(f"Queued verification job {job.id} for '{query}' (priority {priority})")
+        return job
+
+    def get(self, job_id):
+        with self._lock:
+            return self._jobs.get(job_id)
+
+    def wait(self, job_id, timeout):
+        """Long-poll: blocks until the job finishes or `timeout` (capped at JOB_MAX_WAIT_SECONDS) elapses."""
+        job = self.get(job_id)
+        if job is not None and timeout:
+            job.done.wait(min(timeout, JOB_MAX_WAIT_SECONDS))
+        return job
+
+    def _work(self):
+        while True:
+            _priority, _seq, job = self._queue.get()
+            job.status = RUNNING
+            job.started_at = time.time()
+            try:
+                job.result, job.cache_status = self.run_fn(job.query)
+                job.status = DONE
+                with self._lock: self._stats["completed"] += 1
+                if self.on_complete:
+                    try: self.on_complete(job)
+                    except Exception as e: logging.error(f"Job {job.id} completion hook failed: {e}")
+            except Exception as e:
+                logging.error(f"Verification job {job.id} for '{job.query}' failed: {e}", exc_info=True)
+                job.status = FAILED
+                job.error = str(e)
+                with self._lock: self._stats["failed"] += 1
+            finally:
+                job.finished_at = time.time()
+                with self._lock:
+                    key = self.key_fn(job.query)
+                    if self._active.get(key) is job:
+                        del self._active[key]
+                job.done.set()
+                self._queue.task_done()
+
+    def _prune(self):
+        # Caller holds self._lock
+        cutoff = time.time() - JOB_RETENTION_SECONDS
+        expired = [job_id for job_id, job in self._jobs.items() if job.finished_at and job.finished_at < cutoff]
+        for job_id in expired:
+            del self._jobs[job_id]
+
+    def stats(self):
+        with self._lock:
+            return {**self._stats, "queued": self._queue.qsize(), "max_queue": self._queue.maxsize,
+                    "workers": self.workers, "tracked_jobs": len(self._jobs)}
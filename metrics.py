@@ -0,0 +1,254 @@
+# metrics.py
+"""
+In-process metrics: labelled counters, gauges and histograms rendered in the
+Prometheus text exposition format (served on /metrics), plus a per-request trace
+whose spans become the Server-Timing response header.
+
+The trace lives in a contextvar, so spans recorded on pool threads reach the
+request that started the work as long as the task was submitted with submit().
+"""
+import os
+import time
+import threading
+import contextvars
+from contextlib import contextmanager
+
+# --- Metrics Configuration ---
+# Seconds; suits everything from a memoised VADER call to a 20s source deadline
+DEFAULT_BUCKETS = tuple(float(b) for b in os.environ.get(
+    "METRICS_BUCKETS", "0.005,0.01,0.025,0.05,0.1,0.25,0.5,1,2.5,5,10,20").split(","))
+SERVER_TIMING_MAX_ENTRIES = 20 # Keeps the header small when a request makes many outbound calls
+
+
+def _escape(value):
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _label_text(names, values, extra=()):
+    pairs = list(zip(names, values)) + list(extra)
+    if not pairs: return ""
+    return "{" + ",".join(f'{name}="{_escape(value)}"' for name, value in pairs) + "}"
+
+
+def _format_number(value):
+    if value == float("inf"): return "+Inf"
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+class _Metric:
+    kind = "untyped"
+
+    def __init__(self, name, help_text, labels=()):
+        self.name = name
+        self.help = help_text
+        self.label_names = tuple(labels)
+        self._values = {} # label values tuple -> value
+        self._lock = threading.Lock()
+
+    def _key(self, labels):
+        if set(labels) != set(self.label_names):
+            raise ValueError(f"{self.name} expects labels {self.label_names}, got {tuple(labels)}")
+        return tuple(str(labels[name]) for name in self.label_names)
+
+    def _samples(self):
+        with self._lock:
+            return [(key, value) for key, value in self._values.items()]
+
+    def render(self):
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} {self.kind}"]
+        for key, value in sorted(self._samples()):
+            lines.append(f"{self.name}{_label_text(self.label_names, key)} {_format_number(value)}")
+        return lines
+
+
+class Counter(_Metric):
+    kind = "counter"
+
+    def inc(self, amount=1, **labels):
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+    def set_total(self, value, **labels):
+        """For collectors mirroring a running count kept by another module (e.g. cache.stats())."""
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = value
+
+
+class Gauge(_Metric):
+    kind = "gauge"
+
+    def set(self, value, **labels):
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = value
+
+    def inc(self, amount=1, **labels):
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+    def dec(self, amount=1, **labels):
+        self.inc(-amount, **labels)
+
+
+class Histogram(_Metric):
+    """Cumulative-bucket histogram; values are [bucket counts..., sum, count] per label set."""
+    kind = "histogram"
+
+    def __init__(self, name, help_text, labels=(), buckets=DEFAULT_BUCKETS):
+        super().__init__(name, help_text, labels)
+        self.buckets = tuple(sorted(buckets))
+
+    def observe(self, value, **labels):
+        key = self._key(labels)
+        with self._lock:
+            series = self._values.get(key)
+            if series is None:
+                series = self._values[key] = [0] * (len(self.buckets) + 2)
+            for index, bound in enumerate(self.buckets):
+                if value <= bound: series[index] += 1
+            series[-2] += value
+            series[-1] += 1
+
+    def _samples(self):
+        with self._lock:
+            return [(key, list(series)) for key, series in self._values.items()]
+
+    def render(self):
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} {self.kind}"]
+        for key, series in sorted(self._samples()):
+            for bound, count in zip(self.buckets + (float("inf"),), series[:len(self.buckets)] + [series[-1]]):
+                lines.append(f"{self.name}_bucket{_label_text(self.label_names, key, [('le', _format_number(bound))])} {count}")
+            lines.append(f"{self.name}_sum{_label_text(self.label_names, key)} {_format_number(round(series[-2], 6))}")
+            lines.append(f"{self.name}_count{_label_text(self.label_names, key)} {series[-1]}")
+        return lines
+
+
+class Registry:
+    """Named metrics plus collector callbacks that refresh gauges from other modules' stats at scrape time."""
+
+    def __init__(self):
+        self._metrics = {}
+        self._collectors = []
+        self._lock = threading.Lock()
+
+    def _register(self, metric):
+        with self._lock:
+            existing = self._metrics.get(metric.name)
+            if existing is not None:
+                if type(existing) is not type(metric) or existing.label_names != metric.label_names:
+                    raise ValueError(f"Metric {metric.name} already registered with a different type or labels")
+                return existing # Re-imports (e.g. the Flask reloader) get the same series
+            self._metrics[metric.name] = metric
+            return metric
+
+    def counter(self, name, help_text, labels=()):
+        return self._register(Counter(name, help_text, labels))
+
+    def gauge(self, name, help_text, labels=()):
+        return self._register(Gauge(name, help_text, labels))
+
+    def histogram(self, name, help_text, labels=(), buckets=DEFAULT_BUCKETS):
+        return self._register(Histogram(name, help_text, labels, buckets))
+
+    def add_collector(self, fn):
+        """fn() is called before every render; exceptions are ignored so a broken source can't break /metrics."""
+        with self._lock:
+            self._collectors.append(fn)
+
+    def render(self):
+        with self._lock:
+            collectors = list(self._collectors)
+            metrics = list(self._metrics.values())
+        for collect in collectors:
+            try: collect()
+            except Exception: pass
+        lines = []
+        for metric in sorted(metrics, key=lambda m: m.name):
+            lines.extend(metric.render())
+        return "\n".join(lines) + "\n"
+
+
+registry = Registry()
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+# --- Shared Metrics ---
+STAGE_SECONDS = registry.histogram("founder_stage_seconds", "Time spent in each pipeline stage.", ["stage"])
+SOURCE_SECONDS = registry.histogram("founder_source_seconds", "Source fetch time by source and outcome.", ["source", "status"])
+HTTP_CLIENT_SECONDS = registry.histogram("http_client_request_seconds", "Outbound HTTP request time (one attempt) by host and outcome.", ["host", "outcome"])
+HTTP_SERVER_SECONDS = registry.histogram("http_server_request_seconds", "Time to serve a request by endpoint and status code.", ["endpoint", "method", "status"])
+IN_FLIGHT = registry.gauge("http_server_requests_in_flight", "Requests currently being served.")
+IN_FLIGHT.set(0)
+
+
+# --- Per-request Trace (Server-Timing) ---
+class Trace:
+    """Timings recorded while serving one request; repeated names are summed."""
+
+    def __init__(self):
+        self._entries = {} # name -> [seconds, count]
+        self._lock = threading.Lock()
+
+    def add(self, name, seconds):
+        with self._lock:
+            entry = self._entries.setdefault(name, [0.0, 0])
+            entry[0] += seconds
+            entry[1] += 1
+
+    def calls(self, prefix=""):
+        """Number of spans recorded under names starting with prefix (e.g. "http-" for outbound requests)."""
+        with self._lock:
+            return sum(count for name, (_seconds, count) in self._entries.items() if name.startswith(prefix))
+
+    def server_timing(self):
+        """Server-Timing header value: durations in ms, with the call count when a name was recorded more than once."""
+        with self._lock:
+            entries = list(self._entries.items())[:SERVER_TIMING_MAX_ENTRIES]
+        parts = []
+        for name, (seconds, count) in entries:
+            part = f"{name};dur={seconds * 1000:.1f}"
+            if count > 1: part += f';desc="{count} calls"'
+            parts.append(part)
+        return ", ".join(parts)
+
+
+_current_trace = contextvars.ContextVar("metrics_trace", default=None)
+
+
+def start_trace():
+    """Starts a trace for the current request; returns (trace, token) for end_trace()."""
+    trace = Trace()
+    return trace, _current_trace.set(trace)
+
+
+def end_trace(token):
+    _current_trace.reset(token)
+
+
+def record_timing(name, seconds):
+    """Adds a span to the current request's trace, if there is one."""
+    trace = _current_trace.get()
+    if trace is not None: trace.add(name, seconds)
+
+
+@contextmanager
+def stage(name):
+    """Times a pipeline stage into founder_stage_seconds and the request's Server-Timing."""
+    started = time.perf_counter()
+    try:
+        yield
+    finally:
+        elapsed = time.perf_counter() - started
+        STAGE_SECONDS.observe(elapsed, stage=name)
+        record_timing(name, elapsed)
+
+
+def submit(executor, fn, *args, **kwargs):
+    """executor.submit() that carries the caller's trace into the worker thread."""
+    return executor.submit(contextvars.copy_context().run, fn, *args, **kwargs)
+
+
+def render():
+    return registry.render()
@@ -0,0 +1,119 @@
+# normalize.py
+"""
+Entity normalisation for founder/startup queries. "Zepto", "Zepto Inc", "zepto.com",
+"https://www.zepto.com/" and "Zépto" all map to the canonical key "zepto", so they
+share one cache entry and one scrape.
+
+Rules, in order: Unicode accents are folded and case is dropped; URLs lose their
+scheme, "www." and path; a trailing domain suffix is removed (zepto.com -> zepto);
+punctuation becomes spaces; trailing legal suffixes (Inc, Pvt Ltd, GmbH, ...) are
+dropped. The result is then looked up in the alias table (data/entity_aliases.json),
+which maps other names of the same company (former names, parent brands) to one entry.
+Brands whose name is a domain (Pets.com) are listed there too and keep the suffix.
+"""
+import os
+import re
+import json
+import logging
+import unicodedata
+from functools import lru_cache
+
+logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+
+ENTITY_ALIASES_PATH = os.environ.get(
+    "ENTITY_ALIASES_PATH",
+    os.path.join(os.path.dirname(os.path.abspath(__file__)), "data", "entity_aliases.json"))
+
+LEGAL_SUFFIXES = {
+    "inc", "incorporated", "llc", "llp", "ltd", "limited", "pvt", "private", "corp", "corporation", "co", "company",
+    "gmbh", "plc", "sa", "ag", "bv", "nv", "pte", "pty", "srl", "oy", "ab", "kk",
+}
+DOMAIN_SUFFIXES = ("com", "io", "ai", "in", "co", "net", "org", "app", "dev", "xyz", "tech", "co.in", "co.uk", "com.au")
+
+_URL_PREFIX = re.compile(r"^(?:[a-z][a-z0-9+.-]*://)?(?:www\.)?", re.IGNORECASE)
+_DOMAIN = re.compile(r"^([^\s/.]+(?:\.[^\s/.]+)*?)\.(?:" + "|".join(re.escape(s) for s in DOMAIN_SUFFIXES) + r")(?:/\S*)?$", re.IGNORECASE)
+_NON_WORD = re.compile(r"[^\w]+")
+_EDGE_PUNCTUATION = ".,;:!?()[]{}\"'"
+
+
+def fold(text):
+    """Lower-case, accent-free form of text (Zépto -> zepto)."""
+    decomposed = unicodedata.normalize("NFKD", str(text))
+    return "".join(ch for ch in decomposed if not unicodedata.combining(ch)).casefold()
+
+
+def _strip_domain(text):
+    """Single-token URLs/domains lose scheme, www., domain suffix and path; other text is returned unchanged."""
+    text = text.strip()
+    if not text or " " in text: return text
+    bare = _URL_PREFIX.sub("", text)
+    match = _DOMAIN.match(bare)
+    if match: return match.group(1)
+    return bare.split("/", 1)[0] if bare != text else text
+
+
+def _without_legal_suffix(tokens, folded_tokens):
+    end = len(tokens)
+    while end > 1 and folded_tokens[end - 1] in LEGAL_SUFFIXES:
+        end -= 1
+    return tokens[:end]
+
+
+def rule_key(query):
+    """Canonical key from the rules alone (no alias lookup)."""
+    text = _strip_domain(fold(query)).replace("&", " and ")
+    tokens = [token for token in _NON_WORD.split(text) if token and token != "_"]
+    return " ".join(_without_legal_suffix(tokens, tokens))
+
+
+def load_alias_table(path=ENTITY_ALIASES_PATH):
+    """Reads {canonical name: [aliases]}; keys starting with '_' are comments. Returns (alias key -> canonical key, canonical key -> name)."""
+    try:
+        with open(path, encoding="utf-8") as f:
+            table = json.load(f)
+    except (OSError, ValueError) as e:
+        logging.error(f"Could not load entity aliases from {path}: {e}")
+        return {}, {}
+    aliases, names = {}, {}
+    for name, alias_list in table.items():
+        if name.startswith("_"): continue
+        # A brand that is a domain (Pets.com) keeps it, so it doesn't claim the plain word
+        canonical = fold(name).strip() if _DOMAIN.match(fold(name).strip()) else rule_key(name)
+        names[canonical] = name
+        for alias in alias_list:
+            alias_key = rule_key(alias)
+            if alias_key and alias_key != canonical: aliases[alias_key] = canonical
+    return aliases, names
+
+
+_aliases, _canonical_names = load_alias_table()
+_aliases_by_key = {}
+for _alias, _canonical in _aliases.items(): _aliases_by_key.setdefault(_canonical, []).append(_alias)
+
+
+@lru_cache(maxsize=4096)
+def canonical_key(query):
+    """The cache/identity key for a founder or startup query ("" for blank input)."""
+    bare = _URL_PREFIX.sub("", fold(query).strip()).rstrip("/")
+    if bare in _canonical_names: return bare # Domain-named brand, typed as its domain
+    key = rule_key(query)
+    return _aliases.get(key, key)
+
+
+def aliases_of(key):
+    """Alias keys that map to a canonical key (for indexing it under its other names)."""
+    return _aliases_by_key.get(key, [])
+
+
+def display_name(query):
+    """
+    The name to search for: the alias table's canonical name if there is one, else the
+    query with URL parts and legal suffixes removed, keeping its own case and accents.
+    """
+    key = canonical_key(query)
+    if key in _canonical_names: return _canonical_names[key]
+    text = _strip_domain(" ".join(str(query).split()))
+    tokens = [token.strip(_EDGE_PUNCTUATION) for token in text.split()]
+    tokens = [token for token in tokens if token]
+    kept = _without_legal_suffix(tokens, [rule_key(token) for token in tokens])
+    return " ".join(kept) or str(query).strip()
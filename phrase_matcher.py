@@ -0,0 +1,81 @@
+# phrase_matcher.py
+import re
+import unicodedata
+
+# Words are runs of letters/digits; punctuation and whitespace separate them ("U.S." -> "u", "s").
+_TOKEN_RE = re.compile(r"\w+", re.UNICODE)
+_NO_MATCH = object()
+
+
+def normalize_token(token):
+    """Case-folds a token and strips diacritics, so 'São' and 'sao' compare equal."""
+    token = token.casefold()
+    if not token.isascii():
+        token = "".join(c for c in unicodedata.normalize("NFKD", token) if not unicodedata.combining(c))
+    return token
+
+
+def tokenize(text):
+    """Normalized word tokens of a string."""
+    return [normalize_token(t) for t in _TOKEN_RE.findall(text)]
+
+
+class PhraseMatcher:
+    """
+    Single-pass, longest-match multi-phrase matcher over word tokens.
+    Phrases are stored as token tuples in a dict, so scanning a text costs one dict
+    lookup per token (plus one per extra word of the longest phrase starting with it),
+    independent of how many phrases are registered. Matches always fall on word boundaries.
+    """
+
+    def __init__(self, require_capitalized=False):
+        # require_capitalized: only match case-insensitive phrases whose first word is capitalized in the text
+        self.require_capitalized = require_capitalized
+        self._phrases = {} # normalized token tuple -> [(value, exact tokens or None), ...] in priority order
+        self._max_len = {} # first token -> word count of the longest phrase starting with it
+
+    def __len__(self):
+        return len(self._phrases)
+
+    def add(self, phrase, value, case_sensitive=False):
+        """
+        Registers a phrase. When several values share a phrase, the first one added
+        that passes the case checks wins, so add higher-priority values first.
+        """
+        raw = tuple(_TOKEN_RE.findall(phrase))
+        if not raw:
+            return
+        key = tuple(normalize_token(t) for t in raw)
+        self._phrases.setdefault(key, []).append((value, raw if case_sensitive else None))
+        if len(key) > self._max_len.get(key[0], 0):
+            self._max_len[key[0]] = len(key)
+
+    def _pick(self, candidates, surface_tokens):
+        for value, exact in candidates:
+            if exact is not None:
+                if tuple(surface_tokens) == exact:
+                    return value
+            elif not self.require_capitalized or not surface_tokens[0][0].islower():
+                return value
+        return _NO_MATCH
+
+    def find_all(self, text):
+        """Returns non-overlapping (value, start, end) matches, scanning left to right and preferring the longest phrase."""
+        token_matches = list(_TOKEN_RE.finditer(text))
+        surface = [m.group() for m in token_matches]
+        keys = [normalize_token(t) for t in surface]
+        results = []
+        i, n = 0, len(keys)
+        while i < n:
+            step = 1
+            for length in range(min(self._max_len.get(keys[i], 0), n - i), 0, -1):
+                candidates = self._phrases.get(tuple(keys[i:i + length]))
+                if not candidates:
+                    continue
+                value = self._pick(candidates, surface[i:i + length])
+                if value is not _NO_MATCH:
+                    results.append((value, token_matches[i].start(), token_matches[i + length - 1].end()))
+                    step = length
+                    break
+            i += step
+        return results
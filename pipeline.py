@@ -0,0 +1,350 @@
+# pipeline.py
+import os
+import json
+import time
+import hashlib
+import logging
+import concurrent.futures
+from concurrent.futures import ThreadPoolExecutor
+import scraper
+import analyzer
+import industry_classifier
+import metrics
+import http_client
+import normalize # Canonical entity keys: Zepto / Zepto Inc / zepto.com / Zépto share one entry
+import scoring # Versioned score weights; cached records are re-scored when the version changes
+from cache import cache, FRESH, STALE
+
+logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+
+# --- Source Credentials ---
+LINKEDIN_EMAIL = os.environ.get("LINKEDIN_EMAIL", "your_linkedin_email@example.com")
+LINKEDIN_PASSWORD = os.environ.get("LINKEDIN_PASSWORD", "your_linkedin_password")
+
+# --- Result Caching ---
+FOUNDER_CACHE_TIMEOUT = int(os.environ.get("FOUNDER_CACHE_TIMEOUT", 1800))
+# Cache lifetime for results where at least one source missed its deadline
+PARTIAL_RESULT_CACHE_TIMEOUT = int(os.environ.get("PARTIAL_RESULT_CACHE_TIMEOUT", 120))
+# Each source is also cached on its own, so an expired aggregate only re-fetches what changed.
+# Industry learnings are static and are rebuilt from the knowledge base on every aggregation.
+SOURCE_CACHE_TIMEOUTS = {
+    "linkedin": int(os.environ.get("LINKEDIN_CACHE_TIMEOUT", 86400)), # Simulated profile: daily
+    "failure_industry_insights": int(os.environ.get("FAILORY_CACHE_TIMEOUT", 7 * 86400)), # Failory changes rarely
+    "web_sentiment": int(os.environ.get("WEB_SENTIMENT_CACHE_TIMEOUT", 1800)),
+    "controversies": int(os.environ.get("CONTROVERSIES_CACHE_TIMEOUT", 1800)),
+}
+
+# --- Fan-out Configuration ---
+# Overall budget for one verification; no source may run past this.
+REQUEST_DEADLINE_SECONDS = float(os.environ.get("REQUEST_DEADLINE_SECONDS", 20))
+# Per-source budgets (capped by the overall deadline)
+SOURCE_DEADLINES_SECONDS = {
+    "linkedin": float(os.environ.get("LINKEDIN_DEADLINE_SECONDS", 5)),
+    "failure_industry_insights": float(os.environ.get("FAILORY_DEADLINE_SECONDS", 18)),
+    "web_sentiment": float(os.environ.get("WEB_SENTIMENT_DEADLINE_SECONDS", 16)),
+    "controversies": float(os.environ.get("CONTROVERSIES_DEADLINE_SECONDS", 16)),
+}
+FETCH_WORKERS = int(os.environ.get("FETCH_WORKERS", 16))
+
+SOURCE_OK = "ok"
+SOURCE_CACHED = "cached" # Fresh per-source cache entry, not fetched
+SOURCE_STALE = "stale" # Fetch failed or timed out; fell back to an expired cache entry
+SOURCE_TIMED_OUT = "timed_out"
+SOURCE_ERROR = "error"
+
+# Only results without a hard failure are cached per source, so a network blip isn't pinned for the whole TTL
+_CACHEABLE_RESULT = {
+    "linkedin": lambda result: True,
+    "failure_industry_insights": lambda result: not result.get("error"),
+    "web_sentiment": lambda result: bool(result.get("snippets")) or not result.get("error"),
+    "controversies": lambda result: not result.get("error") or result["error"].startswith("No specific"),
+}
+
+# Shared pool so concurrent requests don't each spin up their own threads.
+# Each source runs under an http_client.deadline() matching its own, so a source that misses it
+# stops retrying and frees its worker instead of holding it through every HTTP retry.
+_fetch_executor = ThreadPoolExecutor(max_workers=FETCH_WORKERS, thread_name_prefix="source-fetch")
+
+
+def _linkedin_profile_url(query):
+    """Placeholder profile URL used by the simulated LinkedIn scraper."""
+    return f"https://www.linkedin.com/in/{query.lower().strip().replace(' ', '-')}"
+
+
+def _unavailable_result(source, query, message, status):
+    """
+    Builds the stand-in result for a source that timed out or crashed,
+    keeping the keys the aggregation step and templates rely on.
+    """
+    marker = {"error": message, "timed_out": status == SOURCE_TIMED_OUT}
+    if source == "failure_industry_insights":
+        industry = scraper._identify_industry(query)
+        return {
+            "source": "Failory Scrape & Internal KB",
+            "failory_search_url": None,
+            "specific_failure_found": False,
+            "failure_details": [],
+            "failed_startups": [],
+            "identified_industry": industry,
+            "industry_learnings": scraper._get_industry_learnings(industry),
+            **marker
+        }
+    if source == "web_sentiment":
+        return {"snippets": [], "overall_sentiment": analyzer.analyze_sentiment(""), **marker}
+    if source == "controversies":
+        return {"source": "Web Search (Controversies)", "search_query": None, "potential_hits": [], **marker}
+    return dict(marker) # linkedin
+
+
+def _run_with_deadline(seconds, func, *args):
+    """Runs a source fetch with its HTTP calls (and their retries) bounded by the source's deadline."""
+    with http_client.deadline(seconds):
+        return func(*args)
+
+
+def fetch_sources(query, linkedin_email=LINKEDIN_EMAIL, linkedin_password=LINKEDIN_PASSWORD, deadline_seconds=None, source_deadlines=None, use_cache=True, min_source_ttl=0):
+    """
+    Runs the four source fetches concurrently, skipping sources with a fresh per-source cache entry
+    (one expiring within min_source_ttl seconds is refetched, and kept as the stale fallback).
+    Each source gets its own deadline (capped by the overall request deadline);
+    sources that miss it fall back to their expired cache entry if there is one,
+    otherwise to a placeholder carrying a "timed out" marker.
+    Returns (results, source_status) keyed by source name.
+    """
+    deadline_seconds = REQUEST_DEADLINE_SECONDS if deadline_seconds is None else deadline_seconds
+    source_deadlines = {**SOURCE_DEADLINES_SECONDS, **(source_deadlines or {})}
+
+    tasks = {
+        "linkedin": (scraper.scrape_linkedin_profile, (_linkedin_profile_url(query), linkedin_email, linkedin_password)),
+        "failure_industry_insights": (scraper.get_failure_and_industry_insights, (query,)),
+        "web_sentiment": (scraper.search_web_for_sentiment, (query,)),
+        "controversies": (scraper.search_for_controversies, (query,)),
+    }
+
+    results = {}
+    source_status = {}
+    stale_results = {}
+    if use_cache:
+        for source in list(tasks):
+            cached, state = cache.lookup(source_cache_key(source, query), min_ttl=min_source_ttl)
+            if state == FRESH:
+                results[source] = cached
+                source_status[source] = {"status": SOURCE_CACHED, "elapsed": 0.0}
+                del tasks[source]
+            elif state == STALE:
+                stale_results[source] = cached # Used only if the refresh fails
+    if source_status:
+        logging.info(f"Using cached results for {list(source_status)} for query '{query}'")
+
+    started = time.monotonic()
+    futures = {}
+    deadlines = {}
+    completed_at = {}
+    for source, (func, args) in tasks.items():
+        deadlines[source] = started + min(source_deadlines.get(source, deadline_seconds), deadline_seconds)
+        # Outbound calls land in this request's trace and are bounded by the source's deadline
+        futures[source] = metrics.submit(_fetch_executor, _run_with_deadline, deadlines[source] - started, func, *args)
+        futures[source].add_done_callback(lambda _f, s=source: completed_at.__setitem__(s, time.monotonic()))
+    if futures:
+        logging.info(f"Fetching {len(futures)} sources concurrently for '{query}' (deadline {deadline_seconds:.1f}s)")
+
+    # Sources run in parallel, so waiting on each in deadline order never exceeds the latest deadline.
+    for source in sorted(futures, key=deadlines.get):
+        future = futures[source]
+        try:
+            results[source] = future.result(timeout=max(0.0, deadlines[source] - time.monotonic()))
+            status = SOURCE_OK
+        except concurrent.futures.TimeoutError:
+            future.cancel() # No-op if already running; the result is simply discarded
+            budget = deadlines[source] - started
+            logging.warning(f"Source '{source}' timed out after {budget:.1f}s for query '{query}'")
+            results[source] = _unavailable_result(source, query, f"Timed out after {budget:.0f}s; no data from this source.", SOURCE_TIMED_OUT)
+            status = SOURCE_TIMED_OUT
+        except Exception as e:
+            logging.error(f"Source '{source}' failed for query '{query}': {e}", exc_info=True)
+            results[source] = _unavailable_result(source, query, f"Source failed: {e}", SOURCE_ERROR)
+            status = SOURCE_ERROR
+        if status == SOURCE_OK and use_cache and _CACHEABLE_RESULT[source](results[source]):
+            cache.set(source_cache_key(source, query), results[source], timeout=SOURCE_CACHE_TIMEOUTS[source])
+        elif status != SOURCE_OK and source in stale_results:
+            logging.warning(f"Serving expired cached '{source}' result for query '{query}' after {status}")
+            results[source] = stale_results[source]
+            status = SOURCE_STALE
+        elapsed = completed_at.get(source, time.monotonic()) - started
+        source_status[source] = {"status": status, "elapsed": round(elapsed, 3)}
+        metrics.SOURCE_SECONDS.observe(elapsed, source=source, status=status)
+        metrics.record_timing(f"src-{source}", elapsed)
+
+    statuses = ", ".join(f"{source}={info['status']}" for source, info in source_status.items())
+    logging.info(f"Source fan-out for '{query}' finished in {time.monotonic() - started:.2f}s ({statuses})")
+    return results, source_status
+
+
+def build_founder_data(query, results, source_status=None):
+    """Aggregates per-source results into the founder_data structure and runs the final analysis."""
+    linked_data = results.get("linkedin") or {}
+    failure_industry_insights = dict(results.get("failure_industry_insights") or {}) # Copy: refined below
+    web_sentiment_data_raw = results.get("web_sentiment") or {}
+    controversies_data = results.get("controversies") or {}
+
+    # --- Industry Classification (query + fetched snippets) ---
+    # The Failory source only sees the query; re-rank now that web snippets are available.
+    snippet_texts = list(web_sentiment_data_raw.get("snippets", []))
+    snippet_texts.extend(hit.get("snippet") for hit in controversies_data.get("potential_hits", []))
+    with metrics.stage("industry"):
+        industry_ranking = industry_classifier.classify_industry(query, snippet_texts)
+    if industry_ranking:
+        industry = industry_ranking[0]["industry"]
+        logging.info(f"Industry ranking for '{query}': {[(r['industry'], r['confidence']) for r in industry_ranking[:3]]}")
+    else:
+        industry = None
+    failure_industry_insights["industry_ranking"] = industry_ranking
+    failure_industry_insights["identified_industry"] = industry
+    failure_industry_insights["industry_learnings"] = scraper._get_industry_learnings(industry)
+
+    # --- Process Web Snippets for Sentiment (Backend Analysis) ---
+    analyzed_web_snippets = []
+    if web_sentiment_data_raw.get("snippets"):
+        valid_snippets = []
+        for snippet_text in web_sentiment_data_raw.get("snippets", []):
+            if isinstance(snippet_text, str) and snippet_text.strip(): valid_snippets.append(snippet_text)
+            else: logging.warning(f"Skipping invalid snippet for analysis: {snippet_text}")
+        logging.info(f"Analyzing {len(valid_snippets)} web snippets individually...")
+        with metrics.stage("sentiment"):
+            snippet_sentiments = analyzer.analyze_sentiment_batch(valid_snippets)
+        analyzed_web_snippets = [{"text": text, "sentiment": sentiment} for text, sentiment in zip(valid_snippets, snippet_sentiments)]
+    else: logging.info("No web snippets found to analyze individually.")
+
+    sentiment_error = analyzer.sentiment_error()
+    if sentiment_error: # Every text scored NEUTRAL: flag the record so it is cached briefly, not as a real result
+        source_status = dict(source_status or {}, sentiment={"status": SOURCE_ERROR, "elapsed": 0.0, "error": sentiment_error})
+
+    # --- Data Aggregation and Structuring ---
+    logging.info("Aggregating fetched data...")
+    founder_data = {
+        "query": query,
+        "linkedin": linked_data,
+        "failure_industry_insights": failure_industry_insights,
+        "web_sentiment": {
+            "original_snippets": web_sentiment_data_raw.get("snippets", []),
+            "overall_sentiment": web_sentiment_data_raw.get("overall_sentiment", {}),
+            "analyzed_snippets": analyzed_web_snippets,
+            "error": web_sentiment_data_raw.get("error"),
+            "timed_out": web_sentiment_data_raw.get("timed_out", False)
+        },
+        "controversies": controversies_data,
+        "source_status": source_status or {},
+        "analysis": {}
+    }
+
+    # --- Further Analysis ---
+    logging.info("Performing final analysis (score, label, locations)...")
+    # Use 'failed_startups' key from insights data for penalty calc
+    specific_failures_found_list = failure_industry_insights.get("failed_startups", [])
+    with metrics.stage("scoring"):
+        founder_data["analysis"]["reputation_score"] = analyzer.calculate_reputation_score(
+            sentiment_scores=founder_data["web_sentiment"]["overall_sentiment"],
+            failed_startups=specific_failures_found_list,
+            controversy_hits=len(controversies_data.get("potential_hits") or [])
+        )
+        founder_data["analysis"]["score_version"] = scoring.SCORING_VERSION
+    founder_data["analysis"]["sentiment_label"] = founder_data["web_sentiment"]["overall_sentiment"].get('label', 'NEUTRAL')
+
+    # Location Extraction
+    texts_for_location = []
+    if linked_data: texts_for_location.extend([linked_data.get("location"), linked_data.get("headline")])
+    # Add failure detail snippets for location context if they exist
+    if failure_industry_insights.get("failure_details"):
+        for detail in failure_industry_insights["failure_details"]: texts_for_location.append(detail.get("snippet"))
+    texts_for_location.extend(founder_data["web_sentiment"]["original_snippets"]) # Use original snippets
+    texts_for_location_filtered = [str(text) for text in texts_for_location if text and isinstance(text, str)]
+    with metrics.stage("locations"):
+        founder_data["analysis"]["locations"] = analyzer.extract_potential_locations(texts_for_location_filtered)
+
+    founder_data["fingerprint"] = record_fingerprint(founder_data)
+    return founder_data
+
+
+def record_fingerprint(founder_data):
+    """Content hash of a record, computed once when it is built and cached with it (keys rendered responses and ETags)."""
+    body = json.dumps({key: value for key, value in founder_data.items() if key != "fingerprint"}, sort_keys=True, default=str)
+    return hashlib.blake2b(body.encode("utf-8"), digest_size=16).hexdigest()
+
+
+def timed_out_sources(founder_data):
+    """Names of the sources that missed their deadline for this record."""
+    return [source for source, info in founder_data.get("source_status", {}).items()
+            if info.get("status") == SOURCE_TIMED_OUT]
+
+
+def degraded_sources(founder_data):
+    """Sources whose data is missing or out of date in this record (timed out, failed, or stale fallback)."""
+    return [source for source, info in founder_data.get("source_status", {}).items()
+            if info.get("status") in (SOURCE_TIMED_OUT, SOURCE_ERROR, SOURCE_STALE)]
+
+
+def run_pipeline(query, linkedin_email=LINKEDIN_EMAIL, linkedin_password=LINKEDIN_PASSWORD, min_source_ttl=0):
+    """Fetches all sources concurrently and returns the aggregated founder_data."""
+    results, source_status = fetch_sources(query, linkedin_email, linkedin_password, min_source_ttl=min_source_ttl)
+    return build_founder_data(query, results, source_status)
+
+
+# --- Cached Access ---
+def _query_key(query):
+    return normalize.canonical_key(query).replace(' ', '_')
+
+
+def founder_cache_key(query):
+    """Cache key for the aggregated record of a founder/startup query."""
+    return f"founder_data_{_query_key(query)}"
+
+
+def source_cache_key(source, query):
+    """Cache key for one source's raw result for a query."""
+    return f"source_{source}_{_query_key(query)}"
+
+
+def _founder_cache_timeout(founder_data):
+    # Partial results (a source timed out, failed or is stale) are only kept briefly so the next search retries it
+    degraded = degraded_sources(founder_data)
+    if degraded:
+        logging.warning(f"Degraded sources for '{founder_data.get('query')}': {degraded}. Caching partial result for {PARTIAL_RESULT_CACHE_TIMEOUT}s.")
+        return PARTIAL_RESULT_CACHE_TIMEOUT
+    # The aggregate can't outlive its shortest-lived component
+    return min([FOUNDER_CACHE_TIMEOUT] + list(SOURCE_CACHE_TIMEOUTS.values()))
+
+
+def get_founder_data(query, fetch_on_miss=True):
+    """
+    Single entry point for founder records: returns (founder_data, cache_status) where
+    cache_status is "HIT", "STALE" (served while refreshing in the background), "MISS",
+    or "COALESCED" (waited on another request's in-flight fetch of the same query).
+    With fetch_on_miss=False a miss returns (None, "MISS") instead of running the pipeline.
+    """
+    key = founder_cache_key(query)
+    if not fetch_on_miss:
+        founder_data, state = cache.lookup(key)
+        if state is None: return None, "MISS"
+        return _with_current_score(founder_data), "HIT" if state == FRESH else "STALE"
+    # Every spelling of an entity shares the entry, so the scrape uses its canonical display name
+    founder_data, cache_status = cache.get_or_compute(key, lambda: run_pipeline(normalize.display_name(query)), timeout=_founder_cache_timeout)
+    return _with_current_score(founder_data), cache_status
+
+
+def _with_current_score(founder_data):
+    """Records cached under other scoring weights are re-scored from their stored components (no re-scrape)."""
+    analysis = founder_data.get("analysis") if isinstance(founder_data, dict) else None
+    if not analysis or analysis.get("score_version", scoring.BASELINE_VERSION) == scoring.SCORING_VERSION: return founder_data
+    analysis["reputation_score"] = scoring.score_record(founder_data)
+    analysis["score_version"] = scoring.SCORING_VERSION
+    return founder_data
+
+
+def refresh_founder_data(query, min_source_ttl=0):
+    """
+    Re-runs the pipeline for query now and replaces its cached record (used by the prewarm
+    scheduler). Per-source entries with less than min_source_ttl seconds left are refetched
+    too, so the new record doesn't carry source data that is about to expire.
+    """
+    return cache.refresh(founder_cache_key(query), lambda: run_pipeline(normalize.display_name(query), min_source_ttl=min_source_ttl),
+                         timeout=_founder_cache_timeout)
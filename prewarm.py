@@ -0,0 +1,251 @@
+# prewarm.py
+"""
+Background cache prewarming. Every cycle the scheduler asks the search history for
+the hottest founders (recency-weighted search counts) and refreshes the cached
+record of each one whose entry is missing or about to expire, so the next user
+gets a HIT instead of a cold scrape.
+
+Refreshes are spread out with random jitter and charged against an outbound
+request budget (requests actually sent per rolling window); once the budget is
+used up, remaining candidates are skipped until the window frees up. The budget
+belongs to one scheduler, i.e. one process: run a single scheduler per deployment
+(the dedicated process below, or the development server with PREWARM_ENABLED=1),
+never one per WSGI worker.
+
+Run the scheduler as its own process next to the web workers (they share the SQLite cache tier):
+    python prewarm.py run
+Warm a list of founders (.txt, CSV or JSONL, as batch_verify.py reads them), e.g. before starting the app:
+    python prewarm.py warm names.txt
+Show what the scheduler would consider hot:
+    python prewarm.py hot
+"""
+import os
+import sys
+import time
+import random
+import threading
+import logging
+from collections import deque
+import pipeline
+import history
+import batch_verify # read_names() for warm lists
+import metrics
+from cache import cache
+
+logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+
+# --- Prewarm Configuration ---
+PREWARM_ENABLED = os.environ.get("PREWARM_ENABLED", "0") == "1" # Start the scheduler inside `python app.py` (one process only)
+PREWARM_INTERVAL_SECONDS = float(os.environ.get("PREWARM_INTERVAL_SECONDS", 120)) # Between cycles
+PREWARM_HOT_LIMIT = int(os.environ.get("PREWARM_HOT_LIMIT", 25)) # Candidates per cycle
+PREWARM_LOOKBACK_DAYS = int(os.environ.get("PREWARM_LOOKBACK_DAYS", 7))
+PREWARM_HALF_LIFE_HOURS = float(os.environ.get("PREWARM_HALF_LIFE_HOURS", 24)) # Recency weighting of past searches
+PREWARM_MIN_SCORE = float(os.environ.get("PREWARM_MIN_SCORE", 1.0)) # Ignore founders searched too rarely or too long ago
+PREWARM_REFRESH_AHEAD_SECONDS = float(os.environ.get("PREWARM_REFRESH_AHEAD_SECONDS", 300)) # Refresh when less TTL than this is left
+PREWARM_JITTER_SECONDS = float(os.environ.get("PREWARM_JITTER_SECONDS", 5)) # Random pause before each refresh
+PREWARM_REQUEST_BUDGET = int(os.environ.get("PREWARM_REQUEST_BUDGET", 200)) # Outbound requests per budget window, per scheduler process
+PREWARM_BUDGET_WINDOW_SECONDS = float(os.environ.get("PREWARM_BUDGET_WINDOW_SECONDS", 3600))
+PREWARM_STARTUP_LIST = os.environ.get("PREWARM_STARTUP_LIST") # Optional .txt/CSV/JSONL of founders warmed when the scheduler starts
+PREWARM_ESTIMATED_REQUESTS = 6.0 # Initial guess for requests per refresh, replaced by a running average
+
+DONE = "done"
+SKIPPED_FRESH = "skipped_fresh" # Cached entry still has plenty of TTL left
+SKIPPED_BUDGET = "skipped_budget"
+FAILED = "failed"
+
+PREWARM_RESULTS = metrics.registry.counter("prewarm_refreshes_total", "Prewarm decisions by result.", ["result"])
+PREWARM_REQUESTS = metrics.registry.counter("prewarm_outbound_requests_total", "Outbound requests sent by prewarm refreshes.")
+PREWARM_BUDGET_LEFT = metrics.registry.gauge("prewarm_request_budget_remaining", "Outbound requests left in the current prewarm budget window.")
+
+
+class RequestBudget:
+    """Outbound requests spent in a rolling window, with a running estimate of what one refresh costs."""
+
+    def __init__(self, limit=PREWARM_REQUEST_BUDGET, window=PREWARM_BUDGET_WINDOW_SECONDS, estimate=PREWARM_ESTIMATED_REQUESTS):
+        self.limit = limit
+        self.window = window
+        self.estimate = estimate
+        self._spent = deque() # (monotonic time, requests)
+        self._lock = threading.Lock()
+
+    def _used(self, now):
+        # Caller holds self._lock
+        while self._spent and self._spent[0][0] <= now - self.window:
+            self._spent.popleft()
+        return sum(requests for _at, requests in self._spent)
+
+    def remaining(self):
+        with self._lock:
+            return max(0.0, self.limit - self._used(time.monotonic()))
+
+    def can_afford(self):
+        """Whether a refresh of the estimated cost fits in the window."""
+        return self.remaining() >= self.estimate
+
+    def charge(self, requests):
+        with self._lock:
+            self._spent.append((time.monotonic(), requests))
+            if requests: self.estimate = 0.8 * self.estimate + 0.2 * requests # Only refreshes that went out tell us the cost
+
+
+class PrewarmScheduler:
+    """
+    Refreshes hot founders' cached records before they expire. run_cycle() does one pass;
+    start() runs passes every PREWARM_INTERVAL_SECONDS on a daemon thread.
+    """
+
+    def __init__(self, refresh_fn=pipeline.refresh_founder_data, budget=None, interval=PREWARM_INTERVAL_SECONDS,
+                 refresh_ahead=PREWARM_REFRESH_AHEAD_SECONDS, jitter=PREWARM_JITTER_SECONDS):
+        self.refresh_fn = refresh_fn
+        self.budget = budget or RequestBudget()
+        self.interval = interval
+        self.refresh_ahead = refresh_ahead
+        self.jitter = jitter
+        self._stop = threading.Event()
+        self._thread = None
+        self._lock = threading.Lock()
+        self._stats = {DONE: 0, SKIPPED_FRESH: 0, SKIPPED_BUDGET: 0, FAILED: 0, "cycles": 0, "requests": 0}
+        self.last_cycle = None
+
+    def _count(self, result, requests=0):
+        with self._lock:
+            self._stats[result] += 1
+            self._stats["requests"] += requests
+        PREWARM_RESULTS.inc(result=result)
+        if requests: PREWARM_REQUESTS.inc(requests)
+        PREWARM_BUDGET_LEFT.set(self.budget.remaining())
+
+    def needs_refresh(self, query):
+        """True if the cached record is missing, stale, or expires within refresh_ahead (jittered so entries cached together spread out)."""
+        ttl = cache.ttl(pipeline.founder_cache_key(query))
+        return ttl is None or ttl < self.refresh_ahead * random.uniform(0.75, 1.0)
+
+    def refresh(self, query, ignore_budget=False):
+        """Refreshes one founder, charging the requests it actually sent; returns DONE, SKIPPED_BUDGET or FAILED (error or partial record)."""
+        if not ignore_budget and not self.budget.can_afford():
+            self._count(SKIPPED_BUDGET)
+            return SKIPPED_BUDGET
+        trace, token = metrics.start_trace() # Counts this refresh's outbound requests, including those on worker threads
+        started = time.monotonic()
+        try:
+            record = self.refresh_fn(query, min_source_ttl=self.refresh_ahead)
+            degraded = pipeline.degraded_sources(record) if isinstance(record, dict) else []
+            if degraded: logging.warning(f"Prewarm refresh for '{query}' is partial (degraded: {degraded})")
+            result = FAILED if degraded else DONE # A partial record is only cached briefly, so it didn't really warm anything
+        except Exception as e:
+            logging.error(f"Prewarm refresh failed for '{query}': {e}")
+            result = FAILED
+        finally:
+            metrics.end_trace(token)
+        requests = trace.calls("http-")
+        self.budget.charge(requests)
+        self._count(result, requests)
+        logging.info(f"Prewarm {result} for '{query}' in {time.monotonic() - started:.1f}s ({requests} outbound requests)")
+        return result
+
+    def _pause(self):
+        """Random pause before a refresh so refreshes don't land together; False if the scheduler is stopping."""
+        return not self._stop.wait(random.uniform(0, self.jitter)) if self.jitter > 0 else not self._stop.is_set()
+
+    def run_cycle(self, store=None):
+        """One pass over the current hot queries; returns {query: result}."""
+        store = store or history.get_store()
+        if store is None: return {}
+        results = {}
+        for entry in store.hot_queries(PREWARM_LOOKBACK_DAYS, PREWARM_HOT_LIMIT, PREWARM_HALF_LIFE_HOURS):
+            if entry["score"] < PREWARM_MIN_SCORE: break # Ranked by score, so the rest are colder
+            query = entry["query"]
+            if not self.needs_refresh(query):
+                self._count(SKIPPED_FRESH)
+                results[query] = SKIPPED_FRESH
+                continue
+            if not self.budget.can_afford():
+                self._count(SKIPPED_BUDGET)
+                results[query] = SKIPPED_BUDGET
+                continue
+            if not self._pause(): break
+            results[query] = self.refresh(query)
+        with self._lock:
+            self._stats["cycles"] += 1
+        self.last_cycle = {"at": time.time(), "results": results}
+        return results
+
+    def warm(self, queries, ignore_budget=False):
+        """Refreshes every listed founder whose record needs it (e.g. at startup); returns {query: result}."""
+        results = {}
+        unique = {}
+        for query in queries: unique.setdefault(pipeline.founder_cache_key(query), query)
+        for query in unique.values():
+            if self._stop.is_set(): break
+            if not self.needs_refresh(query):
+                self._count(SKIPPED_FRESH)
+                results[query] = SKIPPED_FRESH
+                continue
+            results[query] = self.refresh(query, ignore_budget=ignore_budget)
+        return results
+
+    def _run(self, startup_list):
+        if startup_list:
+            try:
+                self.warm(batch_verify.read_names(startup_list))
+            except OSError as e:
+                logging.error(f"Could not read prewarm list {startup_list}: {e}")
+        while not self._stop.wait(self.interval * random.uniform(0.9, 1.1)):
+            try:
+                self.run_cycle()
+            except Exception as e:
+                logging.error(f"Prewarm cycle failed: {e}", exc_info=True)
+
+    def start(self, startup_list=PREWARM_STARTUP_LIST):
+        """Starts the background thread (once); founders in startup_list (a .txt/CSV/JSONL path) are warmed first."""
+        with self._lock:
+            if self._thread is not None: return
+            self._thread = threading.Thread(target=self._run, args=(startup_list,), name="prewarm", daemon=True)
+            self._thread.start()
+        logging.info(f"Prewarm scheduler started (every {self.interval:.0f}s, budget {self.budget.limit} requests/{self.budget.window:.0f}s)")
+
+    def stop(self, timeout=None):
+        self._stop.set()
+        if self._thread is not None: self._thread.join(timeout)
+
+    def stats(self):
+        with self._lock:
+            stats = dict(self._stats)
+        return {**stats, "budget_remaining": self.budget.remaining(), "requests_per_refresh": round(self.budget.estimate, 2),
+                "running": self._thread is not None and self._thread.is_alive()}
+
+
+scheduler = PrewarmScheduler()
+
+
+if __name__ == '__main__':
+    import argparse
+    parser = argparse.ArgumentParser(description="Warm the founder cache.")
+    sub = parser.add_subparsers(dest="command", required=True)
+    warm_parser = sub.add_parser("warm", help="Refresh the founders listed in a file")
+    warm_parser.add_argument("path", help="CSV (header row with a name/query column), JSONL, or .txt with one name per line")
+    warm_parser.add_argument("--field", help="Column/key holding the founder name")
+    warm_parser.add_argument("--ignore-budget", action="store_true", help="Don't stop at PREWARM_REQUEST_BUDGET")
+    run_parser = sub.add_parser("run", help="Run the scheduler in the foreground (one per deployment)")
+    run_parser.add_argument("--startup-list", default=PREWARM_STARTUP_LIST, help="Founders to warm first (.txt/CSV/JSONL)")
+    hot_parser = sub.add_parser("hot", help="List the hot queries from the search history")
+    hot_parser.add_argument("--limit", type=int, default=PREWARM_HOT_LIMIT)
+    args = parser.parse_args()
+
+    if args.command == "hot":
+        store = history.get_store()
+        for entry in (store.hot_queries(PREWARM_LOOKBACK_DAYS, args.limit, PREWARM_HALF_LIFE_HOURS) if store else []):
+            print(entry)
+        sys.exit(0)
+    pipeline.analyzer.warm_up()
+    if args.command == "run":
+        scheduler.start(args.startup_list)
+        try:
+            while True: time.sleep(3600)
+        except KeyboardInterrupt:
+            scheduler.stop(timeout=30)
+        sys.exit(0)
+    names = batch_verify.read_names(args.path, args.field)
+    results = scheduler.warm(names, ignore_budget=args.ignore_budget)
+    print({result: list(results.values()).count(result) for result in set(results.values())})
+    print(scheduler.stats())
@@ -0,0 +1,158 @@
+# rate_limit.py
+import os
+import time
+import threading
+import logging
+
+logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+
+# --- Rate Limit Configuration ---
+# Per-host budgets as "host=rate[:burst],..." in requests/second. Hosts not listed are unlimited.
+# Limits are per process: with several workers, divide the upstream's allowance between them.
+HTTP_HOST_RATE_LIMITS = os.environ.get("HTTP_HOST_RATE_LIMITS", "html.duckduckgo.com=2:4,www.failory.com=4:8")
+RATE_MIN_FRACTION = 0.1 # Adaptive slow-down never goes below this fraction of the configured rate
+RATE_BACKOFF_FACTOR = 0.5 # Multiplier applied to the rate on each 429/503
+RATE_RECOVERY_STEP = 0.05 # Fraction of the configured rate regained per successful response
+THROTTLE_STATUS_CODES = {429, 503}
+
+
+class TokenBucket:
+    """
+    Classic token bucket shared by every thread: `rate` tokens/second, holding at most
+    `burst`. acquire() takes one token, blocking on a Condition (no polling) until one
+    is available. The effective rate halves on throttling responses and creeps back
+    towards the configured rate on successes (AIMD).
+    """
+
+    def __init__(self, rate, burst=None):
+        self.base_rate = float(rate)
+        self.rate = float(rate)
+        self.burst = float(burst or max(1.0, rate))
+        self._tokens = self.burst
+        self._updated = time.monotonic()
+        self._paused_until = 0.0
+        self._cond = threading.Condition()
+        self._stats = {"acquired": 0, "waited": 0, "wait_seconds": 0.0, "max_wait_seconds": 0.0,
+                       "timeouts": 0, "throttled": 0, "waiting": 0}
+
+    def _refill(self, now):
+        # Caller holds self._cond
+        if now > self._updated:
+            start = max(self._updated, self._paused_until)
+            if now > start:
+                self._tokens = min(self.burst, self._tokens + (now - start) * self.rate)
+            self._updated = now
+
+    def acquire(self, timeout=None):
+        """Takes one token; returns the seconds spent waiting. Raises TimeoutError after `timeout`."""
+        started = time.monotonic()
+        deadline = None if timeout is None else started + timeout
+        with self._cond:
+            self._stats["waiting"] += 1
+            try:
+                while True:
+                    now = time.monotonic()
+                    self._refill(now)
+                    if now >= self._paused_until and self._tokens >= 1:
+                        self._tokens -= 1
+                        break
+                    # Sleep until the next token is due (or the pause ends); re-check when woken early
+                    due = max(self._paused_until, now) + max(0.0, 1 - self._tokens) / self.rate
+                    if deadline is not None and due > deadline:
+                        if now >= deadline:
+                            self._stats["timeouts"] += 1
+                            raise TimeoutError(f"No request slot within {timeout}s")
+                        due = deadline
+                    self._cond.wait(due - now)
+            finally:
+                self._stats["waiting"] -= 1
+            waited = time.monotonic() - started
+            self._stats["acquired"] += 1
+            if waited > 0.001:
+                self._stats["waited"] += 1
+                self._stats["wait_seconds"] += waited
+                self._stats["max_wait_seconds"] = max(self._stats["max_wait_seconds"], waited)
+            return waited
+
+    def throttled(self, retry_after=None):
+        """Upstream pushed back: cut the rate, and pause all requests for Retry-After seconds if given."""
+        with self._cond:
+            now = time.monotonic()
+            self._refill(now)
+            self.rate = max(self.base_rate * RATE_MIN_FRACTION, self.rate * RATE_BACKOFF_FACTOR)
+            self._tokens = min(self._tokens, 0.0)
+            if retry_after:
+                self._paused_until = max(self._paused_until, now + retry_after)
+            self._stats["throttled"] += 1
+            self._cond.notify_all() # Waiters recompute their due time
+            return self.rate
+
+    def succeeded(self):
+        if self.rate >= self.base_rate: return
+        with self._cond:
+            self.rate = min(self.base_rate, self.rate + self.base_rate * RATE_RECOVERY_STEP)
+
+    def stats(self):
+        with self._cond:
+            stats = dict(self._stats)
+            stats["wait_seconds"] = round(stats["wait_seconds"], 3)
+            stats["max_wait_seconds"] = round(stats["max_wait_seconds"], 3)
+            stats["avg_wait_seconds"] = round(stats["wait_seconds"] / stats["acquired"], 4) if stats["acquired"] else 0.0
+            return {**stats, "rate": round(self.rate, 3), "base_rate": self.base_rate, "burst": self.burst}
+
+
+class HostRateLimiter:
+    """Registry of per-host TokenBuckets; hosts without a configured bucket are not limited."""
+
+    def __init__(self, limits=None):
+        self._lock = threading.Lock()
+        self._buckets = {}
+        for host, (rate, burst) in (limits or {}).items():
+            self.configure(host, rate, burst)
+
+    def configure(self, host, rate, burst=None):
+        """Sets (or with a falsy rate, removes) the budget for a host."""
+        with self._lock:
+            if rate:
+                self._buckets[host] = TokenBucket(rate, burst)
+            else:
+                self._buckets.pop(host, None)
+
+    def bucket(self, host):
+        with self._lock:
+            return self._buckets.get(host)
+
+    def acquire(self, host, timeout=None):
+        """Waits for the host's next slot; returns seconds waited (0.0 for unlimited hosts)."""
+        bucket = self.bucket(host)
+        return bucket.acquire(timeout) if bucket else 0.0
+
+    def record_response(self, host, status_code, retry_after=None):
+        """Feeds a response back into the host's bucket. Returns True if the host was throttled and is limited."""
+        bucket = self.bucket(host)
+        if bucket is None: return False
+        if status_code in THROTTLE_STATUS_CODES:
+            rate = bucket.throttled(retry_after)
+            logging.warning(f"{host} returned {status_code}; slowing to {rate:.2f} req/s"
+                            + (f" and pausing {retry_after}s" if retry_after else ""))
+            return True
+        bucket.succeeded()
+        return False
+
+    def stats(self):
+        with self._lock:
+            buckets = dict(self._buckets)
+        return {host: bucket.stats() for host, bucket in buckets.items()}
+
+
+def parse_rate_limits(spec):
+    """Parses "host=rate[:burst],..." into {host: (rate, burst or None)}."""
+    limits = {}
+    for item in filter(None, (part.strip() for part in spec.split(','))):
+        host, _, value = item.partition('=')
+        rate, _, burst = value.partition(':')
+        limits[host.strip()] = (float(rate), float(burst) if burst else None)
+    return limits
+
+
+limiter = HostRateLimiter(parse_rate_limits(HTTP_HOST_RATE_LIMITS))
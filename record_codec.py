@@ -0,0 +1,129 @@
+# record_codec.py
+"""
+Compact, versioned serialization for cached values (founder records and per-source
+results). Compared with pickling the record as-is:
+  - analyzed web snippets refer to their text in original_snippets by index instead
+    of carrying a second {"text": ..., "sentiment": ...} dict per snippet,
+  - static knowledge-base values (industry learnings) are stored as a key into the
+    registered table and looked up again on decode,
+  - payloads over RECORD_COMPRESS_MIN_BYTES (in practice: records holding Failory
+    article text) are zlib-compressed.
+Payloads start with MAGIC + version + flags; anything else is read as a plain pickle,
+so entries written before this format still load.
+"""
+import os
+import zlib
+import pickle
+from typing import Any, List, NamedTuple, Tuple
+
+# --- Codec Configuration ---
+RECORD_COMPRESS_MIN_BYTES = int(os.environ.get("RECORD_COMPRESS_MIN_BYTES", 1024)) # Smaller payloads aren't worth compressing
+RECORD_ZLIB_LEVEL = int(os.environ.get("RECORD_ZLIB_LEVEL", 6))
+
+MAGIC = b"FR"
+VERSION = 1
+FLAG_ZLIB = 0x01
+
+_static_tables = {} # field name -> {key: value}
+_NESTED_SECTIONS = ("failure_industry_insights", "web_sentiment") # Founder record sections that can hold references
+
+
+class StaticRef(NamedTuple):
+    field: str # Registered table name (the field it replaces)
+    key: str
+
+
+class SnippetRefs(NamedTuple):
+    sentiments: List[Tuple[int, Any]] # (index into original_snippets, sentiment dict) per analyzed snippet
+
+
+def register_static_table(field, table):
+    """Values of `field` equal to an entry of `table` are stored by key. The table must be registered before decoding too."""
+    _static_tables[field] = table
+
+
+def _static_key(field, value):
+    table = _static_tables.get(field)
+    if not table or not isinstance(value, dict): return None
+    for key, static_value in table.items():
+        if static_value is value or static_value == value: return key
+    return None
+
+
+def _compact_fields(record):
+    """record with static values and analyzed snippets replaced by references (a copy if anything changed)."""
+    changes = {}
+    for field in _static_tables:
+        key = _static_key(field, record.get(field))
+        if key is not None: changes[field] = StaticRef(field, key)
+    refs = _snippet_refs(record)
+    if refs is not None: changes["analyzed_snippets"] = refs
+    return {**record, **changes} if changes else record
+
+
+def _snippet_refs(web_sentiment):
+    """analyzed_snippets as indexes into original_snippets, or None if some text isn't there."""
+    analyzed = web_sentiment.get("analyzed_snippets")
+    originals = web_sentiment.get("original_snippets")
+    if not analyzed or not isinstance(originals, list) or not isinstance(analyzed, list): return None
+    positions = {}
+    for index, text in enumerate(originals):
+        if isinstance(text, str): positions.setdefault(text, index)
+    refs = []
+    for item in analyzed:
+        if not isinstance(item, dict) or set(item) != {"text", "sentiment"} or item["text"] not in positions: return None
+        refs.append((positions[item["text"]], item["sentiment"]))
+    return SnippetRefs(refs)
+
+
+def _expand_fields(record):
+    changes = {}
+    for field, item in record.items():
+        if isinstance(item, StaticRef):
+            changes[field] = _static_tables[item.field][item.key] # KeyError if the table wasn't registered in this process
+        elif isinstance(item, SnippetRefs):
+            texts = record["original_snippets"]
+            changes[field] = [{"text": texts[index], "sentiment": sentiment} for index, sentiment in item.sentiments]
+    if changes: record.update(changes) # Freshly unpickled, so safe to fill in place
+    return record
+
+
+# References only appear at a value's top level (per-source results) or one level down (founder records),
+# so only those dicts are visited rather than the whole record
+def _compact(value):
+    if not isinstance(value, dict): return value
+    compact = dict(_compact_fields(value))
+    for field in _NESTED_SECTIONS:
+        if isinstance(compact.get(field), dict): compact[field] = _compact_fields(compact[field])
+    return compact
+
+
+def _expand(value):
+    if not isinstance(value, dict): return value
+    for field in _NESTED_SECTIONS:
+        if isinstance(value.get(field), dict): _expand_fields(value[field])
+    return _expand_fields(value)
+
+
+def dumps(value):
+    """Serializes a cache value into the compact format."""
+    body = pickle.dumps(_compact(value), protocol=pickle.HIGHEST_PROTOCOL)
+    flags = 0
+    if len(body) >= RECORD_COMPRESS_MIN_BYTES:
+        compressed = zlib.compress(body, RECORD_ZLIB_LEVEL)
+        if len(compressed) < len(body):
+            body, flags = compressed, flags | FLAG_ZLIB
+    return MAGIC + bytes((VERSION, flags)) + body
+
+
+def loads(payload):
+    """Inverse of dumps(); also reads plain pickles written before the compact format."""
+    payload = bytes(payload)
+    if not payload.startswith(MAGIC):
+        return pickle.loads(payload)
+    version, flags = payload[2], payload[3]
+    if version != VERSION:
+        raise ValueError(f"Unsupported record format version {version}")
+    body = payload[4:]
+    if flags & FLAG_ZLIB: body = zlib.decompress(body)
+    return _expand(pickle.loads(body))
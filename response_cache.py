@@ -0,0 +1,166 @@
+# response_cache.py
+"""
+Rendered-response cache for founder records. A record's fingerprint (a content
+hash computed once when the pipeline builds it, stored with the cached record)
+keys the rendered results page and the /api/verify body, so a cache hit skips
+Jinja rendering and JSON encoding, and backs a strong ETag so If-None-Match
+revalidations get 304s. Only GET/HEAD requests revalidate, which is why the
+search form submits by GET. Bodies are compressed once per encoding
+(brotli if the optional `brotli` package is installed, else gzip) and cached too.
+"""
+import os
+import gzip
+import hashlib
+import logging
+import threading
+from flask import Response, current_app, request
+from cache import MemoryLRUStore
+import scoring
+
+try:
+    import brotli # Optional: pip install brotli
+except ImportError:
+    brotli = None
+
+logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+
+# --- Response Cache Configuration ---
+RESPONSE_CACHE_BYTES = int(os.environ.get("RESPONSE_CACHE_BYTES", 16 * 1024 * 1024)) # Rendered/compressed bodies kept in memory
+COMPRESS_MIN_BYTES = int(os.environ.get("COMPRESS_MIN_BYTES", 1024)) # Smaller bodies are sent as-is
+GZIP_LEVEL = int(os.environ.get("GZIP_LEVEL", 6))
+BROTLI_QUALITY = int(os.environ.get("BROTLI_QUALITY", 5)) # 5 is close to gzip -6 speed at a better ratio
+_NEVER_EXPIRES = float("inf") # Entries are immutable (keyed by content); only the LRU budget evicts them
+
+IDENTITY = "identity"
+_COMPRESSORS = {"gzip": lambda body: gzip.compress(body, GZIP_LEVEL)}
+if brotli is not None:
+    _COMPRESSORS["br"] = lambda body: brotli.compress(body, quality=BROTLI_QUALITY)
+_PREFERENCE = ["br", "gzip"] # Server preference among equally acceptable encodings
+
+_store = MemoryLRUStore(RESPONSE_CACHE_BYTES)
+_template_versions = {}
+_stats = {"hits": 0, "misses": 0, "not_modified": 0}
+_stats_lock = threading.Lock()
+
+
+def _count(field):
+    with _stats_lock:
+        _stats[field] += 1
+
+
+def record_tag(founder_data):
+    """
+    Cache/ETag key for a record: its stored fingerprint plus its score version (records are re-scored
+    in place when the scoring weights change). Records cached before fingerprints existed are hashed here.
+    """
+    fingerprint = founder_data.get("fingerprint")
+    if not fingerprint:
+        body = current_app.json.dumps(founder_data).encode("utf-8")
+        fingerprint = hashlib.blake2b(body, digest_size=16).hexdigest()
+    return f"{fingerprint}-{founder_data.get('analysis', {}).get('score_version', scoring.BASELINE_VERSION)}"
+
+
+def json_body(founder_data):
+    """The record as /api/verify sends it."""
+    return current_app.json.dumps(founder_data).encode("utf-8") + b"\n"
+
+
+def _template_version(template_name):
+    """Hash of the template source, so a deploy that changes the page also changes its ETags."""
+    version = _template_versions.get(template_name)
+    if version is None:
+        source, _filename, _uptodate = current_app.jinja_env.loader.get_source(current_app.jinja_env, template_name)
+        version = _template_versions[template_name] = hashlib.blake2b(source.encode("utf-8"), digest_size=4).hexdigest()
+    return version
+
+
+def negotiate_encoding(accept_encoding):
+    """Picks br/gzip/identity from an Accept-Encoding header, honouring q-values (q=0 refuses)."""
+    accepted = {}
+    for part in (accept_encoding or "").split(","):
+        coding, _, params = part.strip().partition(";")
+        coding = coding.strip().lower()
+        if not coding: continue
+        quality = 1.0
+        for param in params.split(";"):
+            name, _, value = param.strip().partition("=")
+            if name.strip() == "q":
+                try: quality = float(value)
+                except ValueError: quality = 0.0
+        accepted[coding] = quality
+    best, best_quality = IDENTITY, 0.0
+    for coding in _PREFERENCE:
+        if coding not in _COMPRESSORS: continue
+        quality = accepted.get(coding, accepted.get("*", 0.0))
+        if quality > best_quality:
+            best, best_quality = coding, quality
+    return best
+
+
+def _etag(tag, encoding):
+    # A strong ETag names exact bytes, so each content-coding gets its own
+    return tag if encoding == IDENTITY else f"{tag}-{encoding}"
+
+
+def _matches(if_none_match, tag):
+    """If-None-Match uses weak comparison; any encoding of the same content counts as a match."""
+    if if_none_match.strip() == "*": return True
+    for candidate in if_none_match.split(","):
+        candidate = candidate.strip()
+        if candidate.startswith("W/"): candidate = candidate[2:]
+        candidate = candidate.strip('"')
+        if candidate == tag or candidate.startswith(tag + "-"): return True
+    return False
+
+
+def _body(key, encoding, produce):
+    """Cached body for (key, encoding); the identity body is produced once and compressed from it."""
+    entry = _store.get_entry(f"{key}:{encoding}")
+    if entry is not None:
+        return entry[0], True
+    identity, hit = (produce(), False) if encoding == IDENTITY else _body(key, IDENTITY, produce)
+    body = identity if encoding == IDENTITY else _COMPRESSORS[encoding](identity)
+    _store.set_entry(f"{key}:{encoding}", body, _NEVER_EXPIRES, _NEVER_EXPIRES)
+    return body, hit
+
+
+def cached_response(kind, data_hash, produce, mimetype, status=200, headers=None):
+    """
+    Response for the representation `kind` (e.g. a template name) of the record with
+    tag `data_hash` (record_tag()). produce() returns the uncompressed body as bytes and is
+    only called on a cache miss. Conditional GET/HEAD requests whose If-None-Match
+    matches get an empty 304.
+    """
+    tag = f"{kind.replace('.', '-')}-{data_hash}"
+    if kind.endswith(".html"): tag = f"{tag}-{_template_version(kind)}"
+    encoding = negotiate_encoding(request.headers.get("Accept-Encoding"))
+    response_headers = {"Vary": "Accept-Encoding", "Cache-Control": "no-cache", **(headers or {})}
+
+    if_none_match = request.headers.get("If-None-Match")
+    if request.method in ("GET", "HEAD") and if_none_match and _matches(if_none_match, tag):
+        _count("not_modified")
+        response = Response(status=304, headers=response_headers)
+        response.set_etag(_etag(tag, encoding))
+        return response
+
+    body, hit = _body(tag, IDENTITY, produce)
+    if encoding != IDENTITY and len(body) >= COMPRESS_MIN_BYTES:
+        body, _ = _body(tag, encoding, produce)
+        response_headers["Content-Encoding"] = encoding
+    else:
+        encoding = IDENTITY
+    _count("hits" if hit else "misses")
+    response = Response(body, status=status, mimetype=mimetype, headers=response_headers)
+    response.set_etag(_etag(tag, encoding))
+    return response
+
+
+def stats():
+    with _stats_lock:
+        counts = dict(_stats)
+    return {**counts, "encodings": [IDENTITY] + sorted(_COMPRESSORS), **_store.info()}
+
+
+def clear():
+    _store.clear()
+    _template_versions.clear()
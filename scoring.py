@@ -0,0 +1,236 @@
+# scoring.py
+"""
+Versioned reputation scoring. A score is computed from three stored components:
+the web sentiment compound (-1..1), the number of specific failures found (Failory)
+and the number of controversy hits:
+
+    base   = clamp(((compound + 1) / 2) * 100)           (neutral_score without sentiment)
+    factor = 1 - failure_penalty - controversy_penalty
+        failure_penalty     = failure_base + min(failures - 1, failure_max_steps) * failure_step   (0 without failures)
+        controversy_penalty = min(hits * controversy_step, controversy_max)
+    score  = round(clamp(base * factor))
+
+Each weight set is a named version; "v1" is the original formula (controversies don't
+count). SCORING_VERSION picks the one new records use, and SCORING_WEIGHTS_PATH can
+add versions from a JSON file ({"v2": {...weights...}}). Records carry the version they
+were scored with, so stored histories can be re-scored under new weights without
+re-scraping - a whole history at once with NumPy (imported only by the bulk functions).
+Rows from search_log.csv only record whether a failure was found, not how many, so
+rows with a failure keep their score (and version) there.
+
+    python scoring.py rescore --version v2             # the search history database
+    python scoring.py rescore-csv search_log.csv out.csv --version v2
+"""
+import os
+import csv
+import sys
+import json
+import time
+import logging
+
+logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+
+WEIGHT_NAMES = ("neutral_score", "failure_base", "failure_step", "failure_max_steps", "controversy_step", "controversy_max")
+
+SCORING_WEIGHTS = {
+    "v1": {"neutral_score": 50.0, "failure_base": 0.30, "failure_step": 0.05, "failure_max_steps": 2,
+           "controversy_step": 0.0, "controversy_max": 0.0},
+}
+BASELINE_VERSION = "v1" # What records without a score_version (older logs and caches) were scored with
+
+
+def load_weights(path):
+    """Adds the versions in a JSON file to SCORING_WEIGHTS; each must define every weight."""
+    with open(path, encoding="utf-8") as f:
+        versions = json.load(f)
+    for version, weights in versions.items():
+        missing = [name for name in WEIGHT_NAMES if name not in weights]
+        if missing: raise ValueError(f"Scoring version '{version}' in {path} is missing {missing}")
+        SCORING_WEIGHTS[version] = {name: float(weights[name]) for name in WEIGHT_NAMES}
+
+
+SCORING_WEIGHTS_PATH = os.environ.get("SCORING_WEIGHTS_PATH") # Optional JSON file with extra weight versions
+if SCORING_WEIGHTS_PATH:
+    try:
+        load_weights(SCORING_WEIGHTS_PATH)
+    except (OSError, ValueError) as e:
+        logging.error(f"Could not load scoring weights from {SCORING_WEIGHTS_PATH}: {e}")
+SCORING_VERSION = os.environ.get("SCORING_VERSION", BASELINE_VERSION) # Version new scores are computed with
+if SCORING_VERSION not in SCORING_WEIGHTS:
+    logging.error(f"Unknown SCORING_VERSION '{SCORING_VERSION}', using {BASELINE_VERSION}")
+    SCORING_VERSION = BASELINE_VERSION
+
+
+def weights_for(version=None):
+    try:
+        return SCORING_WEIGHTS[version or SCORING_VERSION]
+    except KeyError:
+        raise ValueError(f"Unknown scoring version '{version}' (known: {sorted(SCORING_WEIGHTS)})")
+
+
+def score(compound, failures=0, controversies=0, version=None):
+    """Score for one record (compound None = no sentiment data). Same arithmetic as score_arrays()."""
+    w = weights_for(version)
+    base = w["neutral_score"] if compound is None else max(0, min(100, ((compound + 1) / 2) * 100))
+    reduction = 0.0
+    if failures > 0: reduction = w["failure_base"] + (min(failures - 1, w["failure_max_steps"]) * w["failure_step"])
+    if controversies > 0: reduction += min(controversies * w["controversy_step"], w["controversy_max"])
+    return round(max(0, min(100, base * (1.0 - reduction))))
+
+
+def components(founder_data):
+    """(compound or None, failures, controversy hits) from a founder record."""
+    sentiment = founder_data.get("web_sentiment", {}).get("overall_sentiment")
+    failures = founder_data.get("failure_industry_insights", {}).get("failed_startups") or []
+    hits = founder_data.get("controversies", {}).get("potential_hits") or []
+    return (sentiment.get("compound", 0.0) if sentiment else None), len(failures), len(hits)
+
+
+def score_record(founder_data, version=None):
+    """Re-scores a stored founder record from its components."""
+    return score(*components(founder_data), version=version)
+
+
+# --- Vectorised (whole histories at once) ---
+
+def score_arrays(compound, failures, controversies, version=None):
+    """
+    Scores for arrays of components (NaN compound = no sentiment data); returns an int64 array.
+    Rounds half to even like round(), so results equal score() element for element.
+    """
+    import numpy as np # Only the bulk paths need NumPy; analyzer imports this module for score()
+    w = weights_for(version)
+    compound = np.asarray(compound, dtype=np.float64)
+    failures = np.asarray(failures, dtype=np.int64)
+    controversies = np.asarray(controversies, dtype=np.int64)
+    base = np.clip(((compound + 1) / 2) * 100, 0, 100)
+    base = np.where(np.isnan(compound), w["neutral_score"], base)
+    reduction = np.where(failures > 0, w["failure_base"] + np.minimum(failures - 1, w["failure_max_steps"]) * w["failure_step"], 0.0)
+    reduction = reduction + np.where(controversies > 0, np.minimum(controversies * w["controversy_step"], w["controversy_max"]), 0.0)
+    return np.rint(np.clip(base * (1.0 - reduction), 0, 100)).astype(np.int64)
+
+
+def implied_compound(scores, failures, controversies, version=BASELINE_VERSION):
+    """
+    Best estimate of the compound score behind stored scores, for rows that never kept it
+    (search_log.csv, imported history). Re-scoring the estimate under `version` gives the
+    stored score back; under other weights it moves as a record with that sentiment would.
+    """
+    import numpy as np
+    w = weights_for(version)
+    scores = np.asarray(scores, dtype=np.float64)
+    failures = np.asarray(failures, dtype=np.int64)
+    controversies = np.asarray(controversies, dtype=np.int64)
+    reduction = np.where(failures > 0, w["failure_base"] + np.minimum(failures - 1, w["failure_max_steps"]) * w["failure_step"], 0.0)
+    reduction = reduction + np.where(controversies > 0, np.minimum(controversies * w["controversy_step"], w["controversy_max"]), 0.0)
+    factor = 1.0 - reduction
+    with np.errstate(divide="ignore", invalid="ignore"):
+        base = np.where(factor > 0, scores / factor, w["neutral_score"])
+    return np.clip(base / 50 - 1, -1, 1)
+
+
+def rescore_history(store, version=None, dry_run=False):
+    """
+    Re-scores every row of a history.HistoryStore under `version`; returns a summary. Rows imported from
+    CSV logs with a failure found are skipped (they keep their score and score_version): the log doesn't
+    say how many failures there were, and the penalty depends on the count.
+    """
+    import numpy as np
+    version = version or SCORING_VERSION
+    weights_for(version)
+    started = time.perf_counter()
+    ids, compound, failures, controversies, scores, versions, exact = store.score_components()
+    ids = np.array(ids, dtype=np.int64)
+    compound = np.array(compound, dtype=np.float64) # NULL -> NaN
+    failures = np.array(failures, dtype=np.int64)
+    controversies = np.array(controversies, dtype=np.int64)
+    old_scores = np.nan_to_num(np.array(scores, dtype=np.float64), nan=-1).astype(np.int64) # NULL -> -1
+    old_versions = np.array([row_version or BASELINE_VERSION for row_version in versions], dtype=object)
+    # CSV-imported rows only know a failure was found, not how many, so their score can't be rebuilt: they keep it
+    inexact = (failures > 0) & ~np.array(exact, dtype=bool)
+    loaded = time.perf_counter()
+
+    missing = np.isnan(compound) & (old_scores >= 0) # Never kept the compound: estimate it from the stored score
+    for row_version in set(old_versions[missing]):
+        rows = missing & (old_versions == row_version)
+        compound[rows] = implied_compound(old_scores[rows], failures[rows], controversies[rows], row_version)
+    scorable = (~np.isnan(compound) | (old_scores >= 0)) & ~inexact # Rows without a score or a compound stay unscored
+    new_scores = np.where(scorable, score_arrays(compound, failures, controversies, version), np.where(inexact, old_scores, -1))
+    changed = new_scores != old_scores
+    computed = time.perf_counter()
+
+    if not dry_run:
+        store.update_scores(ids[changed].tolist(), [score if score >= 0 else None for score in new_scores[changed].tolist()], version,
+                            skipped=zip(ids[inexact].tolist(), old_versions[inexact].tolist()))
+    return {"version": version, "rows": int(len(ids)), "changed": int(changed.sum()), "estimated_compound": int((missing & ~inexact).sum()),
+            "skipped_unknown_failure_count": int(inexact.sum()),
+            "average_before": round(float(old_scores[old_scores >= 0].mean()), 2) if (old_scores >= 0).any() else None,
+            "average_after": round(float(new_scores[new_scores >= 0].mean()), 2) if (new_scores >= 0).any() else None,
+            "load_seconds": round(loaded - started, 3), "compute_seconds": round(computed - loaded, 3),
+            "write_seconds": round(time.perf_counter() - computed, 3), "dry_run": dry_run}
+
+
+def rescore_csv(in_path, out_path, version=None, from_version=BASELINE_VERSION):
+    """
+    Writes a copy of a search_log.csv with reputation_score recomputed under `version`, plus a score_version
+    column saying which weights each row's score is under. The log keeps no compound score, so it is estimated
+    from each row's score under `from_version`. Rows with a failure found keep their score and `from_version`:
+    the log only has a found/not-found flag, and the penalty depends on how many failures there were.
+    """
+    import numpy as np
+    version = version or SCORING_VERSION
+    with open(in_path, newline='', encoding='utf-8') as f:
+        reader = csv.DictReader(f)
+        fieldnames = list(reader.fieldnames or [])
+        rows = list(reader)
+    old_scores = np.array([_csv_int(row.get('reputation_score'), -1) for row in rows], dtype=np.int64)
+    failures = np.array([1 if row.get('failory_specific_failure_found') == 'True' else 0 for row in rows], dtype=np.int64)
+    controversies = np.array([_csv_int(row.get('controversy_hits_count'), 0) for row in rows], dtype=np.int64)
+    compound = implied_compound(old_scores, failures, controversies, from_version)
+    new_scores = score_arrays(compound, failures, controversies, version)
+    scored = old_scores >= 0 # Rows logged without a score ('N/A') are left as they are
+    rescored = scored & (failures == 0)
+    for row, new_score, has_score, is_rescored in zip(rows, new_scores.tolist(), scored.tolist(), rescored.tolist()):
+        if is_rescored: row['reputation_score'] = new_score
+        row['score_version'] = version if is_rescored else (row.get('score_version') or from_version) if has_score else ''
+    if 'score_version' not in fieldnames: fieldnames.append('score_version')
+    with open(out_path, 'w', newline='', encoding='utf-8') as f:
+        writer = csv.DictWriter(f, fieldnames=fieldnames)
+        writer.writeheader()
+        writer.writerows(rows)
+    return {"version": version, "rows": len(rows), "changed": int((rescored & (new_scores != old_scores)).sum()),
+            "skipped_unknown_failure_count": int((scored & ~rescored).sum()), "path": out_path}
+
+
+def _csv_int(value, default):
+    try:
+        return int(float(value))
+    except (TypeError, ValueError):
+        return default
+
+
+if __name__ == '__main__':
+    import argparse
+    import history
+    parser = argparse.ArgumentParser(description="Re-score stored verifications under a scoring version.")
+    sub = parser.add_subparsers(dest="command", required=True)
+    db_parser = sub.add_parser("rescore", help="Re-score the search history database")
+    db_parser.add_argument("--version", default=SCORING_VERSION)
+    db_parser.add_argument("--dry-run", action="store_true", help="Report what would change without writing")
+    csv_parser = sub.add_parser("rescore-csv", help="Write a re-scored copy of a search log CSV")
+    csv_parser.add_argument("in_path")
+    csv_parser.add_argument("out_path")
+    csv_parser.add_argument("--version", default=SCORING_VERSION)
+    csv_parser.add_argument("--from-version", default=BASELINE_VERSION, help="Version the CSV's scores were computed with")
+    sub.add_parser("versions", help="List the known weight versions")
+    args = parser.parse_args()
+
+    if args.command == "versions":
+        for name, weights in SCORING_WEIGHTS.items():
+            print(name, "(current)" if name == SCORING_VERSION else "", weights)
+    elif args.command == "rescore":
+        store = history.get_store()
+        if store is None: sys.exit(1)
+        print(rescore_history(store, args.version, args.dry_run))
+    else:
+        print(rescore_csv(args.in_path, args.out_path, args.version, args.from_version))
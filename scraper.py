@@ -1,15 +1,17 @@
 # scraper.py
-import time
+import os
 import random
 import requests
-from bs4 import BeautifulSoup
-from selenium import webdriver
-from selenium.webdriver.chrome.service import Service
-from selenium.webdriver.common.by import By
-from selenium.webdriver.chrome.options import Options
-from selenium.common.exceptions import NoSuchElementException, TimeoutException
-from webdriver_manager.chrome import ChromeDriverManager
+import http_client # Shared keep-alive session pool for all outbound calls
+from concurrent.futures import ThreadPoolExecutor
+from urllib.parse import urljoin, urlsplit, urlunsplit
+import extract # lxml/XPath extraction of result records from DuckDuckGo and Failory pages
+import search_fetcher # One de-duplicated, paged DuckDuckGo fetch shared by the sentiment and controversy sources
 from analyzer import analyze_sentiment # Used for web sentiment search
+import industry_classifier
+import browser_pool
+import metrics
+import record_codec
 import logging
 
 logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
@@ -25,12 +27,29 @@ USER_AGENTS = [
 def get_random_user_agent():
     return random.choice(USER_AGENTS)
 
-# --- Selenium Setup (Keep as before) ---
+# --- Selenium Setup ---
+SELENIUM_HEADLESS = os.environ.get("SELENIUM_HEADLESS", "1") == "1"
+_chromedriver_path = None # Resolved once; ChromeDriverManager().install() checks versions on every call
+
+def _get_chromedriver_path():
+    global _chromedriver_path
+    if _chromedriver_path is None:
+        from webdriver_manager.chrome import ChromeDriverManager
+        _chromedriver_path = ChromeDriverManager().install()
+    return _chromedriver_path
+
 def setup_selenium_driver():
-    """Sets up Selenium WebDriver (Keep as before, simplified logging)"""
+    """
+    Starts a new Chrome WebDriver (headless unless SELENIUM_HEADLESS=0), or returns None on failure.
+    Sources should borrow from the `browsers` pool below instead of calling this per query.
+    """
+    # Imported here: the Selenium/webdriver-manager stack is slow to import and only needed for real browser scraping
+    from selenium import webdriver
+    from selenium.webdriver.chrome.service import Service
+    from selenium.webdriver.chrome.options import Options
     chrome_options = Options()
     chrome_options.add_argument(f'user-agent={get_random_user_agent()}')
-    # chrome_options.add_argument("--headless") # Uncomment for server deployment
+    if SELENIUM_HEADLESS: chrome_options.add_argument("--headless=new")
     chrome_options.add_argument("--disable-gpu")
     chrome_options.add_argument("--window-size=1920x1080")
     chrome_options.add_argument("--no-sandbox")
@@ -39,7 +58,7 @@ def setup_selenium_driver():
     chrome_options.add_experimental_option("excludeSwitches", ["enable-automation"])
     chrome_options.add_experimental_option('useAutomationExtension', False)
     try:
-        service = Service(ChromeDriverManager().install())
+        service = Service(_get_chromedriver_path())
         driver = webdriver.Chrome(service=service, options=chrome_options)
         driver.execute_script("Object.defineProperty(navigator, 'webdriver', {get: () => undefined})")
         return driver
@@ -47,8 +66,9 @@ def setup_selenium_driver():
         logging.error(f"Error setting up Selenium driver: {e}")
         return None
 
-def random_delay(min_seconds=1, max_seconds=3):
-    time.sleep(random.uniform(min_seconds, max_seconds))
+# Reusable browsers for Selenium-backed sources:  with browsers.browser() as driver: ...
+# Nothing is started until the first checkout.
+browsers = browser_pool.create_pool(setup_selenium_driver)
 
 # --- LinkedIn Scraping (Keep Simulated Version) ---
 def scrape_linkedin_profile(profile_url, linkedin_email, linkedin_password):
@@ -63,20 +83,9 @@ def scrape_linkedin_profile(profile_url, linkedin_email, linkedin_password):
         "error": "Using simulated LinkedIn data for demonstration."
     }
 
-# --- Industry Identification and Learnings (Keep as before, maybe expand DB) ---
-INDUSTRY_KEYWORDS = {
-    "Quick Commerce": ["zepto", "blinkit", "swiggy instamart", "getir", "gorillas", "fast delivery", "10 minute delivery"],
-    "FinTech": ["fintech", "payment", "lending", "insurtech", "crypto", "blockchain", "wealthtech", "paytm", "razorpay", "stripe"],
-    "SaaS": ["saas", "software", "cloud", "crm", "erp", "subscription software", "freshworks", "zoho", "salesforce"],
-    "EdTech": ["edtech", "education", "online learning", "tutoring", "skill development", "byjus", "unacademy", "coursera"],
-    "HealthTech": ["healthtech", "telemedicine", "digital health", "medical", "pharma", "practo", "apollo 247"],
-    "E-commerce": ["ecommerce", "marketplace", "online retail", "shopping", "dtc", "d2c", "flipkart", "amazon", "meesho"],
-    "Logistics": ["logistics", "supply chain", "shipping", "transportation", "fulfillment", "delhivery", "rivigo"],
-    "AI/ML": ["artificial intelligence", "machine learning", "ai ", " ml ", "deep learning"],
-    "Social Media": ["social media", "networking", "community", "facebook", "instagram", "twitter", "linkedin"],
-    "Gaming": ["gaming", "esports", "mobile game", "console", "pc game"],
-    "FoodTech": ["food delivery", "restaurant tech", "cloud kitchen", "zomato", "swiggy"]
-}
+# --- Industry Identification and Learnings ---
+# Keyword/weight table lives in data/industry_keywords.json and is compiled once by industry_classifier
+INDUSTRY_KEYWORDS = industry_classifier.KEYWORD_TABLE
 
 INDUSTRY_LEARNINGS_DB = {
     "Quick Commerce": {
@@ -121,14 +130,15 @@ INDUSTRY_LEARNINGS_DB = {
         ]
     }
 }
-
-def _identify_industry(query):
-    """Basic keyword matching to guess industry."""
-    query_lower = query.lower()
-    for industry, keywords in INDUSTRY_KEYWORDS.items():
-        if any(keyword in query_lower for keyword in keywords):
-            logging.info(f"Identified potential industry: {industry} for query: '{query}'")
-            return industry
+# Cached records store these by industry key instead of repeating the text
+record_codec.register_static_table("industry_learnings", INDUSTRY_LEARNINGS_DB)
+
+def _identify_industry(query, texts=()):
+    """Best-scoring industry for the query (and optional snippets), or None."""
+    ranking = industry_classifier.classify_industry(query, texts)
+    if ranking:
+        logging.info(f"Identified potential industry: {ranking[0]['industry']} ({ranking[0]['confidence']:.0%}) for query: '{query}'")
+        return ranking[0]["industry"]
     logging.info(f"Could not identify specific industry for query: '{query}'")
     return None
 
@@ -138,6 +148,66 @@ def _get_industry_learnings(industry):
     logging.info(f"Fetching learnings for industry key: {lookup_key}")
     return INDUSTRY_LEARNINGS_DB[lookup_key]
 
+# --- Failory Detail Pages ---
+FAILORY_BASE_URL = "https://www.failory.com"
+FAILORY_FAILURE_PATHS = ['/cemetery', '/graveyard', '/failed-startups', '/post-mortem', '/interview']
+FAILORY_MAX_DETAIL_PAGES = int(os.environ.get("FAILORY_MAX_DETAIL_PAGES", 5)) # Cap per query
+FAILORY_DETAIL_CONCURRENCY = int(os.environ.get("FAILORY_DETAIL_CONCURRENCY", 4))
+
+# Shared across queries so a popular name can't monopolise more than this many workers
+_failory_executor = ThreadPoolExecutor(max_workers=FAILORY_DETAIL_CONCURRENCY, thread_name_prefix="failory-detail")
+
+def _canonical_failory_url(href):
+    """
+    Normalises relative/absolute Failory links to one form so the same page is
+    only fetched once: https, lower-case host with www., no query/fragment, no trailing slash.
+    """
+    parts = urlsplit(urljoin(FAILORY_BASE_URL + "/", href.strip()))
+    host = parts.netloc.lower()
+    if host == "failory.com": host = "www.failory.com"
+    path = parts.path.rstrip('/') or '/'
+    return urlunsplit(("https", host, path, "", ""))
+
+def _find_failory_detail_links(page_html, founder_or_startup_name):
+    """Returns canonical, de-duplicated failure-story URLs matching the query, capped at FAILORY_MAX_DETAIL_PAGES."""
+    query_parts = [part for part in founder_or_startup_name.lower().split() if len(part) > 2]
+    seen = set()
+    links = []
+    for href, link_text in extract.parse_failory_links(page_html):
+        link_text_lower = link_text.lower()
+        # Basic query matching (can be improved)
+        is_failure_link = any(keyword in href for keyword in FAILORY_FAILURE_PATHS)
+        matches_query = any(part in link_text_lower for part in query_parts) or any(part in href for part in query_parts)
+        if not (is_failure_link and matches_query): continue
+
+        url = _canonical_failory_url(href)
+        if not url.startswith(FAILORY_BASE_URL) or url in seen: continue
+        seen.add(url)
+        links.append(url)
+        if len(links) >= FAILORY_MAX_DETAIL_PAGES:
+            logging.info(f"Reached cap of {FAILORY_MAX_DETAIL_PAGES} Failory detail pages for '{founder_or_startup_name}'.")
+            break
+    return links
+
+def _scrape_failory_detail(url, headers):
+    """Fetches and parses one Failory failure page into a summary dict (raises on fetch/parse errors)."""
+    page_response = http_client.get(url, headers=headers, timeout=15)
+    page_response.raise_for_status()
+    article = extract.parse_failory_article(page_response.text, url)
+    paragraph_texts = article.paragraphs
+
+    # Basic reason/advice extraction (can be improved)
+    reasons = [text for text in paragraph_texts if "reason for failure" in text.lower() or "why we failed" in text.lower()][:3]
+    advice = [text for text in paragraph_texts if "advice for founders" in text.lower() or "lessons learned" in text.lower()][:3]
+
+    return {
+        "title": article.title,
+        "url": url,
+        "snippet": article.snippet, # Store full snippet from page
+        "potential_reasons": reasons,
+        "potential_advice": advice
+    }
+
 # --- Renamed Function: Checks Failory AND provides Industry Insights ---
 def get_failure_and_industry_insights(founder_or_startup_name):
     """
@@ -152,84 +222,50 @@ def get_failure_and_industry_insights(founder_or_startup_name):
         "failure_details": [], # Stores scraped details if found via Failory
         "failed_startups": [], # Simple list of names if specific failure found (for score penalty)
         "identified_industry": None, # Store the identified industry
+        "industry_ranking": [], # All matching industries with confidences
         "industry_learnings": None, # Stores fallback/general industry info
         "error": None # Store errors encountered during Failory scrape specifically
     }
 
     # 1. Identify Industry (always do this)
-    industry = _identify_industry(founder_or_startup_name)
+    insights_data["industry_ranking"] = industry_classifier.classify_industry(founder_or_startup_name)
+    industry = insights_data["industry_ranking"][0]["industry"] if insights_data["industry_ranking"] else None
+    logging.info(f"Identified potential industry: {industry} for query: '{founder_or_startup_name}'")
     insights_data["identified_industry"] = industry
     insights_data["industry_learnings"] = _get_industry_learnings(industry) # Get learnings regardless
 
     # 2. Attempt to Scrape Failory for specific failure details
     search_query = '+'.join(founder_or_startup_name.split())
-    search_url = f"https://www.failory.com/search?query={search_query}"
+    search_url = f"{FAILORY_BASE_URL}/search?query={search_query}"
     insights_data["failory_search_url"] = search_url
     headers = {'User-Agent': get_random_user_agent()}
 
     try:
         logging.info(f"Attempting Failory scrape at: {search_url}")
-        response = requests.get(search_url, headers=headers, timeout=15)
+        response = http_client.get(search_url, headers=headers, timeout=15)
         response.raise_for_status()
-        soup = BeautifulSoup(response.text, 'lxml')
-
-        # Look for results (selectors might need updating)
-        results_container = soup.find('div', class_='fs-cmsfilter_list') or soup
-        possible_links = results_container.find_all('a', href=True)
-        relevant_link_found = False
-        failure_keywords = ['/cemetery', '/graveyard', '/failed-startups', '/post-mortem', '/interview']
-
-        for link in possible_links:
-            href = link.get('href', '')
-            link_text_lower = link.text.lower()
-            # Basic query matching (can be improved)
-            query_parts = [part for part in founder_or_startup_name.lower().split() if len(part) > 2]
-            is_failure_link = any(keyword in href for keyword in failure_keywords)
-            matches_query = any(part in link_text_lower for part in query_parts) or any(part in href for part in query_parts)
-
-            if is_failure_link and matches_query:
-                if not href.startswith('http'): href = f"https://www.failory.com{href}"
-                logging.info(f"Found potential Failory failure link: {href}")
-                try:
-                    # Scrape the specific failure page
-                    page_response = requests.get(href, headers=headers, timeout=15)
-                    page_response.raise_for_status()
-                    page_soup = BeautifulSoup(page_response.text, 'lxml')
-
-                    title_elem = page_soup.find('h1')
-                    title_text = title_elem.text.strip() if title_elem else "Failory Article"
-
-                    content_div = page_soup.find('div', class_='rich-text-block') or page_soup.find('article')
-                    paragraphs = content_div.find_all(['p', 'li']) if content_div else []
-                    snippet = "\n".join([p.text.strip() for p in paragraphs if p.text.strip()]) # Join non-empty paragraphs
-
-                    # Basic reason/advice extraction (can be improved)
-                    reasons = [p.text.strip() for p in paragraphs if "reason for failure" in p.text.lower() or "why we failed" in p.text.lower()][:3]
-                    advice = [p.text.strip() for p in paragraphs if "advice for founders" in p.text.lower() or "lessons learned" in p.text.lower()][:3]
-
-                    failure_summary = {
-                        "title": title_text,
-                        "url": href,
-                        "snippet": snippet, # Store full snippet from page
-                        "potential_reasons": reasons,
-                        "potential_advice": advice
-                    }
-                    insights_data["failure_details"].append(failure_summary)
-                    # Only populate 'failed_startups' if we successfully scrape details
-                    insights_data["failed_startups"].append({"name": founder_or_startup_name, "source_url": href})
-                    insights_data["specific_failure_found"] = True
-                    relevant_link_found = True
-                    logging.info(f"Successfully scraped failure details from: {href}")
-                    # break # Optional: Stop after first relevant link
-
-                except requests.exceptions.RequestException as page_e:
-                    logging.warning(f"Could not fetch Failory page {href}: {page_e}")
-                    if not insights_data["error"]: insights_data["error"] = f"Error fetching Failory page: {page_e}"
-                except Exception as page_e:
-                    logging.warning(f"Error parsing Failory page {href}: {page_e}")
-                    if not insights_data["error"]: insights_data["error"] = f"Error parsing Failory page: {page_e}"
-
-        if not relevant_link_found:
+
+        detail_urls = _find_failory_detail_links(response.text, founder_or_startup_name)
+        if detail_urls:
+            logging.info(f"Fetching {len(detail_urls)} Failory failure page(s): {detail_urls}")
+        # Fetch and parse detail pages concurrently; results are collected in link order
+        futures = [metrics.submit(_failory_executor, _scrape_failory_detail, url, headers) for url in detail_urls]
+        for url, future in zip(detail_urls, futures):
+            try:
+                failure_summary = future.result()
+                insights_data["failure_details"].append(failure_summary)
+                # Only populate 'failed_startups' if we successfully scrape details
+                insights_data["failed_startups"].append({"name": founder_or_startup_name, "source_url": url})
+                insights_data["specific_failure_found"] = True
+                logging.info(f"Successfully scraped failure details from: {url}")
+            except requests.exceptions.RequestException as page_e:
+                logging.warning(f"Could not fetch Failory page {url}: {page_e}")
+                if not insights_data["error"]: insights_data["error"] = f"Error fetching Failory page: {page_e}"
+            except Exception as page_e:
+                logging.warning(f"Error parsing Failory page {url}: {page_e}")
+                if not insights_data["error"]: insights_data["error"] = f"Error parsing Failory page: {page_e}"
+
+        if not detail_urls:
             logging.info(f"No specific failure links found on Failory for '{founder_or_startup_name}'.")
             # No error message needed here, as industry insights are provided anyway
 
@@ -249,43 +285,26 @@ def get_failure_and_industry_insights(founder_or_startup_name):
     logging.info("Failure/Industry Insights retrieval finished.")
     return insights_data
 
-# --- General Web Scraping for Sentiment (Keep as before) ---
+# --- General Web Scraping for Sentiment ---
 def search_web_for_sentiment(query):
     """Performs a general web search (using DuckDuckGo) for overall sentiment."""
     logging.info(f"Searching web for general sentiment about: {query}")
-    search_engine_url = "https://html.duckduckgo.com/html/"
-    params = {'q': query}
-    headers = {'User-Agent': get_random_user_agent()}
     results = {"snippets": [], "overall_sentiment": {}, "error": None}
     all_text = ""
 
     try:
-        response = requests.post(search_engine_url, data=params, headers=headers, timeout=15)
-        response.raise_for_status()
-        soup = BeautifulSoup(response.text, 'lxml')
-        result_divs = soup.find_all('div', class_='result__body')
-
-        if not result_divs:
-             logging.warning("Could not find primary result divs on DDG, trying alternatives...")
-             result_divs = soup.find_all('td', class_='result-link') # Example fallback
-
-        snippet_count = 0
-        for div in result_divs:
-            if snippet_count >= 10: break # Limit results
-            snippet_tag = div.find('a', class_='result__snippet')
-            if snippet_tag:
-                snippet = snippet_tag.text.strip()
-                if snippet: # Avoid empty snippets
-                    results["snippets"].append(snippet)
-                    all_text += snippet + " . "
-                    snippet_count += 1
+        search_results = search_fetcher.fetch_search_results(query, user_agent=get_random_user_agent())
+        for result in search_results.view([search_fetcher.GENERAL], limit=10): # Limit results
+            results["snippets"].append(result.snippet)
+            all_text += result.snippet + " . "
 
         if not results["snippets"]:
              logging.warning("Could not extract any snippets from DuckDuckGo results page.")
              results["error"] = "Failed to parse search result snippets."
              all_text = f"Search for {query} yielded no text snippets for sentiment analysis." # Default text
 
-        results["overall_sentiment"] = analyze_sentiment(all_text)
+        with metrics.stage("sentiment"):
+            results["overall_sentiment"] = analyze_sentiment(all_text)
 
     except requests.exceptions.RequestException as e:
         results["error"] = f"Web search request failed: {e}"
@@ -303,10 +322,7 @@ def search_web_for_sentiment(query):
 def search_for_controversies(query):
     """Performs a targeted web search for potential controversies, lawsuits, scandals, etc."""
     logging.info(f"Searching web for potential controversies about: {query}")
-    controversy_query = f'"{query}" controversy OR lawsuit OR scandal OR allegations OR dispute OR fraud OR investigation'
-    search_engine_url = "https://html.duckduckgo.com/html/"
-    params = {'q': controversy_query}
-    headers = {'User-Agent': get_random_user_agent()}
+    controversy_query = search_fetcher.QUERY_VARIANTS[search_fetcher.CONTROVERSY].format(query=query)
     results = {
         "source": "Web Search (Controversies)",
         "search_query": controversy_query,
@@ -320,37 +336,23 @@ def search_for_controversies(query):
     ]
 
     try:
-        response = requests.post(search_engine_url, data=params, headers=headers, timeout=15)
-        response.raise_for_status()
-        soup = BeautifulSoup(response.text, 'lxml')
-        result_divs = soup.find_all('div', class_='result__body')
-
-        if not result_divs:
-             logging.warning("Could not find primary result divs on DDG for controversy search.")
-
-        hit_count = 0
-        for div in result_divs:
-            if hit_count >= 7: break # Limit hits
-            snippet_tag = div.find('a', class_='result__snippet')
-            title_tag = div.find('a', class_='result__a')
-            link_url = title_tag['href'] if title_tag and title_tag.has_attr('href') else '#' # Safer access
-
-            if snippet_tag:
-                snippet_text = snippet_tag.text.strip()
-                title_text = title_tag.text.strip() if title_tag else "Result Title"
-                # Check if snippet text OR title contains any controversy keywords
-                text_to_check = (snippet_text + " " + title_text).lower()
-                if any(keyword in text_to_check for keyword in controversy_keywords):
-                     hit = {
-                         "snippet": snippet_text, # Store full snippet
-                         "title": title_text,
-                         "url": link_url
-                     }
-                     results["potential_hits"].append(hit)
-                     hit_count += 1
-                     logging.info(f"Found potential controversy snippet: {title_text} - {snippet_text[:80]}...")
-
-        if not results["potential_hits"]:
+        def mentions_controversy(result):
+            # Check if snippet text OR title contains any controversy keywords
+            text_to_check = (result.snippet + " " + result.title).lower()
+            return any(keyword in text_to_check for keyword in controversy_keywords)
+
+        # Controversy-query results first, then matching results from the general search (already de-duplicated)
+        search_results = search_fetcher.fetch_search_results(query, user_agent=get_random_user_agent())
+        for result in search_results.view([search_fetcher.CONTROVERSY, search_fetcher.GENERAL], predicate=mentions_controversy, limit=7): # Limit hits
+            results["potential_hits"].append(result._asdict()) # snippet, title, url
+            logging.info(f"Found potential controversy snippet: {result.title} - {result.snippet[:80]}...")
+
+        controversy_error = search_results.errors.get(search_fetcher.CONTROVERSY)
+        if controversy_error:
+             # Not a "No specific..." result, so a failed controversy query isn't cached as a clean record
+             logging.error(f"Controversy search error: {controversy_error}")
+             results["error"] = f"Controversy search request failed: {controversy_error}"
+        elif not results["potential_hits"]:
              logging.info("No snippets matching controversy keywords found.")
              results["error"] = "No specific controversy-related snippets found in preliminary web search."
 
@@ -0,0 +1,208 @@
+# search_fetcher.py
+import os
+import re
+import time
+import hashlib
+import threading
+import logging
+from concurrent.futures import ThreadPoolExecutor
+from urllib.parse import urlsplit, urlunsplit, parse_qsl, urlencode
+import requests
+import http_client
+import extract
+import metrics
+from singleflight import SingleFlight, SingleFlightTimeout
+
+logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+
+# --- Search Fetcher Configuration ---
+DDG_HTML_URL = "https://html.duckduckgo.com/html/"
+SEARCH_TARGET_RESULTS = int(os.environ.get("SEARCH_TARGET_RESULTS", 20)) # Distinct results wanted per variant
+SEARCH_MAX_PAGES = int(os.environ.get("SEARCH_MAX_PAGES", 2)) # Pages fetched per variant at most
+SEARCH_PAGE_BUDGET = int(os.environ.get("SEARCH_PAGE_BUDGET", 4)) # Pages fetched per query across all variants
+SEARCH_TIME_BUDGET_SECONDS = float(os.environ.get("SEARCH_TIME_BUDGET_SECONDS", 10)) # No new page is started after this
+SEARCH_REUSE_SECONDS = float(os.environ.get("SEARCH_REUSE_SECONDS", 30)) # A finished fetch is reused by consumers arriving late
+SEARCH_WORKERS = int(os.environ.get("SEARCH_WORKERS", 8))
+TRACKING_PARAMS = re.compile(r"^(utm_\w+|fbclid|gclid|ref|ref_src|mc_cid|mc_eid)$", re.IGNORECASE)
+
+# Query variants run for every founder/startup; consumers pick the ones they want with ResultSet.view()
+GENERAL = "general"
+CONTROVERSY = "controversy"
+QUERY_VARIANTS = {
+    GENERAL: "{query}",
+    CONTROVERSY: '"{query}" controversy OR lawsuit OR scandal OR allegations OR dispute OR fraud OR investigation',
+}
+
+_search_executor = ThreadPoolExecutor(max_workers=SEARCH_WORKERS, thread_name_prefix="search")
+_flights = SingleFlight()
+_recent = {} # query key -> (expires_at, ResultSet)
+_recent_lock = threading.Lock()
+
+
+def canonical_url(url):
+    """Comparison form of a result URL: lower-case host without www., no fragment, tracking params or trailing slash."""
+    parts = urlsplit(url)
+    host = parts.netloc.lower()
+    if host.startswith("www."): host = host[4:]
+    query = urlencode([(k, v) for k, v in parse_qsl(parts.query, keep_blank_values=True) if not TRACKING_PARAMS.match(k)])
+    return urlunsplit(("", host, parts.path.rstrip('/'), query, ""))
+
+
+def snippet_fingerprint(snippet):
+    """Case/punctuation/whitespace-insensitive hash of a snippet, so syndicated copies of a story collapse."""
+    words = re.findall(r"\w+", snippet.lower())
+    return hashlib.blake2b(" ".join(words).encode('utf-8'), digest_size=12).digest()
+
+
+class ResultSet:
+    """
+    Distinct search results for one founder/startup across query variants. A result
+    seen again (same canonical URL or same snippet fingerprint) is merged into the
+    first sighting, which records every variant that returned it and its rank there.
+    """
+
+    def __init__(self, query):
+        self.query = query
+        self._entries = [] # [SearchResult, {variant: rank}]
+        self._by_url = {}
+        self._by_fingerprint = {}
+        self._counts = {} # variant -> results returned (including duplicates)
+        self._lock = threading.Lock()
+        self.pages = {} # variant -> pages fetched
+        self.errors = {} # variant -> error message
+        self.duplicates = 0
+
+    def add(self, variant, results):
+        """Merges one page of results; returns how many were new."""
+        new = 0
+        with self._lock:
+            for result in results:
+                rank = self._counts.get(variant, 0)
+                self._counts[variant] = rank + 1
+                url_key = canonical_url(result.url) if result.url not in ("", "#") else None
+                fingerprint = snippet_fingerprint(result.snippet)
+                entry = self._by_url.get(url_key) if url_key else None
+                entry = entry or self._by_fingerprint.get(fingerprint)
+                if entry is not None:
+                    self.duplicates += 1
+                    entry[1].setdefault(variant, rank)
+                    continue
+                entry = [result, {variant: rank}]
+                self._entries.append(entry)
+                if url_key: self._by_url[url_key] = entry
+                self._by_fingerprint[fingerprint] = entry
+                new += 1
+        return new
+
+    def distinct_count(self, variant):
+        with self._lock:
+            return sum(1 for _result, ranks in self._entries if variant in ranks)
+
+    def view(self, variants=None, predicate=None, limit=None):
+        """
+        Results returned by any of `variants` (default: all), ordered by the first listed
+        variant that returned them and then by rank in it, optionally filtered and capped.
+        """
+        with self._lock:
+            entries = list(self._entries)
+        order = list(variants) if variants else list(QUERY_VARIANTS)
+        ranked = []
+        for result, ranks in entries:
+            positions = [(order.index(variant), rank) for variant, rank in ranks.items() if variant in order]
+            if positions and (predicate is None or predicate(result)):
+                ranked.append((min(positions), result))
+        ranked.sort(key=lambda item: item[0])
+        results = [result for _position, result in ranked]
+        return results[:limit] if limit else results
+
+    def __len__(self):
+        return len(self._entries)
+
+    def stats(self):
+        return {"distinct": len(self), "duplicates": self.duplicates, "pages": dict(self.pages), "errors": dict(self.errors)}
+
+
+class _Budget:
+    """Shared page/time budget for one fetch across its concurrent variants."""
+
+    def __init__(self, pages, seconds):
+        self._pages = pages
+        self._deadline = time.monotonic() + seconds
+        self._lock = threading.Lock()
+
+    def take_page(self):
+        with self._lock:
+            if self._pages <= 0 or time.monotonic() >= self._deadline: return False
+            self._pages -= 1
+            return True
+
+
+def _fetch_variant(result_set, variant, search_query, budget, target, max_pages, headers):
+    """Pages through one query variant until it has `target` distinct results, runs out of pages or budget."""
+    form = {'q': search_query}
+    for page in range(max_pages):
+        if page > 0 and result_set.distinct_count(variant) >= target: break
+        if not budget.take_page(): break
+        response = http_client.post(DDG_HTML_URL, data=form, headers=headers, timeout=15)
+        response.raise_for_status()
+        parsed = extract.parse_ddg_page(response.text)
+        result_set.pages[variant] = page + 1
+        new = result_set.add(variant, parsed.results)
+        if not parsed.results:
+            logging.warning(f"Could not find any result snippets on DDG for: {search_query} (page {page + 1})")
+        if not parsed.next_params or not new: break # Last page, or paging only turned up duplicates
+        form = parsed.next_params
+
+
+def _query_key(query):
+    return " ".join(query.lower().split())
+
+
+def fetch_search_results(query, user_agent=None, variants=None, target=SEARCH_TARGET_RESULTS, max_pages=SEARCH_MAX_PAGES,
+                         page_budget=SEARCH_PAGE_BUDGET, time_budget=SEARCH_TIME_BUDGET_SECONDS):
+    """
+    Runs every query variant for `query` concurrently (one DuckDuckGo page chain each) and
+    returns the merged, de-duplicated ResultSet. Concurrent callers for the same query share
+    one fetch, and a finished fetch is reused for SEARCH_REUSE_SECONDS, so the sentiment and
+    controversy sources cost one round of requests between them.
+    Raises the first request error only if every variant failed, or DeadlineExceeded if the
+    caller's http_client.deadline() runs out while it waits on another caller's fetch.
+    """
+    variants = tuple(variants or QUERY_VARIANTS)
+    key = (_query_key(query), variants)
+    with _recent_lock:
+        now = time.monotonic()
+        for stale_key in [k for k, (expires_at, _rs) in _recent.items() if expires_at <= now]:
+            del _recent[stale_key]
+        recent = _recent.get(key)
+    if recent is not None:
+        return recent[1]
+
+    def fetch():
+        result_set = ResultSet(query)
+        budget = _Budget(page_budget, time_budget)
+        headers = {'User-Agent': user_agent} if user_agent else {}
+        futures = {variant: metrics.submit(_search_executor, _fetch_variant, result_set, variant, QUERY_VARIANTS[variant].format(query=query),
+                                             budget, target, max_pages, headers)
+                   for variant in variants}
+        first_error = None
+        for variant, future in futures.items():
+            try:
+                future.result()
+            except requests.exceptions.RequestException as e:
+                logging.error(f"Search variant '{variant}' failed for '{query}': {e}")
+                result_set.errors[variant] = str(e)
+                first_error = first_error or e
+        if first_error is not None and len(result_set.errors) == len(futures):
+            raise first_error
+        logging.info(f"Search for '{query}': {result_set.stats()}")
+        with _recent_lock:
+            _recent[key] = (time.monotonic() + SEARCH_REUSE_SECONDS, result_set)
+        return result_set
+
+    try:
+        # A caller joining another's fetch waits only as long as its own deadline allows
+        result_set, _shared = _flights.do(key, fetch, timeout=http_client.remaining())
+    except SingleFlightTimeout as e:
+        raise http_client.DeadlineExceeded(str(e)) from e
+    return result_set
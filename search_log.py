@@ -0,0 +1,218 @@
+# search_log.py
+import os
+import csv
+import queue
+import atexit
+import threading
+import logging
+from datetime import datetime
+
+logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+
+# --- Search Log Configuration ---
+SEARCH_LOG_FILE = os.environ.get("SEARCH_LOG_FILE", "search_log.csv")
+SEARCH_LOG_QUEUE_SIZE = int(os.environ.get("SEARCH_LOG_QUEUE_SIZE", 10000)) # Records beyond this are dropped, never waited on
+SEARCH_LOG_BATCH_SIZE = int(os.environ.get("SEARCH_LOG_BATCH_SIZE", 100)) # Flush once this many records are buffered...
+SEARCH_LOG_FLUSH_SECONDS = float(os.environ.get("SEARCH_LOG_FLUSH_SECONDS", 2)) # ...or this long after the first one arrived
+SEARCH_LOG_MAX_BYTES = int(os.environ.get("SEARCH_LOG_MAX_BYTES", 50 * 1024 * 1024)) # Rotate past this size (0 = never)
+SEARCH_LOG_ROTATE_DAILY = os.environ.get("SEARCH_LOG_ROTATE_DAILY", "1") == "1" # Rotate when the date changes
+
+# Define explicit fieldnames for the CSV header
+CSV_FIELDNAMES = [
+    'timestamp', 'query', 'reputation_score', 'sentiment_label',
+    'linkedin_name', 'linkedin_location', 'linkedin_error',
+    'industry_identified', 'failory_specific_failure_found', 'failory_error',
+    'controversy_hits_count', 'controversies_error',
+    'location_names_found', 'cache_status'
+]
+
+
+def build_log_row(data, cache_status, timestamp):
+    """Flattens founder_data into one CSV row - missing keys are handled gracefully."""
+    analysis = data.get('analysis', {})
+    linkedin_data = data.get('linkedin', {})
+    insights_data = data.get('failure_industry_insights', {})
+    controversies_data = data.get('controversies', {})
+    locations = analysis.get('locations', [])
+    return {
+        'timestamp': timestamp.strftime('%Y-%m-%d %H:%M:%S'),
+        'query': data.get('query', 'N/A'),
+        'reputation_score': analysis.get('reputation_score', 'N/A'),
+        'sentiment_label': analysis.get('sentiment_label', 'N/A'),
+        'linkedin_name': linkedin_data.get('name', 'N/A'),
+        'linkedin_location': linkedin_data.get('location', 'N/A'),
+        'linkedin_error': linkedin_data.get('error', ''),
+        'industry_identified': insights_data.get('identified_industry', 'N/A'),
+        'failory_specific_failure_found': insights_data.get('specific_failure_found', False),
+        'failory_error': insights_data.get('error', ''),
+        'controversy_hits_count': len(controversies_data.get('potential_hits', [])),
+        'controversies_error': controversies_data.get('error', ''),
+        'location_names_found': ", ".join(loc.get('name', '') for loc in locations if loc.get('name')),
+        'cache_status': cache_status,
+    }
+
+
+class SearchLogSink:
+    """
+    Asynchronous CSV search log. Request threads only enqueue (never block, never raise);
+    a single background thread builds rows and appends them in batches, rotating the
+    file by size or date. When the queue is full, records are dropped and counted.
+    """
+
+    def __init__(self, path=SEARCH_LOG_FILE, max_queue=SEARCH_LOG_QUEUE_SIZE, batch_size=SEARCH_LOG_BATCH_SIZE,
+                 flush_seconds=SEARCH_LOG_FLUSH_SECONDS, max_bytes=SEARCH_LOG_MAX_BYTES, rotate_daily=SEARCH_LOG_ROTATE_DAILY):
+        self.path = path
+        self.batch_size = batch_size
+        self.flush_seconds = flush_seconds
+        self.max_bytes = max_bytes
+        self.rotate_daily = rotate_daily
+        self._queue = queue.Queue(maxsize=max_queue)
+        self._lock = threading.Lock()
+        self._thread = None
+        self._file = None
+        self._file_date = None
+        self._listeners = []
+        self._stats = {"enqueued": 0, "written": 0, "dropped": 0, "write_errors": 0, "batches": 0, "rotations": 0,
+                       "listener_errors": 0}
+
+    def add_listener(self, fn):
+        """fn(batch) also receives every batch of (timestamp, data, cache_status), on the writer thread."""
+        self._listeners.append(fn)
+
+    def submit(self, data, cache_status, query=None):
+        """
+        Queues one search for logging. Safe to call from request threads. query is the text
+        the user searched for; the record's own query is the canonical display name of
+        whichever search computed it, so it is replaced (on a shallow copy) when they differ.
+        """
+        try:
+            if query is not None and data.get('query') != query: data = dict(data, query=query)
+            self._ensure_thread()
+            self._queue.put_nowait((datetime.now(), data, cache_status))
+        except queue.Full:
+            with self._lock: self._stats["dropped"] += 1
+            return False
+        except Exception as e: # Logging must never fail a request
+            logging.error(f"Could not queue search log record for '{data.get('query', 'N/A')}': {e}")
+            with self._lock: self._stats["dropped"] += 1
+            return False
+        with self._lock: self._stats["enqueued"] += 1
+        return True
+
+    def _ensure_thread(self):
+        # Started on first use so importing the module never spawns threads
+        if self._thread is not None: return
+        with self._lock:
+            if self._thread is not None: return
+            self._thread = threading.Thread(target=self._run, name="search-log-writer", daemon=True)
+            self._thread.start()
+
+    def _run(self):
+        while True:
+            item = self._queue.get()
+            if item is None: # Shutdown sentinel
+                self._queue.task_done()
+                return
+            batch = [item]
+            deadline = item[0].timestamp() + self.flush_seconds
+            stop = False
+            while len(batch) < self.batch_size:
+                remaining = deadline - datetime.now().timestamp()
+                if remaining <= 0: break
+                try:
+                    item = self._queue.get(timeout=remaining)
+                except queue.Empty:
+                    break
+                if item is None:
+                    stop = True
+                    break
+                batch.append(item)
+            self._write_batch(batch)
+            self._notify(batch)
+            for _ in range(len(batch) + stop): self._queue.task_done()
+            if stop: return
+
+    def _write_batch(self, batch):
+        try:
+            rows = [build_log_row(data, cache_status, timestamp) for timestamp, data, cache_status in batch]
+            self._maybe_rotate(batch[0][0])
+            f = self._open()
+            writer = csv.DictWriter(f, fieldnames=CSV_FIELDNAMES)
+            writer.writerows(rows)
+            f.flush()
+        except Exception as e:
+            logging.error(f"Error writing {len(batch)} search log record(s) to {self.path}: {e}")
+            with self._lock: self._stats["write_errors"] += len(batch)
+            self._close_file() # Reopen on the next batch
+            return
+        with self._lock:
+            self._stats["written"] += len(rows)
+            self._stats["batches"] += 1
+
+    def _notify(self, batch):
+        for listener in self._listeners:
+            try:
+                listener(batch)
+            except Exception as e:
+                logging.error(f"Search log listener {getattr(listener, '__name__', listener)} failed: {e}")
+                with self._lock: self._stats["listener_errors"] += 1
+
+    def _open(self):
+        if self._file is None:
+            new_file = not os.path.isfile(self.path) or os.path.getsize(self.path) == 0
+            self._file = open(self.path, mode='a', newline='', encoding='utf-8')
+            if new_file:
+                csv.DictWriter(self._file, fieldnames=CSV_FIELDNAMES).writeheader() # Header only if file is new or empty
+                self._file_date = datetime.now().date()
+            else:
+                self._file_date = datetime.fromtimestamp(os.path.getmtime(self.path)).date()
+        return self._file
+
+    def _maybe_rotate(self, now):
+        if not os.path.isfile(self.path): return
+        if self._file_date is None: # Existing file from a previous run
+            self._file_date = datetime.fromtimestamp(os.path.getmtime(self.path)).date()
+        too_big = self.max_bytes and os.path.getsize(self.path) >= self.max_bytes
+        new_day = self.rotate_daily and now.date() != self._file_date
+        if not (too_big or new_day): return
+        self._close_file()
+        stem, ext = os.path.splitext(self.path)
+        index = 1
+        while os.path.exists(f"{stem}.{self._file_date:%Y-%m-%d}.{index}{ext}"): index += 1
+        rotated = f"{stem}.{self._file_date:%Y-%m-%d}.{index}{ext}"
+        os.replace(self.path, rotated)
+        self._file_date = None
+        with self._lock: self._stats["rotations"] += 1
+        logging.info(f"Rotated search log to {rotated}")
+
+    def _close_file(self):
+        if self._file is not None:
+            try: self._file.close()
+            except OSError: pass
+            self._file = None
+
+    def flush(self, timeout=None):
+        """Blocks until everything queued so far is written (used by tests/benchmarks and shutdown)."""
+        if self._thread is None: return
+        done = threading.Event()
+        threading.Thread(target=lambda: (self._queue.join(), done.set()), daemon=True).start()
+        done.wait(timeout)
+
+    def close(self, timeout=5):
+        """Writes out pending records and stops the writer thread."""
+        if self._thread is None: return
+        try:
+            self._queue.put(None, timeout=timeout)
+        except queue.Full:
+            logging.warning("Search log queue still full at shutdown; pending records are lost.")
+        self._thread.join(timeout)
+        self._thread = None
+        self._close_file()
+
+    def stats(self):
+        with self._lock:
+            return {**self._stats, "queued": self._queue.qsize(), "max_queue": self._queue.maxsize, "path": self.path}
+
+
+sink = SearchLogSink()
+atexit.register(sink.close)
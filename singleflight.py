@@ -0,0 +1,78 @@
+# singleflight.py
+import threading
+import logging
+
+logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+
+
+class SingleFlightTimeout(TimeoutError):
+    """Raised to a waiting caller when the in-flight computation doesn't finish in time."""
+
+
+class _Call:
+    def __init__(self):
+        self.done = threading.Event()
+        self.result = None
+        self.error = None
+        self.waiters = 0
+
+
+class SingleFlight:
+    """
+    Coalesces concurrent calls for the same key: the first caller (the leader) runs the
+    function, later callers block until it finishes and receive the same result, or
+    the same exception. Once the call completes the key is forgotten, so the next
+    caller starts a fresh computation.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._calls = {}
+        self._stats = {"leaders": 0, "coalesced": 0, "timeouts": 0, "errors": 0}
+
+    def do(self, key, fn, timeout=None):
+        """
+        Runs fn() once per key among concurrent callers. Returns (result, shared), where
+        shared is False for the leader and True for callers that waited on it.
+        Waiters raise SingleFlightTimeout after `timeout` seconds (None waits forever).
+        """
+        with self._lock:
+            call = self._calls.get(key)
+            leader = call is None
+            if leader:
+                call = self._calls[key] = _Call()
+                self._stats["leaders"] += 1
+            else:
+                call.waiters += 1
+                self._stats["coalesced"] += 1
+
+        if leader:
+            try:
+                call.result = fn()
+            except BaseException as e:
+                call.error = e
+                with self._lock: self._stats["errors"] += 1
+            finally:
+                with self._lock:
+                    del self._calls[key]
+                call.done.set()
+            if call.waiters:
+                logging.info(f"Single-flight '{key}' served {call.waiters} waiting caller(s)")
+            if call.error is not None:
+                raise call.error
+            return call.result, False
+
+        if not call.done.wait(timeout):
+            with self._lock: self._stats["timeouts"] += 1
+            raise SingleFlightTimeout(f"Timed out after {timeout}s waiting for in-flight computation of '{key}'")
+        if call.error is not None:
+            raise call.error
+        return call.result, True
+
+    def in_flight(self):
+        with self._lock:
+            return len(self._calls)
+
+    def stats(self):
+        with self._lock:
+            return {**self._stats, "in_flight": len(self._calls)}
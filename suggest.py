@@ -0,0 +1,149 @@
+# suggest.py
+"""
+Typeahead over every founder/startup verified so far, keyed by normalize.canonical_key()
+so each entity is suggested once under its canonical name.
+
+Two in-memory indexes:
+  - a sorted list of (term, key) pairs where the terms are the key, every word-start
+    suffix of it ("aadit palicha" -> "palicha") and its known aliases. A prefix lookup
+    is a bisect plus a short scan.
+  - a trigram -> keys map, used when prefixes find too few entries, so a misspelling
+    ("zeptp", "payt m") still finds the existing entry.
+The index is loaded from the search history on first use and kept current by the
+search log listener.
+"""
+import re
+import math
+import time
+import bisect
+import heapq
+import threading
+import logging
+from collections import defaultdict
+import normalize
+import history
+
+logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+
+# --- Suggest Configuration ---
+SUGGEST_MAX_SCAN = 400 # Prefix matches examined per lookup; very short prefixes stop here
+SUGGEST_MIN_FUZZY_CHARS = 3 # Trigram matching starts at this many typed characters
+SUGGEST_MIN_SIMILARITY = 0.5 # Share of the typed trigrams a fuzzy match must contain
+
+_NON_WORD = re.compile(r"[^\w]+")
+
+PREFIX = "prefix"
+FUZZY = "fuzzy"
+
+
+def _clean(text):
+    """Folded, punctuation-free form of typed text (legal suffixes are kept: the user may still be typing)."""
+    return " ".join(token for token in _NON_WORD.split(normalize.fold(text)) if token and token != "_")
+
+
+def _word_starts(text):
+    words = text.split()
+    return [" ".join(words[i:]) for i in range(len(words))]
+
+
+def _trigrams(text, closed=True):
+    padded = f"  {text} " if closed else f"  {text}"
+    return {padded[i:i + 3] for i in range(len(padded) - 2)}
+
+
+class SuggestIndex:
+    """Canonical entries with prefix and trigram indexes; thread-safe (one lock, held briefly)."""
+
+    def __init__(self):
+        self._entries = {} # canonical key -> [name, searches, last_ts]
+        self._terms = [] # Sorted (term, key, rank); rank 0 for terms starting at the first word
+        self._grams = defaultdict(set) # trigram -> canonical keys
+        self._lock = threading.Lock()
+        self._loaded = False
+
+    def _index(self, key, name, searches, last_ts):
+        """Adds a new entry's indexes; returns its (term, key, rank) tuples for the caller to place in _terms."""
+        # Caller holds self._lock
+        self._entries[key] = [name, searches, last_ts or time.time()]
+        for gram in _trigrams(key): self._grams[gram].add(key)
+        terms = {}
+        for text in [key] + normalize.aliases_of(key):
+            for position, term in enumerate(_word_starts(text)):
+                terms[term] = min(terms.get(term, 1), 0 if position == 0 else 1)
+        return [(term, key, rank) for term, rank in terms.items()]
+
+    def add(self, name, searches=1, last_ts=None):
+        """Records a verified name (or more searches of a known one)."""
+        self.add_many([(name, searches, last_ts)])
+
+    def add_many(self, rows):
+        """Records (name, searches, last_ts) rows; new terms are sorted in once, so bulk loads stay fast."""
+        with self._lock:
+            new_terms = []
+            for name, searches, last_ts in rows:
+                key = normalize.canonical_key(name)
+                if not key: continue
+                entry = self._entries.get(key)
+                if entry is None:
+                    new_terms.extend(self._index(key, normalize.display_name(name), searches, last_ts))
+                else:
+                    entry[1] += searches
+                    entry[2] = max(entry[2], last_ts or time.time())
+            if len(new_terms) <= 8:
+                for term in new_terms: bisect.insort(self._terms, term)
+            else:
+                self._terms.extend(new_terms)
+                self._terms.sort()
+
+    def load(self, store=None):
+        """Fills the index from the search history once (later calls are no-ops)."""
+        if self._loaded: return
+        with self._lock:
+            if self._loaded: return
+            self._loaded = True
+        store = store or history.get_store()
+        if store is None: return
+        started = time.perf_counter()
+        rows = store.known_queries()
+        self.add_many(rows)
+        logging.info(f"Suggest index loaded {len(self._entries)} entities from {len(rows)} history keys in {time.perf_counter() - started:.2f}s")
+
+    def record_batch(self, batch):
+        """Search-log listener: batch is a list of (timestamp, founder_data, cache_status)."""
+        self.add_many([(data["query"], 1, timestamp.timestamp()) for timestamp, data, _cache_status in batch if data and data.get("query")])
+
+    def suggest(self, text, limit=8):
+        """Up to `limit` entries for typed text: word-prefix matches first, then close spellings; more-searched first within each."""
+        self.load()
+        typed = _clean(text)
+        if not typed: return []
+        with self._lock:
+            prefix_keys = {}
+            index = bisect.bisect_left(self._terms, (typed,))
+            for term, key, rank in self._terms[index:index + SUGGEST_MAX_SCAN]:
+                if not term.startswith(typed): break
+                prefix_keys[key] = min(prefix_keys.get(key, 1), rank) # 0: matched from the first word of the name or an alias
+            ranked = heapq.nsmallest(limit, prefix_keys, key=lambda k: (prefix_keys[k], -self._entries[k][1], self._entries[k][0]))
+            results = [self._result(key, PREFIX) for key in ranked]
+
+            if len(results) < limit and len(typed) >= SUGGEST_MIN_FUZZY_CHARS:
+                postings = sorted((self._grams.get(gram, ()) for gram in _trigrams(typed, closed=False)), key=len)
+                needed = math.ceil(SUGGEST_MIN_SIMILARITY * len(postings))
+                # A key sharing `needed` trigrams has at least one of the len - needed + 1 rarest, so only those are scanned
+                candidates = set().union(*postings[:len(postings) - needed + 1]) - prefix_keys.keys()
+                shared = {key: sum(key in posting for posting in postings) for key in candidates}
+                fuzzy = heapq.nsmallest(limit - len(results), (key for key, count in shared.items() if count >= needed),
+                                        key=lambda k: (-shared[k], -self._entries[k][1], self._entries[k][0]))
+                results.extend(self._result(key, FUZZY) for key in fuzzy)
+        return results
+
+    def _result(self, key, match):
+        # Caller holds self._lock
+        name, searches, _last_ts = self._entries[key]
+        return {"name": name, "key": key, "searches": searches, "match": match}
+
+    def __len__(self):
+        return len(self._entries)
+
+
+index = SuggestIndex()
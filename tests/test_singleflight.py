@@ -0,0 +1,121 @@
+# tests/test_singleflight.py
+"""
+Request coalescing: concurrent /search requests for the same uncached founder must
+cause exactly one upstream fetch per source, and a failure must reach every waiter.
+
+Run from the repo root:  python -m pytest -q tests
+"""
+import os
+import sys
+import time
+import tempfile
+import threading
+from concurrent.futures import ThreadPoolExecutor
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+_tmp = tempfile.mkdtemp()
+os.environ["CACHE_BACKEND"] = "memory" # Keep the run self-contained
+os.environ["HISTORY_DB_PATH"] = os.path.join(_tmp, "history.sqlite3")
+os.environ["SEARCH_LOG_FILE"] = os.path.join(_tmp, "search_log.csv")
+
+import scraper
+import app as app_module
+from singleflight import SingleFlight, SingleFlightTimeout
+
+N = 20
+UPSTREAM_LATENCY = 0.3
+
+
+@pytest.fixture
+def upstream(monkeypatch):
+    """Stubs the network sources; returns the per-source fetch counts."""
+    calls = {"web_sentiment": 0, "controversies": 0, "failory": 0}
+    lock = threading.Lock()
+
+    def stub(source, result):
+        def fetch(query):
+            with lock: calls[source] += 1
+            time.sleep(UPSTREAM_LATENCY)
+            return dict(result)
+        return fetch
+
+    monkeypatch.setattr(scraper, "search_web_for_sentiment", stub("web_sentiment", {
+        "snippets": ["Growing fast."], "overall_sentiment": {"compound": 0.5, "label": "POSITIVE"}, "error": None}))
+    monkeypatch.setattr(scraper, "search_for_controversies", stub("controversies", {"potential_hits": [], "error": None}))
+    monkeypatch.setattr(scraper, "get_failure_and_industry_insights", stub("failory", {
+        "failed_startups": [], "failure_details": [], "error": None}))
+    return calls
+
+
+def _fire(n, query):
+    barrier = threading.Barrier(n)
+
+    def one_request(_):
+        barrier.wait() # Release all requests together
+        return app_module.app.test_client().get('/search', query_string={'query': query}).status_code
+
+    with ThreadPoolExecutor(max_workers=n) as pool:
+        return list(pool.map(one_request, range(n)))
+
+
+def test_concurrent_searches_fetch_once(upstream):
+    statuses = _fire(N, "Coalesced Founder")
+    assert statuses == [200] * N
+    assert upstream == {"web_sentiment": 1, "controversies": 1, "failory": 1}
+
+
+def test_failure_reaches_every_waiter(upstream, monkeypatch):
+    # Per-source errors are absorbed into founder_data, so fail the aggregation step instead
+    def failing_build(*args, **kwargs):
+        raise RuntimeError("aggregation failed")
+    monkeypatch.setattr(app_module.pipeline, "build_founder_data", failing_build)
+    statuses = _fire(N, "Failing Founder")
+    assert statuses == [500] * N
+    assert upstream == {"web_sentiment": 1, "controversies": 1, "failory": 1}
+
+
+def test_single_flight_shares_result_and_error():
+    flights = SingleFlight()
+    started, release = threading.Event(), threading.Event()
+    calls = []
+
+    def leader_fn():
+        calls.append(1)
+        started.set()
+        release.wait(5)
+        return "value"
+
+    with ThreadPoolExecutor(max_workers=4) as pool:
+        leader = pool.submit(flights.do, "key", leader_fn)
+        started.wait(5)
+        followers = [pool.submit(flights.do, "key", leader_fn) for _ in range(3)]
+        while flights.stats()["coalesced"] < 3: time.sleep(0.01)
+        release.set()
+        assert leader.result() == ("value", False)
+        assert [f.result() for f in followers] == [("value", True)] * 3
+    assert calls == [1]
+
+    def failing():
+        raise ValueError("upstream down")
+    with pytest.raises(ValueError):
+        flights.do("key", failing)
+
+
+def test_single_flight_follower_timeout():
+    flights = SingleFlight()
+    started, release = threading.Event(), threading.Event()
+
+    def slow():
+        started.set()
+        release.wait(5)
+        return "late"
+
+    with ThreadPoolExecutor(max_workers=1) as pool:
+        leader = pool.submit(flights.do, "key", slow)
+        started.wait(5)
+        with pytest.raises(SingleFlightTimeout):
+            flights.do("key", slow, timeout=0.05)
+        release.set()
+        assert leader.result() == ("late", False)
+    assert flights.stats()["timeouts"] == 1